@@ -54,10 +54,17 @@ async def get_post_list(
     page_size: Annotated[int, Query(ge=1, le=100, description="每页数量")] = 20,
     keyword: Annotated[str | None, Query(description="标题/内容搜索")] = None,
     is_hidden: Annotated[bool | None, Query(description="是否隐藏筛选")] = None,
+    cursor: Annotated[
+        str | None, Query(description="分页游标 (上一页返回的 next_cursor)")
+    ] = None,
 ) -> SuccessResponse[PostListOut]:
     """管理员查看全平台帖子列表"""
     data = await admin_service.get_all_posts(
-        page=page, page_size=page_size, keyword=keyword, is_hidden=is_hidden
+        page=page,
+        page_size=page_size,
+        keyword=keyword,
+        is_hidden=is_hidden,
+        cursor=cursor,
     )
     return SuccessResponse[PostListOut](message=GET_SUCCESS, data=data)
 
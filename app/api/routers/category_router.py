@@ -3,10 +3,11 @@
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, status
+from fastapi.responses import Response
 
 from app.api.deps import get_category_service
 from app.common.constants import GET_SUCCESS
-from app.schemas import SuccessResponse
+from app.schemas import RawSuccessResponse, SuccessResponse
 from app.schemas.category import CategoryOut
 from app.services import CategoryService
 
@@ -20,7 +21,7 @@ category_router = APIRouter()
 )
 async def get_categories(
     category_service: Annotated[CategoryService, Depends(get_category_service)],
-) -> SuccessResponse[list[CategoryOut]]:
-    """获取分类列表（公开接口）"""
-    categories = await category_service.get_all_categories()
-    return SuccessResponse[list[CategoryOut]](message=GET_SUCCESS, data=categories)
+) -> Response:
+    """获取分类列表（公开接口，直接返回缓存的 JSON）"""
+    categories = await category_service.get_all_categories_json()
+    return RawSuccessResponse.build(GET_SUCCESS, categories)
@@ -4,9 +4,10 @@ import uuid
 from typing import Annotated
 
 from fastapi import APIRouter, File, UploadFile, status
+from fastapi.responses import Response
 
 from app.common.constants import GET_SUCCESS
-from app.schemas import FileUploadOut, SuccessResponse
+from app.schemas import FileUploadOut, RawSuccessResponse, SuccessResponse
 from app.schemas.banner import BannerOut
 from app.services.banner_service import banner_service
 
@@ -53,7 +54,7 @@ async def upload_file(
     response_model=SuccessResponse[list[BannerOut]],
     tags=["banners"],
 )
-async def get_public_banners() -> SuccessResponse[list[BannerOut]]:
-    """获取公开轮播图"""
-    data = await banner_service.get_public_banners()
-    return SuccessResponse(message=GET_SUCCESS, data=data)
+async def get_public_banners() -> Response:
+    """获取公开轮播图（直接返回缓存的 JSON）"""
+    data = await banner_service.get_public_banners_json()
+    return RawSuccessResponse.build(GET_SUCCESS, data)
@@ -190,9 +190,10 @@ async def search_posts(
     user_id: Annotated[str | None, Depends(get_optional_user_id)] = None,
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
+    cursor: str | None = Query(None, description="分页游标 (上一页返回的 next_cursor)"),
 ):
     """全局搜索帖子"""
-    data = await service.search_posts(query, user_id, page, page_size)
+    data = await service.search_posts(query, user_id, page, page_size, cursor)
     return SuccessResponse[PostListOut](message=GET_SUCCESS, data=data)
 
 
@@ -77,14 +77,30 @@ async def get_my_orders(
     page_size: Annotated[int, Query(ge=1, le=100)] = 10,
     status: Annotated[str | None, Query(description="订单状态")] = None,
     refund_status: Annotated[str | None, Query(description="退款状态标记")] = None,
+    cursor: Annotated[
+        str | None, Query(description="分页游标 (上一页返回的 next_cursor)")
+    ] = None,
+    with_total: Annotated[bool, Query(description="是否返回订单总数")] = True,
 ) -> SuccessResponse[OrderListOut]:
     """获取商家关联的订单列表"""
-    items, total = await order_service.get_merchant_orders(
-        user_id, page, page_size, status=status, refund_status=refund_status
+    items, total, next_cursor = await order_service.get_merchant_orders(
+        user_id,
+        page,
+        page_size,
+        status=status,
+        refund_status=refund_status,
+        cursor=cursor,
+        with_total=with_total,
     )
     return SuccessResponse[OrderListOut](
         message=GET_SUCCESS,
-        data=OrderListOut(items=items, total=total, page=page, page_size=page_size),
+        data=OrderListOut(
+            items=items,
+            total=total,
+            page=page,
+            page_size=page_size,
+            next_cursor=next_cursor,
+        ),
     )
 
 
@@ -72,12 +72,24 @@ async def get_my_orders(
     order_service: Annotated[OrderService, Depends(get_order_service)],
     page: Annotated[int, Query(ge=1)] = 1,
     page_size: Annotated[int, Query(ge=1, le=100)] = 10,
+    cursor: Annotated[
+        str | None, Query(description="分页游标 (上一页返回的 next_cursor)")
+    ] = None,
+    with_total: Annotated[bool, Query(description="是否返回订单总数")] = True,
 ) -> SuccessResponse[OrderListOut]:
     """批量获取我的订单"""
-    items, total = await order_service.get_my_orders(user_id, page, page_size)
+    items, total, next_cursor = await order_service.get_my_orders(
+        user_id, page, page_size, cursor=cursor, with_total=with_total
+    )
     return SuccessResponse[OrderListOut](
         message=GET_SUCCESS,
-        data=OrderListOut(items=items, total=total, page=page, page_size=page_size),
+        data=OrderListOut(
+            items=items,
+            total=total,
+            page=page,
+            page_size=page_size,
+            next_cursor=next_cursor,
+        ),
     )
 
 
@@ -1,8 +1,10 @@
 """商品路由：商品资源 CRUD 接口"""
 
+from decimal import Decimal
 from typing import Annotated, Literal
 
 from fastapi import APIRouter, Body, Depends, Path, Query, status
+from fastapi.responses import Response
 
 from app.api.deps import get_current_user_id, get_product_service
 from app.api.role import require_merchant
@@ -13,7 +15,7 @@ from app.common.constants import (
     PRODUCT_STATUS_UPDATE_SUCCESS,
     PRODUCT_UPDATE_SUCCESS,
 )
-from app.schemas import SuccessResponse
+from app.schemas import RawSuccessResponse, SuccessResponse
 from app.schemas.product import (
     ProductCreateIn,
     ProductListOut,
@@ -40,17 +42,39 @@ async def get_public_products(
     page_size: Annotated[int, Query(ge=1, le=100, description="每页数量")] = 20,
     keyword: Annotated[str | None, Query(description="搜索关键字")] = None,
     category_id: Annotated[str | None, Query(description="分类ID")] = None,
+    min_price: Annotated[
+        Decimal | None, Query(ge=0, description="最低实际价格 (促销后)")
+    ] = None,
+    max_price: Annotated[
+        Decimal | None, Query(ge=0, description="最高实际价格 (促销后)")
+    ] = None,
     sort_by: Annotated[
-        Literal["price_asc", "price_desc", "newest", "popularity_desc"],
-        Query(description="排序方式"),
-    ] = "newest",
-) -> SuccessResponse[ProductPublicListOut]:
-    """获取公开商品列表"""
+        Literal["price_asc", "price_desc", "newest", "popularity_desc", "relevance"]
+        | None,
+        Query(
+            description="排序方式 (默认：有关键字时按相关度，否则按最新；价格按促销后的实际价格)"
+        ),
+    ] = None,
+) -> SuccessResponse[ProductPublicListOut] | Response:
+    """获取公开商品列表 (首页热门榜单直接返回缓存的 JSON)"""
+    if product_service.is_trending_query(
+        page=page,
+        keyword=keyword,
+        category_id=category_id,
+        sort_by=sort_by,
+        min_price=min_price,
+        max_price=max_price,
+    ):
+        data = await product_service.get_trending_products_json(page_size)
+        return RawSuccessResponse.build(GET_SUCCESS, data)
+
     products = await product_service.get_public_products(
         page=page,
         page_size=page_size,
         keyword=keyword,
         category_id=category_id,
+        min_price=min_price,
+        max_price=max_price,
         sort_by=sort_by,
     )
     return SuccessResponse[ProductPublicListOut](message=GET_SUCCESS, data=products)
@@ -21,6 +21,11 @@ POSTGRES_PORT: int = int(os.getenv("POSTGRES_PORT", 5432))
 DATABASE_URL: str = (
     f"postgresql+asyncpg://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
 )
+# 连接池按 uvicorn worker 数调整：总连接数 = worker 数 × (pool_size + max_overflow)
+PG_POOL_SIZE: int = int(os.getenv("PG_POOL_SIZE", 5))
+PG_MAX_OVERFLOW: int = int(os.getenv("PG_MAX_OVERFLOW", 5))
+PG_POOL_TIMEOUT: int = int(os.getenv("PG_POOL_TIMEOUT", 30))  # 取连接超时 (秒)
+PG_POOL_RECYCLE: int = int(os.getenv("PG_POOL_RECYCLE", 1800))  # 连接回收 (秒)
 
 # MongoDB
 MONGO_ROOT_USER: str = os.getenv("MONGO_ROOT_USER", "admin")
@@ -32,6 +37,10 @@ MONGO_PORT: str = os.getenv("MONGO_PORT", "27017")
 MONGO_DATABASE_URL: str = (
     f"mongodb://{MONGO_ROOT_USER}:{MONGO_ROOT_PASSWORD}@{MONGO_HOST}:{MONGO_PORT}?authSource=admin"
 )
+MONGO_MAX_POOL_SIZE: int = int(os.getenv("MONGO_MAX_POOL_SIZE", 10))
+MONGO_MIN_POOL_SIZE: int = int(
+    os.getenv("MONGO_MIN_POOL_SIZE", 0)
+)  # 驱动默认 0，不预建空闲连接
 
 # Redis
 REDIS_HOST: str = os.getenv("REDIS_HOST", "127.0.0.1")
@@ -39,6 +48,12 @@ REDIS_PORT: int = int(os.getenv("REDIS_PORT", 6379))
 REDIS_DB: int = int(os.getenv("REDIS_DB", 8))
 
 REDIS_URL: str = f"redis://{REDIS_HOST}:{REDIS_PORT}/{REDIS_DB}"
+REDIS_MAX_CONNECTIONS: int = int(os.getenv("REDIS_MAX_CONNECTIONS", 5))
+
+# Metrics
+SLOW_QUERY_THRESHOLD_MS: int = int(
+    os.getenv("SLOW_QUERY_THRESHOLD_MS", 200)
+)  # 超过该耗时的 PG 语句 / MongoDB 命令记录慢查询日志
 
 # RabbitMQ
 RABBITMQ_USER: str = os.getenv("RABBITMQ_USER", "admin")
@@ -1,19 +1,27 @@
+import asyncio
+import contextlib
 import logging
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
 
+import redis.asyncio as aioredis
 from fastapi import FastAPI
 from sqlalchemy import text
 
+from app.core.config import REDIS_URL
 from app.database.mongodb import init_mongodb, mongodb_client
 from app.database.pgsql import pg_engine
 from app.database.redis import get_redis, redis_pool
 from app.tasks.broker import broker
+from app.utils.redis_cache import listen_invalidations
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     logger = logging.getLogger("uvicorn")
+    # 本地 L1 缓存失效订阅使用独立连接，不占用业务连接池
+    pubsub_client = aioredis.Redis.from_url(REDIS_URL, decode_responses=True)
+    invalidation_task: asyncio.Task | None = None
     try:
         # 初始化pgsql
         async with pg_engine.begin() as conn:
@@ -26,11 +34,28 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
         # 初始化Redis
         async with get_redis() as redis:
             await redis.ping()  # type: ignore
+        # 预热上架商品的 Redis 库存键，避免首批下单走懒加载初始化
+        try:
+            from app.services.stock_reconcile_service import stock_reconcile_service
+
+            warmed = await stock_reconcile_service.warm_up_all()
+            logger.info(f"已预热商品库存缓存: {warmed} 个")
+        except Exception as e:
+            logger.warning(f"商品库存缓存预热失败，将在下单时懒加载: {e}")
+        # 订阅缓存失效广播，清除本进程 L1 缓存
+        invalidation_task = asyncio.create_task(listen_invalidations(pubsub_client))
+        logger.info("已订阅缓存失效广播")
         # 初始化Taskiq Broker
         await broker.startup()
         logger.info("已开启Taskiq Broker")
         yield
     finally:
+        # 停止缓存失效订阅
+        if invalidation_task is not None:
+            invalidation_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await invalidation_task
+        await pubsub_client.aclose()
         # 关闭pgsql连接
         await pg_engine.dispose()
         logger.info("已关闭Pgsql连接")
@@ -0,0 +1,242 @@
+"""进程内指标注册表：计数器/仪表/直方图，按 Prometheus 文本格式导出 (多 worker 时每个进程各自统计)"""
+
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, TypeVar
+
+LabelValues = tuple[str, ...]
+
+# 请求耗时分桶 (秒)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# 单个请求内后端调用次数分桶
+CALL_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values, strict=True))
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, doc: str, labels: Sequence[str] = ()) -> None:
+        self.name = name
+        self.doc = doc
+        self.labels = tuple(labels)
+
+    def _samples(self) -> list[str]:
+        raise NotImplementedError
+
+    def render(self) -> list[str]:
+        return [
+            f"# HELP {self.name} {self.doc}",
+            f"# TYPE {self.name} {self.kind}",
+            *self._samples(),
+        ]
+
+
+class Counter(_Metric):
+    """单调递增计数器"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, doc: str, labels: Sequence[str] = ()) -> None:
+        super().__init__(name, doc, labels)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def _samples(self) -> list[str]:
+        return [
+            f"{self.name}{_format_labels(self.labels, lv)} {_format_value(v)}"
+            for lv, v in self._values.items()
+        ]
+
+
+class Gauge(Counter):
+    """可增可减的仪表"""
+
+    kind = "gauge"
+
+    def dec(self, *label_values: str, amount: float = 1) -> None:
+        self.inc(*label_values, amount=-amount)
+
+
+class Histogram(_Metric):
+    """累积分桶直方图"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        doc: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, doc, labels)
+        self.buckets = tuple(sorted(buckets))
+        # 每组标签：各分桶计数 (不累积)、总和、总数
+        self._values: dict[LabelValues, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        counts, totals = self._values.setdefault(
+            label_values, ([0] * (len(self.buckets) + 1), [0.0, 0.0])
+        )
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[i] += 1
+                break
+        else:
+            counts[-1] += 1
+        totals[0] += value
+        totals[1] += 1
+
+    def _samples(self) -> list[str]:
+        lines: list[str] = []
+        names = (*self.labels, "le")
+        for lv, (counts, (total, count)) in self._values.items():
+            cumulative = 0
+            for bound, n in zip((*self.buckets, float("inf")), counts, strict=True):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(names, (*lv, le))} {cumulative}"
+                )
+            labels = _format_labels(self.labels, lv)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {_format_value(count)}")
+        return lines
+
+
+M = TypeVar("M", bound=_Metric)
+
+
+class MetricsRegistry:
+    """指标注册表"""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: M) -> M:
+        if metric.name in self._metrics:
+            raise ValueError(f"Duplicated metric: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+http_requests_total = registry.register(
+    Counter(
+        "http_requests_total",
+        "HTTP requests by route and status code",
+        ("method", "route", "status"),
+    )
+)
+http_request_duration_seconds = registry.register(
+    Histogram(
+        "http_request_duration_seconds",
+        "HTTP request latency in seconds",
+        ("method", "route"),
+    )
+)
+http_requests_in_progress = registry.register(
+    Gauge(
+        "http_requests_in_progress",
+        "HTTP requests currently being served",
+        ("method",),
+    )
+)
+http_request_backend_calls = registry.register(
+    Histogram(
+        "http_request_backend_calls",
+        "PostgreSQL / Redis / MongoDB calls made by one HTTP request",
+        ("route", "backend"),
+        buckets=CALL_COUNT_BUCKETS,
+    )
+)
+
+
+# 计入 X-Query-Count 的数据库后端 (Redis 只计调用次数)
+QUERY_BACKENDS = ("pgsql", "mongodb")
+
+
+@dataclass
+class RequestStats:
+    """单个请求内的后端调用计数与数据库耗时"""
+
+    calls: dict[str, int] = field(
+        default_factory=lambda: {"pgsql": 0, "redis": 0, "mongodb": 0}
+    )
+    db_time: dict[str, float] = field(
+        default_factory=lambda: {"pgsql": 0.0, "mongodb": 0.0}
+    )
+    # 所属 ASGI scope，路由匹配后可从中取得路由模板
+    scope: dict[str, Any] | None = None
+
+    @property
+    def query_count(self) -> int:
+        return sum(self.calls[b] for b in QUERY_BACKENDS)
+
+    @property
+    def route(self) -> str:
+        if self.scope is None:
+            return "-"
+        route = self.scope.get("route")
+        return getattr(route, "path", None) or self.scope.get("path", "-")
+
+
+# 当前请求的统计对象，请求之外 (定时任务、启动阶段) 为 None
+_request_stats: ContextVar[RequestStats | None] = ContextVar(
+    "request_stats", default=None
+)
+
+
+def current_request_stats() -> RequestStats | None:
+    return _request_stats.get()
+
+
+@contextmanager
+def track_request(scope: dict[str, Any] | None = None) -> Iterator[RequestStats]:
+    """在当前上下文内开启请求统计，退出时恢复"""
+    stats = RequestStats(scope=scope)
+    token = _request_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _request_stats.reset(token)
+
+
+def count_call(backend: str) -> None:
+    """在当前请求上记一次后端调用 (不在请求内时忽略)"""
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.calls[backend] += 1
+
+
+def add_db_time(backend: str, seconds: float) -> None:
+    """在当前请求上累加数据库耗时 (不在请求内时忽略)"""
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.db_time[backend] += seconds
@@ -0,0 +1,83 @@
+"""后端调用计数：PG 语句、Redis 往返与 MongoDB 命令计入当前请求的统计，数据库慢查询记录日志"""
+
+import logging
+import time
+
+from pymongo import monitoring
+from redis.asyncio.connection import Connection
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import SLOW_QUERY_THRESHOLD_MS
+from app.core.metrics import add_db_time, count_call, current_request_stats
+
+logger = logging.getLogger(__name__)
+
+# 慢查询日志中语句的最大长度
+_STATEMENT_LOG_LIMIT = 500
+
+
+def _log_if_slow(backend: str, seconds: float, statement: str) -> None:
+    elapsed_ms = seconds * 1000
+    if elapsed_ms < SLOW_QUERY_THRESHOLD_MS:
+        return
+    stats = current_request_stats()
+    route = stats.route if stats is not None else "-"
+    logger.warning(
+        f"[SlowQuery] {backend} {elapsed_ms:.1f}ms route={route}: "
+        f"{statement[:_STATEMENT_LOG_LIMIT]}"
+    )
+
+
+class CountingConnection(Connection):
+    """Redis 连接：每次发送命令 (管道整批发送计一次) 计一次调用"""
+
+    async def send_packed_command(self, command, check_health=True):
+        count_call("redis")
+        await super().send_packed_command(command, check_health)
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    """MongoDB 命令监听：每条命令计一次调用并累加耗时 (Motor 在线程池中执行时会复制上下文)"""
+
+    def started(self, event):
+        count_call("mongodb")
+
+    def succeeded(self, event):
+        self._finish(event)
+
+    def failed(self, event):
+        self._finish(event)
+
+    @staticmethod
+    def _finish(event) -> None:
+        seconds = event.duration_micros / 1_000_000
+        add_db_time("mongodb", seconds)
+        _log_if_slow("mongodb", seconds, f"{event.database_name}.{event.command_name}")
+
+
+mongo_command_listener = MongoCommandListener()
+
+
+def install_pg_call_hooks(engine: AsyncEngine) -> None:
+    """在引擎上注册语句执行钩子，每条 SQL 计一次调用并累加耗时"""
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        count_call("pgsql")
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, many):
+        seconds = time.perf_counter() - conn.info["query_start"].pop()
+        add_db_time("pgsql", seconds)
+        _log_if_slow("pgsql", seconds, statement)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _handle_error(exception_context):
+        # 执行失败时不会触发 after_cursor_execute，需弹出计时起点
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_start"):
+            seconds = time.perf_counter() - conn.info["query_start"].pop()
+            add_db_time("pgsql", seconds)
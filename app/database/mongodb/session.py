@@ -3,15 +3,23 @@ from typing import Any
 from beanie import init_beanie
 from motor.motor_asyncio import AsyncIOMotorClient
 
-from app.core.config import MONGO_DATABASE_URL, MONGO_DB
+from app.core.config import (
+    MONGO_DATABASE_URL,
+    MONGO_DB,
+    MONGO_MAX_POOL_SIZE,
+    MONGO_MIN_POOL_SIZE,
+)
+from app.database.call_metrics import mongo_command_listener
 from app.database.mongodb.base_entity import BaseEntity
+from app.database.pool_metrics import mongo_pool_listener
 from app.entity import mongodb as mongodb_models
 
 # 创建全局 MongoDB 客户端实例 (等同于 PG 的 pg_engine)
 mongodb_client: AsyncIOMotorClient = AsyncIOMotorClient(
     MONGO_DATABASE_URL,
-    maxPoolSize=10,
-    minPoolSize=5,
+    maxPoolSize=MONGO_MAX_POOL_SIZE,
+    minPoolSize=MONGO_MIN_POOL_SIZE,
+    event_listeners=[mongo_pool_listener, mongo_command_listener],
 )
 
 
@@ -5,6 +5,9 @@
 SET client_encoding = 'UTF8';
 SET TIME ZONE 'UTC';
 
+-- 商品/帖子中文子串检索使用三元组索引
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
 -- =========================
 -- 用户实体（会员、商家、管理员）
 -- =========================
@@ -85,6 +88,7 @@ CREATE TABLE IF NOT EXISTS products (
     sku             varchar(64) UNIQUE,
     description     text,
     price           numeric(12,2) NOT NULL CHECK (price >= 0),
+    effective_price numeric(12,2) NOT NULL, -- 促销后的实际价格，由定价引擎维护
     stock           integer NOT NULL DEFAULT 0 CHECK (stock >= 0),
     status          varchar(8) NOT NULL DEFAULT 'on',
     image_url       varchar(512),
@@ -95,17 +99,25 @@ CREATE TABLE IF NOT EXISTS products (
     likes_count     integer NOT NULL DEFAULT 0,
     rating          numeric(3,2) NOT NULL DEFAULT 5.00,
     review_count    integer NOT NULL DEFAULT 0,
+    search_vector   tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(description, '')), 'B')
+    ) STORED,
     created_at      timestamptz NOT NULL DEFAULT now(),
     updated_at      timestamptz NOT NULL DEFAULT now(),
     CONSTRAINT chk_products_status CHECK (status IN ('on','off'))
 );
 CREATE INDEX IF NOT EXISTS idx_products_merchant ON products(merchant_id);
+CREATE INDEX IF NOT EXISTS idx_products_status_effective_price ON products(status, effective_price);
 CREATE INDEX IF NOT EXISTS idx_products_popularity ON products(popularity_score DESC, sales_count DESC);
 CREATE INDEX IF NOT EXISTS idx_products_views ON products(views_count DESC);
 CREATE INDEX IF NOT EXISTS idx_products_favorites ON products(favorites_count DESC);
 CREATE INDEX IF NOT EXISTS idx_products_likes ON products(likes_count DESC);
 CREATE INDEX IF NOT EXISTS idx_products_rating ON products(rating DESC);
 CREATE INDEX IF NOT EXISTS idx_products_name ON products(name); -- 搜索建议优化
+CREATE INDEX IF NOT EXISTS idx_products_search_vector ON products USING gin (search_vector);
+CREATE INDEX IF NOT EXISTS idx_products_name_trgm ON products USING gin (name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_products_description_trgm ON products USING gin (description gin_trgm_ops);
 
 -- =========================
 -- 商品-分类 多对多关联表
@@ -197,6 +209,7 @@ CREATE TABLE IF NOT EXISTS order_items (
     id              uuid PRIMARY KEY,
     order_id        uuid NOT NULL, -- 逻辑外键: orders.id
     product_id      uuid NOT NULL, -- 逻辑外键: products.id
+    merchant_id     uuid NOT NULL, -- 逻辑外键: merchants.id (下单时冗余自商品)
     quantity        integer NOT NULL CHECK (quantity > 0),
     unit_price      numeric(12,2) NOT NULL CHECK (unit_price >= 0),
     created_at      timestamptz NOT NULL DEFAULT now(),
@@ -204,6 +217,34 @@ CREATE TABLE IF NOT EXISTS order_items (
     UNIQUE (order_id, product_id)
 );
 CREATE INDEX IF NOT EXISTS idx_order_items_order ON order_items(order_id);
+CREATE INDEX IF NOT EXISTS idx_order_items_merchant_order ON order_items(merchant_id, order_id);
+CREATE INDEX IF NOT EXISTS idx_order_items_merchant_product ON order_items(merchant_id, product_id) INCLUDE (order_id, quantity, unit_price);
+
+-- =========================
+-- 销售日汇总 (按支付日期增量维护)
+-- =========================
+CREATE TABLE IF NOT EXISTS merchant_sales_daily (
+    merchant_id     uuid NOT NULL, -- 逻辑外键: merchants.id
+    stat_date       date NOT NULL,
+    sales_amount    numeric(14,2) NOT NULL DEFAULT 0,
+    order_count     integer NOT NULL DEFAULT 0,
+    sales_quantity  integer NOT NULL DEFAULT 0,
+    created_at      timestamptz NOT NULL DEFAULT now(),
+    updated_at      timestamptz NOT NULL DEFAULT now(),
+    PRIMARY KEY (merchant_id, stat_date)
+);
+
+CREATE TABLE IF NOT EXISTS product_sales_daily (
+    product_id      uuid NOT NULL, -- 逻辑外键: products.id
+    stat_date       date NOT NULL,
+    merchant_id     uuid NOT NULL, -- 逻辑外键: merchants.id
+    sales_amount    numeric(14,2) NOT NULL DEFAULT 0,
+    sales_quantity  integer NOT NULL DEFAULT 0,
+    created_at      timestamptz NOT NULL DEFAULT now(),
+    updated_at      timestamptz NOT NULL DEFAULT now(),
+    PRIMARY KEY (product_id, stat_date)
+);
+CREATE INDEX IF NOT EXISTS idx_product_sales_daily_merchant_date ON product_sales_daily(merchant_id, stat_date);
 
 -- =========================
 -- 支付实体
@@ -345,6 +386,8 @@ CREATE TABLE IF NOT EXISTS posts (
 );
 CREATE INDEX IF NOT EXISTS idx_posts_group ON posts(group_id, created_at DESC);
 CREATE INDEX IF NOT EXISTS idx_posts_user ON posts(user_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_posts_title_trgm ON posts USING gin (title gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_posts_content_trgm ON posts USING gin (content gin_trgm_ops);
 
 -- =========================
 -- 管理员操作日志
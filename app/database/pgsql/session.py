@@ -7,18 +7,29 @@ from sqlalchemy.ext.asyncio import (
     create_async_engine,
 )
 
-from app.core.config import DATABASE_URL, DEBUG
+from app.core.config import (
+    DATABASE_URL,
+    DEBUG,
+    PG_MAX_OVERFLOW,
+    PG_POOL_RECYCLE,
+    PG_POOL_SIZE,
+    PG_POOL_TIMEOUT,
+)
+from app.database.call_metrics import install_pg_call_hooks
+from app.database.pool_metrics import TimedQueuePool
 
 pg_engine = create_async_engine(
     DATABASE_URL,
     echo=DEBUG,
     future=True,
-    pool_size=5,
-    max_overflow=5,
-    pool_timeout=30,
-    pool_recycle=1800,
+    poolclass=TimedQueuePool,
+    pool_size=PG_POOL_SIZE,
+    max_overflow=PG_MAX_OVERFLOW,
+    pool_timeout=PG_POOL_TIMEOUT,
+    pool_recycle=PG_POOL_RECYCLE,
     # pool_pre_ping=True,
 )
+install_pg_call_hooks(pg_engine)
 
 AsyncSessionLocal = async_sessionmaker(
     bind=pg_engine,
@@ -895,5 +895,261 @@ async def table_structure_patch_24():
     await pg_engine.dispose()
 
 
+async def table_structure_patch_25(batch_size: int = 5000):
+    """order_items 冗余 merchant_id：新增字段、分批回填、设置非空并创建商家查询索引"""
+    async with pg_engine.begin() as conn:
+        print("Adding merchant_id column to order_items table...")
+        await conn.execute(
+            text("ALTER TABLE order_items ADD COLUMN IF NOT EXISTS merchant_id uuid;")
+        )
+        await conn.execute(
+            text(
+                "COMMENT ON COLUMN order_items.merchant_id IS '商家ID (下单时冗余自商品)';"
+            )
+        )
+
+    # 分批回填，每批独立事务，避免长时间锁住大表；子查询只选可回填的行，
+    # 直到没有可回填的行为止 (不能以某批不足 batch_size 作为结束条件)
+    backfills = [
+        (
+            "from products",
+            """
+            UPDATE order_items oi
+            SET merchant_id = p.merchant_id
+            FROM products p
+            WHERE p.id = oi.product_id
+              AND oi.id IN (
+                  SELECT i.id FROM order_items i
+                  JOIN products p2 ON p2.id = i.product_id
+                  WHERE i.merchant_id IS NULL
+                  LIMIT :batch_size
+              );
+            """,
+        ),
+        (
+            # 商品已删除的订单项：订单内其余商品只属于一个商家时沿用该商家
+            "from sibling items of single-merchant orders",
+            """
+            UPDATE order_items oi
+            SET merchant_id = m.merchant_id
+            FROM (
+                SELECT order_id, min(merchant_id::text)::uuid AS merchant_id
+                FROM order_items
+                WHERE merchant_id IS NOT NULL
+                GROUP BY order_id
+                HAVING count(DISTINCT merchant_id) = 1
+            ) m
+            WHERE m.order_id = oi.order_id
+              AND oi.id IN (
+                  SELECT i.id FROM order_items i
+                  WHERE i.merchant_id IS NULL
+                    AND i.order_id IN (
+                        SELECT order_id FROM order_items
+                        WHERE merchant_id IS NOT NULL
+                        GROUP BY order_id
+                        HAVING count(DISTINCT merchant_id) = 1
+                    )
+                  LIMIT :batch_size
+              );
+            """,
+        ),
+    ]
+    for source, sql in backfills:
+        total = 0
+        while True:
+            async with pg_engine.begin() as conn:
+                result = await conn.execute(text(sql), {"batch_size": batch_size})
+            if result.rowcount == 0:
+                break
+            total += result.rowcount
+            print(f"Backfilled {total} order_items rows {source}...")
+
+    async with pg_engine.begin() as conn:
+        remaining = (
+            await conn.execute(
+                text("SELECT count(*) FROM order_items WHERE merchant_id IS NULL;")
+            )
+        ).scalar_one()
+        if remaining == 0:
+            await conn.execute(
+                text("ALTER TABLE order_items ALTER COLUMN merchant_id SET NOT NULL;")
+            )
+        else:
+            # 商品已删除且无法从订单推断商家的历史订单项，保留可空，商家查询不会返回这些行
+            print(
+                f"WARNING: {remaining} order_items rows have no resolvable merchant, "
+                "merchant_id is left nullable"
+            )
+        await conn.execute(
+            text(
+                "CREATE INDEX IF NOT EXISTS idx_order_items_merchant_order ON order_items(merchant_id, order_id);"
+            )
+        )
+        await conn.execute(
+            text(
+                "CREATE INDEX IF NOT EXISTS idx_order_items_merchant_product ON order_items(merchant_id, product_id) INCLUDE (order_id, quantity, unit_price);"
+            )
+        )
+        print("Done!")
+
+    await pg_engine.dispose()
+
+
+async def table_structure_patch_26():
+    """创建商家/商品日销售汇总表，并从历史订单全量回填"""
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    from app.repo import statistics_repo
+
+    async with pg_engine.begin() as conn:
+        print("Creating merchant_sales_daily / product_sales_daily tables...")
+        await conn.execute(
+            text(
+                """
+            CREATE TABLE IF NOT EXISTS merchant_sales_daily (
+                merchant_id     uuid NOT NULL,
+                stat_date       date NOT NULL,
+                sales_amount    numeric(14,2) NOT NULL DEFAULT 0,
+                order_count     integer NOT NULL DEFAULT 0,
+                sales_quantity  integer NOT NULL DEFAULT 0,
+                created_at      timestamptz NOT NULL DEFAULT now(),
+                updated_at      timestamptz NOT NULL DEFAULT now(),
+                PRIMARY KEY (merchant_id, stat_date)
+            );
+            """
+            )
+        )
+        await conn.execute(
+            text(
+                """
+            CREATE TABLE IF NOT EXISTS product_sales_daily (
+                product_id      uuid NOT NULL,
+                stat_date       date NOT NULL,
+                merchant_id     uuid NOT NULL,
+                sales_amount    numeric(14,2) NOT NULL DEFAULT 0,
+                sales_quantity  integer NOT NULL DEFAULT 0,
+                created_at      timestamptz NOT NULL DEFAULT now(),
+                updated_at      timestamptz NOT NULL DEFAULT now(),
+                PRIMARY KEY (product_id, stat_date)
+            );
+            """
+            )
+        )
+        await conn.execute(
+            text(
+                "CREATE INDEX IF NOT EXISTS idx_product_sales_daily_merchant_date ON product_sales_daily(merchant_id, stat_date);"
+            )
+        )
+        await conn.execute(
+            text("COMMENT ON TABLE merchant_sales_daily IS '商家日销售汇总表';")
+        )
+        await conn.execute(
+            text("COMMENT ON TABLE product_sales_daily IS '商品日销售汇总表';")
+        )
+
+        print("Backfilling sales rollups...")
+        session = AsyncSession(bind=conn)
+        await statistics_repo.rebuild_sales_rollups(session)
+        await session.close()
+        print("Done!")
+
+    await pg_engine.dispose()
+
+
+async def table_structure_patch_27():
+    """商品全文检索：tsvector 生成列 + GIN 索引，名称/描述 pg_trgm 三元组索引"""
+    async with pg_engine.begin() as conn:
+        print("Adding search_vector column and trigram indexes to products...")
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm;"))
+        await conn.execute(
+            text(
+                """
+            ALTER TABLE products ADD COLUMN IF NOT EXISTS search_vector tsvector
+            GENERATED ALWAYS AS (
+                setweight(to_tsvector('simple', coalesce(name, '')), 'A') ||
+                setweight(to_tsvector('simple', coalesce(description, '')), 'B')
+            ) STORED;
+            """
+            )
+        )
+        await conn.execute(
+            text(
+                "CREATE INDEX IF NOT EXISTS idx_products_search_vector ON products USING gin (search_vector);"
+            )
+        )
+        await conn.execute(
+            text(
+                "CREATE INDEX IF NOT EXISTS idx_products_name_trgm ON products USING gin (name gin_trgm_ops);"
+            )
+        )
+        await conn.execute(
+            text(
+                "CREATE INDEX IF NOT EXISTS idx_products_description_trgm ON products USING gin (description gin_trgm_ops);"
+            )
+        )
+        print("Done!")
+
+    await pg_engine.dispose()
+
+
+async def table_structure_patch_28():
+    """帖子标题/内容 pg_trgm 三元组索引，支持社区与后台审核搜索"""
+    async with pg_engine.begin() as conn:
+        print("Adding trigram indexes to posts...")
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm;"))
+        await conn.execute(
+            text(
+                "CREATE INDEX IF NOT EXISTS idx_posts_title_trgm ON posts USING gin (title gin_trgm_ops);"
+            )
+        )
+        await conn.execute(
+            text(
+                "CREATE INDEX IF NOT EXISTS idx_posts_content_trgm ON posts USING gin (content gin_trgm_ops);"
+            )
+        )
+        print("Done!")
+
+    await pg_engine.dispose()
+
+
+async def table_structure_patch_29():
+    """商品实际价格：新增 effective_price 列与排序索引，并按当前有效促销全量物化"""
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    from app.repo import products_repo
+
+    async with pg_engine.begin() as conn:
+        print("Adding effective_price column to products...")
+        await conn.execute(
+            text(
+                "ALTER TABLE products ADD COLUMN IF NOT EXISTS effective_price numeric(12,2);"
+            )
+        )
+        await conn.execute(
+            text(
+                "UPDATE products SET effective_price = price WHERE effective_price IS NULL;"
+            )
+        )
+        await conn.execute(
+            text("ALTER TABLE products ALTER COLUMN effective_price SET NOT NULL;")
+        )
+        await conn.execute(
+            text(
+                "CREATE INDEX IF NOT EXISTS idx_products_status_effective_price ON products(status, effective_price);"
+            )
+        )
+        await conn.execute(
+            text("COMMENT ON COLUMN products.effective_price IS '实际价格';")
+        )
+
+        print("Applying active promotions to effective prices...")
+        session = AsyncSession(bind=conn)
+        updated = await products_repo.refresh_effective_prices(session)
+        await session.close()
+        print(f"Done! {updated} product prices updated.")
+
+    await pg_engine.dispose()
+
+
 if __name__ == "__main__":
-    asyncio.run(table_structure_patch_24())
+    asyncio.run(table_structure_patch_29())
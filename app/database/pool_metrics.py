@@ -0,0 +1,147 @@
+"""连接池监控：记录 PG / Redis / MongoDB 三个连接池的取连接等待时间、占用数与溢出/耗尽次数"""
+
+import time
+from typing import Any
+
+import redis.asyncio as redis
+from pymongo import monitoring
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+
+class PoolStats:
+    """单个连接池的累计取连接统计 (进程内，单线程事件循环下无需加锁)"""
+
+    def __init__(self) -> None:
+        self.checkouts = 0
+        self.failures = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record(self, wait: float, *, ok: bool = True) -> None:
+        if ok:
+            self.checkouts += 1
+        else:
+            self.failures += 1
+        self.wait_total += wait
+        self.wait_max = max(self.wait_max, wait)
+
+    def snapshot(self) -> dict[str, Any]:
+        attempts = self.checkouts + self.failures
+        return {
+            "checkouts": self.checkouts,
+            "failures": self.failures,
+            "wait_avg_ms": round(self.wait_total / attempts * 1000, 3)
+            if attempts
+            else 0.0,
+            "wait_max_ms": round(self.wait_max * 1000, 3),
+        }
+
+
+pg_pool_stats = PoolStats()
+redis_pool_stats = PoolStats()
+mongo_pool_stats = PoolStats()
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """统计取连接等待时间的 PG 连接池 (超时抛出 TimeoutError 计为失败)"""
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            conn = super().connect()
+        except Exception:
+            pg_pool_stats.record(time.perf_counter() - start, ok=False)
+            raise
+        pg_pool_stats.record(time.perf_counter() - start)
+        return conn
+
+
+class TimedConnectionPool(redis.ConnectionPool):
+    """统计取连接等待时间的 Redis 连接池 (连接数达上限时直接抛错，计为失败)"""
+
+    async def get_connection(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            conn = await super().get_connection(*args, **kwargs)
+        except Exception:
+            redis_pool_stats.record(time.perf_counter() - start, ok=False)
+            raise
+        redis_pool_stats.record(time.perf_counter() - start)
+        return conn
+
+
+class MongoPoolListener(monitoring.ConnectionPoolListener):
+    """通过 PyMongo 连接池事件统计 MongoDB 取连接等待时间与占用数"""
+
+    def __init__(self) -> None:
+        self.in_use = 0
+        self.open = 0
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self.open += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self.open = max(0, self.open - 1)
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        mongo_pool_stats.record(event.duration or 0.0, ok=False)
+
+    def connection_checked_out(self, event):
+        self.in_use += 1
+        mongo_pool_stats.record(event.duration or 0.0)
+
+    def connection_checked_in(self, event):
+        self.in_use = max(0, self.in_use - 1)
+
+
+mongo_pool_listener = MongoPoolListener()
+
+
+def collect_pool_metrics() -> dict[str, Any]:
+    """汇总三个连接池的当前占用与累计取连接统计"""
+    from app.core.config import MONGO_MAX_POOL_SIZE
+    from app.database.pgsql import pg_engine
+    from app.database.redis import redis_pool
+
+    pg_pool: Any = pg_engine.pool
+    return {
+        "pgsql": {
+            "size": pg_pool.size(),
+            "max_overflow": pg_pool._max_overflow,
+            "in_use": pg_pool.checkedout(),
+            "idle": pg_pool.checkedin(),
+            # 负数表示尚未建满 pool_size，正数为已借用的溢出连接数
+            "overflow": pg_pool.overflow(),
+            **pg_pool_stats.snapshot(),
+        },
+        "redis": {
+            "max_connections": redis_pool.max_connections,
+            "in_use": len(redis_pool._in_use_connections),
+            "idle": len(redis_pool._available_connections),
+            **redis_pool_stats.snapshot(),
+        },
+        "mongodb": {
+            "max_pool_size": MONGO_MAX_POOL_SIZE,
+            "in_use": mongo_pool_listener.in_use,
+            "open": mongo_pool_listener.open,
+            **mongo_pool_stats.snapshot(),
+        },
+    }
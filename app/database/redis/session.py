@@ -3,10 +3,15 @@ from contextlib import asynccontextmanager
 
 import redis.asyncio as redis
 
-from app.core.config import REDIS_URL
+from app.core.config import REDIS_MAX_CONNECTIONS, REDIS_URL
+from app.database.call_metrics import CountingConnection
+from app.database.pool_metrics import TimedConnectionPool
 
-redis_pool = redis.ConnectionPool.from_url(
-    REDIS_URL, decode_responses=True, max_connections=5
+redis_pool = TimedConnectionPool.from_url(
+    REDIS_URL,
+    decode_responses=True,
+    max_connections=REDIS_MAX_CONNECTIONS,
+    connection_class=CountingConnection,
 )
 
 
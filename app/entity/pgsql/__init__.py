@@ -8,6 +8,7 @@ from .community_groups import CommunityGroup
 from .coupons import Coupon
 from .favorites import Favorite
 from .group_members import GroupMember
+from .merchant_sales_daily import MerchantSalesDaily
 from .merchants import Merchant
 from .notifications import SystemNotification
 from .order_items import OrderItem
@@ -18,6 +19,7 @@ from .payments import Payment
 from .point_logs import PointLog
 from .posts import Post
 from .product_categories import ProductCategory
+from .product_sales_daily import ProductSalesDaily
 from .products import Product
 from .promotion_products import PromotionProduct
 from .promotions import Promotion
@@ -37,6 +39,7 @@ __all__ = [
     "Favorite",
     "GroupMember",
     "Merchant",
+    "MerchantSalesDaily",
     "Order",
     "OrderItem",
     "OrderLogistics",
@@ -46,6 +49,7 @@ __all__ = [
     "Post",
     "Product",
     "ProductCategory",
+    "ProductSalesDaily",
     "PromotionProduct",
     "Promotion",
     "SystemNotification",
@@ -0,0 +1,35 @@
+import uuid
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy import Date, Integer, Numeric
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database.pgsql import BaseEntity
+
+
+class MerchantSalesDaily(BaseEntity):
+    __tablename__ = "merchant_sales_daily"
+    merchant_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        # ForeignKey("merchants.id", ondelete="CASCADE"),  # 逻辑外键
+        primary_key=True,
+        comment="商家ID",
+    )
+    stat_date: Mapped[date] = mapped_column(
+        Date, primary_key=True, comment="统计日期 (支付日期, UTC)"
+    )
+    sales_amount: Mapped[Decimal] = mapped_column(
+        Numeric(14, 2), nullable=False, default=0, comment="销售额"
+    )
+    order_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, comment="订单数"
+    )
+    sales_quantity: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, comment="销量(件数)"
+    )
+    __table_args__ = ({"comment": "商家日销售汇总表：按支付日期增量维护"},)
+
+    def __repr__(self) -> str:
+        return f"MerchantSalesDaily(merchant_id={self.merchant_id}, stat_date={self.stat_date}, sales_amount={self.sales_amount})"
@@ -39,6 +39,12 @@ class OrderItem(BaseEntity):
         nullable=False,
         comment="商品ID",
     )
+    merchant_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        # ForeignKey("merchants.id"),  # 逻辑外键 (下单时冗余自商品，避免商家查询关联 products)
+        nullable=False,
+        comment="商家ID",
+    )
     quantity: Mapped[int] = mapped_column(Integer, nullable=False, comment="数量")
 
     # 关联
@@ -57,6 +63,13 @@ class OrderItem(BaseEntity):
         CheckConstraint("unit_price >= 0", name="chk_order_items_unit_price_nonneg"),
         UniqueConstraint("order_id", "product_id"),
         Index("idx_order_items_order", "order_id"),
+        Index("idx_order_items_merchant_order", "merchant_id", "order_id"),
+        Index(
+            "idx_order_items_merchant_product",
+            "merchant_id",
+            "product_id",
+            postgresql_include=["order_id", "quantity", "unit_price"],
+        ),
         {"comment": "订单明细表：订单中的商品项"},
     )
 
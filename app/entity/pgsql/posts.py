@@ -70,6 +70,19 @@ class Post(BaseEntity):
     __table_args__ = (
         Index("idx_posts_group", "group_id", "created_at"),
         Index("idx_posts_user", "user_id", "created_at"),
+        # 标题/内容子串搜索使用 pg_trgm 三元组索引
+        Index(
+            "idx_posts_title_trgm",
+            "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+        ),
+        Index(
+            "idx_posts_content_trgm",
+            "content",
+            postgresql_using="gin",
+            postgresql_ops={"content": "gin_trgm_ops"},
+        ),
         {"comment": "帖子表：社区帖子与互动数据"},
     )
 
@@ -0,0 +1,41 @@
+import uuid
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy import Date, Index, Integer, Numeric
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database.pgsql import BaseEntity
+
+
+class ProductSalesDaily(BaseEntity):
+    __tablename__ = "product_sales_daily"
+    product_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        # ForeignKey("products.id", ondelete="CASCADE"),  # 逻辑外键
+        primary_key=True,
+        comment="商品ID",
+    )
+    stat_date: Mapped[date] = mapped_column(
+        Date, primary_key=True, comment="统计日期 (支付日期, UTC)"
+    )
+    merchant_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        # ForeignKey("merchants.id", ondelete="CASCADE"),  # 逻辑外键
+        nullable=False,
+        comment="商家ID",
+    )
+    sales_amount: Mapped[Decimal] = mapped_column(
+        Numeric(14, 2), nullable=False, default=0, comment="销售额"
+    )
+    sales_quantity: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, comment="销量(件数)"
+    )
+    __table_args__ = (
+        Index("idx_product_sales_daily_merchant_date", "merchant_id", "stat_date"),
+        {"comment": "商品日销售汇总表：按支付日期增量维护"},
+    )
+
+    def __repr__(self) -> str:
+        return f"ProductSalesDaily(product_id={self.product_id}, stat_date={self.stat_date}, sales_quantity={self.sales_quantity})"
@@ -4,6 +4,7 @@ from decimal import Decimal
 import uuid6
 from sqlalchemy import (
     CheckConstraint,
+    Computed,
     Index,
     Integer,
     Numeric,
@@ -11,12 +12,17 @@ from sqlalchemy import (
     Text,
     text,
 )
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
+from sqlalchemy.orm import Mapped, deferred, mapped_column
 
 from app.database.pgsql import BaseEntity
 
 
+def _default_effective_price(context) -> Decimal:
+    """新建商品时实际价格默认等于原价"""
+    return context.get_current_parameters()["price"]
+
+
 class Product(BaseEntity):
     __tablename__ = "products"
     id: Mapped[uuid.UUID] = mapped_column(
@@ -37,6 +43,13 @@ class Product(BaseEntity):
     price: Mapped[Decimal] = mapped_column(
         Numeric(12, 2), nullable=False, comment="商品价格"
     )
+    # 促销后的实际价格 (由定价引擎在促销开始/结束/变更及改价时物化，列表排序与下单直接读取)
+    effective_price: Mapped[Decimal] = mapped_column(
+        Numeric(12, 2),
+        nullable=False,
+        default=_default_effective_price,
+        comment="实际价格",
+    )
     stock: Mapped[int] = mapped_column(
         Integer, nullable=False, server_default=text("0"), comment="库存数量"
     )
@@ -68,11 +81,24 @@ class Product(BaseEntity):
         Integer, nullable=False, server_default=text("0"), comment="评价数量"
     )
     image_url: Mapped[str | None] = mapped_column(String(512), comment="商品图片URL")
+    # 全文检索向量 (数据库生成列，随名称/描述写入自动维护；列表查询默认不加载)
+    search_vector: Mapped[str | None] = deferred(
+        mapped_column(
+            TSVECTOR,
+            Computed(
+                "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+                "setweight(to_tsvector('simple', coalesce(description, '')), 'B')",
+                persisted=True,
+            ),
+            comment="全文检索向量",
+        )
+    )
     __table_args__ = (
         CheckConstraint("price >= 0", name="chk_products_price_nonneg"),
         CheckConstraint("stock >= 0", name="chk_products_stock_nonneg"),
         CheckConstraint("status IN ('on','off')", name="chk_products_status"),
         Index("idx_products_merchant", "merchant_id"),
+        Index("idx_products_status_effective_price", "status", "effective_price"),
         Index(
             "idx_products_popularity",
             "popularity_score",
@@ -81,6 +107,20 @@ class Product(BaseEntity):
         ),
         Index("idx_products_views", "views_count", postgresql_using="btree"),
         Index("idx_products_name", "name", postgresql_using="btree"),
+        Index("idx_products_search_vector", "search_vector", postgresql_using="gin"),
+        # 中文名称/描述按 pg_trgm 三元组索引，支持任意位置的子串匹配
+        Index(
+            "idx_products_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+        Index(
+            "idx_products_description_trgm",
+            "description",
+            postgresql_using="gin",
+            postgresql_ops={"description": "gin_trgm_ops"},
+        ),
         {"comment": "商品表：保存商品基本信息与统计数据"},
     )
 
@@ -1,10 +1,14 @@
 from fastapi import FastAPI, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 
 from app.api.router import api_routers
 from app.core.lifespan import lifespan
+from app.core.metrics import registry
+from app.database.pool_metrics import collect_pool_metrics
 from app.middleware.exception_handlers import register_exception_handlers
+from app.middleware.metrics import MetricsMiddleware
 
 app = FastAPI(
     lifespan=lifespan,
@@ -21,6 +25,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# 请求指标 (最外层，耗时包含 CORS 与异常处理)
+app.add_middleware(MetricsMiddleware)
 
 
 # 挂载静态文件目录
@@ -34,3 +40,22 @@ register_exception_handlers(app)
 @app.get(path="/healthy", status_code=status.HTTP_200_OK, tags=["healthy"])
 async def healthy():
     return {"status": "ok"}
+
+
+# 连接池监控路由：各连接池占用、溢出与取连接等待时间
+@app.get(path="/metrics/pools", status_code=status.HTTP_200_OK, tags=["healthy"])
+async def pool_metrics():
+    return collect_pool_metrics()
+
+
+# Prometheus 指标路由：文本格式导出当前进程的请求指标
+@app.get(
+    path="/metrics",
+    status_code=status.HTTP_200_OK,
+    tags=["healthy"],
+    response_class=PlainTextResponse,
+)
+async def metrics():
+    return PlainTextResponse(
+        registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
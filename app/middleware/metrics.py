@@ -0,0 +1,88 @@
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import (
+    RequestStats,
+    http_request_backend_calls,
+    http_request_duration_seconds,
+    http_requests_in_progress,
+    http_requests_total,
+    track_request,
+)
+
+# 未匹配到路由的请求 (404、静态文件) 归为同一标签，避免按原始路径产生大量时间序列
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def _server_timing(stats: RequestStats, elapsed: float) -> str:
+    """按 Server-Timing 规范输出各数据库耗时与响应头发出前的应用总耗时 (毫秒)"""
+    parts = [
+        f'{backend};dur={stats.db_time[backend] * 1000:.1f};desc="{stats.calls[backend]} queries"'
+        for backend in stats.db_time
+    ]
+    parts.append(f"app;dur={elapsed * 1000:.1f}")
+    return ", ".join(parts)
+
+
+class MetricsMiddleware:
+    """
+    纯 ASGI 请求指标中间件：记录按路由模板分组的耗时直方图、状态码计数、
+    在途请求数，以及单个请求内的 PG / Redis / MongoDB 调用次数；
+    响应头附带 X-Query-Count 与 Server-Timing
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        recorded = False
+
+        def record() -> None:
+            """记录一次请求的指标 (只记录一次)"""
+            nonlocal recorded
+            if recorded:
+                return
+            recorded = True
+            elapsed = time.perf_counter() - start
+            http_requests_in_progress.dec(method)
+            # 路由匹配后 FastAPI 会把 APIRoute 写入 scope
+            route = scope.get("route")
+            path = getattr(route, "path", UNMATCHED_ROUTE)
+            http_requests_total.inc(method, path, str(status_code))
+            http_request_duration_seconds.observe(elapsed, method, path)
+            for backend, calls in stats.calls.items():
+                http_request_backend_calls.observe(calls, path, backend)
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                # 流式响应在发出响应头之后的查询不计入响应头
+                headers = MutableHeaders(scope=message)
+                headers["X-Query-Count"] = str(stats.query_count)
+                headers["Server-Timing"] = _server_timing(
+                    stats, time.perf_counter() - start
+                )
+            await send(message)
+            # 响应体发送完毕即记录，不计入随后执行的 BackgroundTasks
+            if message["type"] == "http.response.body" and not message.get(
+                "more_body", False
+            ):
+                record()
+
+        http_requests_in_progress.inc(method)
+        start = time.perf_counter()
+        with track_request(scope) as stats:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                # 未正常发完响应 (异常、客户端断开) 时在此兜底记录
+                record()
@@ -2,24 +2,28 @@
 
 import uuid
 from collections.abc import Sequence
+from datetime import datetime
+from decimal import Decimal
 
 from beanie import PydanticObjectId
-from sqlalchemy import desc, func, or_, select
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.entity.mongodb.comments import Comment
 from app.entity.pgsql import CommunityGroup, Post, User
+from app.repo.community_repo import paginate_post_search, post_search_condition
 
 
 async def get_all_posts(
     session: AsyncSession,
     *,
-    page: int = 1,
-    page_size: int = 20,
+    limit: int = 20,
+    offset: int = 0,
+    cursor: tuple[Decimal, datetime, uuid.UUID] | None = None,
     keyword: str | None = None,
     is_hidden: bool | None = None,
-) -> tuple[Sequence[tuple[Post, User, CommunityGroup]], int]:
-    """全平台帖子列表（管理员视角，含隐藏帖子）"""
+) -> tuple[Sequence[tuple[Post, User, CommunityGroup, Decimal]], int | None]:
+    """全平台帖子列表（管理员视角，含隐藏帖子）；有关键字时按相关度排序"""
     base = (
         select(Post, User, CommunityGroup)
         .join(User, Post.user_id == User.id)
@@ -27,18 +31,20 @@ async def get_all_posts(
     )
 
     if keyword:
-        pattern = f"%{keyword}%"
-        base = base.where(or_(Post.title.ilike(pattern), Post.content.ilike(pattern)))
+        base = base.where(post_search_condition(keyword))
 
     if is_hidden is not None:
         base = base.where(Post.is_hidden == is_hidden)
 
-    count_stmt = select(func.count()).select_from(base.subquery())
-    total = (await session.execute(count_stmt)).scalar() or 0
-
-    stmt = base.order_by(desc(Post.created_at))
-    stmt = stmt.offset((page - 1) * page_size).limit(page_size)
+    # 游标翻页时不重复统计总数
+    total = None
+    if cursor is None:
+        count_stmt = select(func.count()).select_from(base.subquery())
+        total = (await session.execute(count_stmt)).scalar() or 0
 
+    stmt = paginate_post_search(
+        base, keyword, limit=limit, offset=offset, cursor=cursor
+    )
     result = await session.execute(stmt)
     return result.tuples().all(), total
 
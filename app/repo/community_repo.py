@@ -2,10 +2,31 @@
 
 import uuid
 from collections.abc import Sequence
+from datetime import datetime
+from decimal import Decimal
 from typing import cast
 
 from beanie import PydanticObjectId
-from sqlalchemy import and_, delete, desc, exists, func, select, update
+from sqlalchemy import (
+    ColumnElement,
+    Integer,
+    Numeric,
+    Select,
+    case,
+    column,
+    delete,
+    desc,
+    exists,
+    func,
+    literal,
+    literal_column,
+    select,
+    tuple_,
+    update,
+    values,
+)
+from sqlalchemy import cast as sa_cast
+from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.engine import CursorResult
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -18,6 +39,7 @@ from app.entity.pgsql import (
     Post,
     User,
 )
+from app.utils.common import escape_like
 
 # --- Groups ---
 
@@ -120,6 +142,20 @@ async def check_joined(
     return bool((await session.execute(stmt)).scalar())
 
 
+async def get_joined_group_ids(
+    session: AsyncSession,
+    user_id: uuid.UUID,
+    group_ids: Sequence[uuid.UUID] | None = None,
+) -> set[uuid.UUID]:
+    """批量查询用户已加入的圈子 ID (group_ids 为空时返回全部)"""
+    stmt = select(GroupMember.group_id).where(GroupMember.user_id == user_id)
+    if group_ids is not None:
+        if not group_ids:
+            return set()
+        stmt = stmt.where(GroupMember.group_id.in_(group_ids))
+    return set((await session.execute(stmt)).scalars().all())
+
+
 async def join_group(
     session: AsyncSession, user_id: uuid.UUID, group_id: uuid.UUID
 ) -> None:
@@ -240,32 +276,85 @@ async def get_posts_by_user(
     return result.tuples().all(), total
 
 
+def post_search_condition(keyword: str) -> ColumnElement[bool]:
+    """标题或内容包含关键字 (由 pg_trgm 三元组 GIN 索引支持)"""
+    pattern = f"%{escape_like(keyword)}%"
+    return Post.title.ilike(pattern, escape="\\") | Post.content.ilike(
+        pattern, escape="\\"
+    )
+
+
+def post_search_rank(keyword: str) -> ColumnElement[Decimal]:
+    """
+    帖子搜索相关度：标题命中 + 标题三元组相似度
+
+    保留 4 位小数的 numeric，以便作为游标键精确比较
+    """
+    pattern = f"%{escape_like(keyword)}%"
+    score = case(
+        (Post.title.ilike(pattern, escape="\\"), 1), else_=0
+    ) + func.similarity(Post.title, keyword)
+    return func.round(sa_cast(score, Numeric), 4)
+
+
+def paginate_post_search(
+    stmt: Select,
+    keyword: str | None,
+    *,
+    limit: int,
+    offset: int = 0,
+    cursor: tuple[Decimal, datetime, uuid.UUID] | None = None,
+) -> Select:
+    """
+    按 (相关度, created_at, id) 倒序分页，结果末列附带相关度；有游标时使用 keyset
+
+    无关键字时相关度恒为 0，仅按 (created_at, id) 排序
+    """
+    if not keyword:
+        stmt = stmt.add_columns(literal_column("0::numeric").label("rank"))
+        keys = [Post.created_at, Post.id]
+    else:
+        rank = post_search_rank(keyword)
+        stmt = stmt.add_columns(rank.label("rank"))
+        keys = [rank, Post.created_at, Post.id]
+
+    if cursor is not None:
+        rank_value, created_at, post_id = cursor
+        values = [
+            literal(rank_value, Numeric(10, 4)),
+            literal(created_at, Post.created_at.type),
+            literal(post_id, Post.id.type),
+        ][-len(keys) :]
+        stmt = stmt.where(tuple_(*keys) < tuple_(*values))
+    else:
+        stmt = stmt.offset(offset)
+    return stmt.order_by(*[desc(k) for k in keys]).limit(limit)
+
+
 async def search_posts(
     session: AsyncSession,
     query_text: str,
-    page: int = 1,
-    page_size: int = 20,
-) -> tuple[Sequence[tuple[Post, User, CommunityGroup]], int]:
-    """全局搜索帖子 (标题或内容包含关键字)"""
-    pattern = f"%{query_text}%"
+    *,
+    limit: int = 20,
+    offset: int = 0,
+    cursor: tuple[Decimal, datetime, uuid.UUID] | None = None,
+) -> tuple[Sequence[tuple[Post, User, CommunityGroup, Decimal]], int | None]:
+    """全局搜索帖子 (标题或内容包含关键字，按相关度排序)；游标翻页时不统计总数"""
     base_query = (
         select(Post, User, CommunityGroup)
         .join(User, Post.user_id == User.id)
         .join(CommunityGroup, Post.group_id == CommunityGroup.id)
-        .where(
-            and_(
-                Post.is_hidden.is_(False),
-                (Post.title.ilike(pattern) | Post.content.ilike(pattern)),
-            )
-        )
+        .where(Post.is_hidden.is_(False), post_search_condition(query_text))
     )
 
-    count_stmt = select(func.count()).select_from(base_query.subquery())
-    total = (await session.execute(count_stmt)).scalar() or 0
-
-    stmt = base_query.order_by(desc(Post.created_at))
-    stmt = stmt.offset((page - 1) * page_size).limit(page_size)
+    total = None
+    if cursor is None:
+        count_stmt = select(func.count()).select_from(base_query.subquery())
+        total = (await session.execute(count_stmt)).scalar() or 0
 
+    stmt = paginate_post_search(
+        base_query, query_text, limit=limit, offset=offset, cursor=cursor
+    )
     result = await session.execute(stmt)
     return result.tuples().all(), total
 
@@ -312,11 +401,11 @@ async def get_post_detail(
     return None
 
 
-async def delete_post(session: AsyncSession, post_id: uuid.UUID) -> None:
-    # Need to decrement group post count first?
+async def delete_post(session: AsyncSession, post_id: uuid.UUID) -> bool:
+    """删除帖子并扣减话题圈帖子数，返回是否删除"""
     post = await session.get(Post, post_id)
     if not post:
-        return
+        return False
 
     await session.delete(post)
     await session.execute(
@@ -324,11 +413,24 @@ async def delete_post(session: AsyncSession, post_id: uuid.UUID) -> None:
         .where(CommunityGroup.id == post.group_id)
         .values(post_count=CommunityGroup.post_count - 1)
     )
+    return True
 
 
-async def increment_view(session: AsyncSession, post_id: uuid.UUID) -> None:
+async def apply_view_deltas(
+    session: AsyncSession, deltas: dict[uuid.UUID, int]
+) -> None:
+    """单条 UPDATE ... FROM (VALUES ...) 批量累加帖子浏览量"""
+    if not deltas:
+        return
+    d = values(
+        column("post_id", UUID(as_uuid=True)),
+        column("delta", Integer),
+        name="d",
+    ).data(sorted(deltas.items()))
     await session.execute(
-        update(Post).where(Post.id == post_id).values(view_count=Post.view_count + 1)
+        update(Post)
+        .where(Post.id == d.c.post_id)
+        .values(view_count=Post.view_count + d.c.delta)
     )
 
 
@@ -386,23 +488,30 @@ async def get_comment_list(
 # --- Likes ---
 
 
-async def check_liked(
-    session: AsyncSession,
-    user_id: uuid.UUID,
-    target_id: str | uuid.UUID,
-    target_type: str,
-) -> bool:
+def _parse_target_id(
+    target_id: str | uuid.UUID, target_type: str
+) -> uuid.UUID | PydanticObjectId | None:
+    """点赞目标 ID 转换：帖子/商品为 UUID，评论为 ObjectId，格式非法返回 None"""
     try:
-        tid: uuid.UUID | PydanticObjectId
         if target_type in {"post", "product"}:
-            tid = (
+            return (
                 target_id
                 if isinstance(target_id, uuid.UUID)
                 else uuid.UUID(str(target_id))
             )
-        else:
-            tid = PydanticObjectId(str(target_id))
+        return PydanticObjectId(str(target_id))
     except (ValueError, TypeError):
+        return None
+
+
+async def check_liked(
+    session: AsyncSession,
+    user_id: uuid.UUID,
+    target_id: str | uuid.UUID,
+    target_type: str,
+) -> bool:
+    tid = _parse_target_id(target_id, target_type)
+    if tid is None:
         return False
 
     count = await MongoLike.find(
@@ -411,17 +520,36 @@ async def check_liked(
     return count > 0
 
 
+async def check_liked_many(
+    user_id: uuid.UUID,
+    target_ids: Sequence[str | uuid.UUID],
+    target_type: str,
+) -> set[str]:
+    """批量查询点赞状态 (单次 $in 查询)，返回已点赞的目标 ID 字符串集合"""
+    tids = [
+        tid
+        for tid in (_parse_target_id(t, target_type) for t in target_ids)
+        if tid is not None
+    ]
+    if not tids:
+        return set()
+
+    likes = await MongoLike.find(
+        {
+            "user_id": user_id,
+            "target_id": {"$in": tids},
+            "target_type": target_type,
+        }
+    ).to_list()
+    return {str(like.target_id) for like in likes}
+
+
 async def toggle_like(
     session: AsyncSession, user_id: uuid.UUID, target_id: str, target_type: str
 ) -> bool:
     """Toggle like status using MongoDB. Returns True if liked, False if unliked."""
-    try:
-        tid: uuid.UUID | PydanticObjectId
-        if target_type in {"post", "product"}:
-            tid = uuid.UUID(target_id)
-        else:
-            tid = PydanticObjectId(target_id)
-    except (ValueError, TypeError):
+    tid = _parse_target_id(target_id, target_type)
+    if tid is None:
         # Invalid ID format for type
         return False
 
@@ -457,12 +585,6 @@ async def toggle_like(
             stmt = stmt.values(likes_count=func.greatest(0, Post.likes_count + delta))
         await session.execute(stmt)
 
-    elif target_type == "product":
-        # Product in PG (tid is UUID)
-        from app.repo import products_repo
-
-        await products_repo.change_likes_count(session, cast(uuid.UUID, tid), delta)
-
     elif target_type == "comment":
         # Comment in Mongo (tid is ObjectId)
         # Need to fetch comment first
@@ -473,4 +595,5 @@ async def toggle_like(
                 comment.likes_count = 0
             await comment.save()
 
+    # 商品点赞数由服务层在提交后写入 Redis 计数，定时批量落库
     return is_liked
@@ -208,6 +208,25 @@ async def return_user_coupon(session: AsyncSession, user_coupon_id: uuid.UUID):
     await session.execute(stmt)
 
 
+async def return_user_coupons(
+    session: AsyncSession, user_coupon_ids: Sequence[uuid.UUID]
+) -> None:
+    """批量退回已使用的优惠券"""
+    if not user_coupon_ids:
+        return
+    stmt = (
+        update(UserCoupon)
+        .where(UserCoupon.id.in_(user_coupon_ids))
+        .values(
+            status="unused",
+            order_id=None,
+            used_at=None,
+            updated_at=datetime.now(UTC),
+        )
+    )
+    await session.execute(stmt)
+
+
 async def atomic_increment_issued_count(
     session: AsyncSession, coupon_id: uuid.UUID
 ) -> bool:
@@ -8,7 +8,6 @@ from sqlalchemy import exists, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.entity.pgsql import Favorite, Product
-from app.repo import products_repo
 
 
 async def add(session: AsyncSession, user_id: uuid.UUID, product_id: uuid.UUID) -> None:
@@ -16,35 +15,30 @@ async def add(session: AsyncSession, user_id: uuid.UUID, product_id: uuid.UUID)
     fav = Favorite(user_id=user_id, product_id=product_id)
     session.add(fav)
     await session.flush()
-    # 同步更新商品收藏量
-    await products_repo.change_favorites_count(session, product_id, 1)
 
 
 async def remove(
     session: AsyncSession, user_id: uuid.UUID, product_id: uuid.UUID
-) -> None:
-    """取消收藏"""
-    stmt = sa_delete(Favorite).where(
-        Favorite.user_id == user_id, Favorite.product_id == product_id
+) -> bool:
+    """取消收藏，返回是否确有收藏被删除"""
+    stmt = (
+        sa_delete(Favorite)
+        .where(Favorite.user_id == user_id, Favorite.product_id == product_id)
+        .returning(Favorite.product_id)
     )
-    await session.execute(stmt)
-    await session.flush()
-    # 同步更新商品收藏量
-    await products_repo.change_favorites_count(session, product_id, -1)
+    return (await session.execute(stmt)).first() is not None
 
 
 async def remove_batch(
     session: AsyncSession, user_id: uuid.UUID, product_ids: list[uuid.UUID]
-) -> None:
-    """批量取消收藏"""
-    stmt = sa_delete(Favorite).where(
-        Favorite.user_id == user_id, Favorite.product_id.in_(product_ids)
+) -> list[uuid.UUID]:
+    """批量取消收藏，返回确有收藏被删除的商品 ID"""
+    stmt = (
+        sa_delete(Favorite)
+        .where(Favorite.user_id == user_id, Favorite.product_id.in_(product_ids))
+        .returning(Favorite.product_id)
     )
-    await session.execute(stmt)
-    await session.flush()
-    # 同步更新商品收藏量
-    for pid in product_ids:
-        await products_repo.change_favorites_count(session, pid, -1)
+    return list((await session.execute(stmt)).scalars().all())
 
 
 async def get_list(
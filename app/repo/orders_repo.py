@@ -2,12 +2,24 @@
 
 import uuid
 from collections.abc import Sequence
-
-from sqlalchemy import func, select
+from datetime import UTC, datetime
+from typing import cast
+
+from sqlalchemy import (
+    ColumnElement,
+    Select,
+    exists,
+    func,
+    literal,
+    select,
+    tuple_,
+    update,
+)
+from sqlalchemy.engine import CursorResult
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.entity.pgsql import Order, OrderItem, Product
+from app.entity.pgsql import Order, OrderItem
 
 
 async def create(session: AsyncSession, order: Order) -> Order:
@@ -46,93 +58,168 @@ async def get_items_by_order_id(
     return result.scalars().all()
 
 
+async def get_items_by_order_ids(
+    session: AsyncSession, order_ids: Sequence[uuid.UUID]
+) -> Sequence[OrderItem]:
+    """批量获取多个订单的明细 (单次 IN 查询)"""
+    if not order_ids:
+        return []
+    stmt = (
+        select(OrderItem)
+        .where(OrderItem.order_id.in_(order_ids))
+        .options(selectinload(OrderItem.product))
+    )
+    result = await session.execute(stmt)
+    return result.scalars().all()
+
+
+def _paginate(
+    stmt: Select[tuple[Order]],
+    limit: int,
+    offset: int = 0,
+    cursor: tuple[datetime, uuid.UUID] | None = None,
+) -> Select[tuple[Order]]:
+    """按 (created_at, id) 倒序分页：有游标时使用 keyset，否则退化为 OFFSET"""
+    if cursor is not None:
+        created_at, order_id = cursor
+        stmt = stmt.where(
+            tuple_(Order.created_at, Order.id)
+            < tuple_(
+                literal(created_at, Order.created_at.type),
+                literal(order_id, Order.id.type),
+            )
+        )
+    else:
+        stmt = stmt.offset(offset)
+    return stmt.order_by(Order.created_at.desc(), Order.id.desc()).limit(limit)
+
+
 async def get_list_by_user(
-    session: AsyncSession, user_id: str, page: int = 1, page_size: int = 10
-) -> tuple[list[Order], int]:
+    session: AsyncSession,
+    user_id: str,
+    *,
+    limit: int = 10,
+    offset: int = 0,
+    cursor: tuple[datetime, uuid.UUID] | None = None,
+) -> list[Order]:
     """分页获取用户的订单列表"""
-    base_stmt = (
+    stmt = (
         select(Order)
         .where(Order.user_id == user_id)
         .options(selectinload(Order.address))
     )
+    result = await session.execute(_paginate(stmt, limit, offset, cursor))
+    return list(result.scalars().all())
 
-    # 获取总数
-    count_stmt = select(func.count()).select_from(base_stmt.subquery())
-    total = (await session.execute(count_stmt)).scalar() or 0
 
-    # 分页查询
-    offset = (page - 1) * page_size
-    list_stmt = (
-        base_stmt.order_by(Order.created_at.desc()).offset(offset).limit(page_size)
-    )
-    result = await session.execute(list_stmt)
-    orders = list(result.scalars().all())
+async def count_by_user(session: AsyncSession, user_id: str) -> int:
+    """统计用户的订单总数"""
+    stmt = select(func.count()).select_from(Order).where(Order.user_id == user_id)
+    return (await session.execute(stmt)).scalar() or 0
 
-    return orders, total
+
+def _merchant_order_filters(
+    merchant_id: str, status: str | None, refund_status: str | None
+) -> list[ColumnElement[bool]]:
+    """商家订单筛选条件：基于明细冗余的 merchant_id 做 EXISTS 半连接"""
+    filters: list[ColumnElement[bool]] = [
+        exists().where(
+            OrderItem.order_id == Order.id, OrderItem.merchant_id == merchant_id
+        )
+    ]
+    # 状态筛选 (主状态或退款标记)
+    if status:
+        filters.append(Order.status == status)
+    if refund_status:
+        filters.append(Order.refund_status == refund_status)
+    return filters
 
 
 async def get_list_by_merchant(
     session: AsyncSession,
     merchant_id: str,
-    page: int = 1,
-    page_size: int = 10,
+    *,
+    limit: int = 10,
+    offset: int = 0,
+    cursor: tuple[datetime, uuid.UUID] | None = None,
     status: str | None = None,
     refund_status: str | None = None,
-) -> tuple[list[Order], int]:
+) -> list[Order]:
     """分页获取商家的订单列表 (通过订单明细关联商品)"""
-    # 基础查询: 查找包含该商家商品的订单ID
-    base_stmt = (
+    stmt = (
         select(Order)
-        .join(OrderItem, OrderItem.order_id == Order.id)
-        .join(Product, Product.id == OrderItem.product_id)
-        .where(Product.merchant_id == merchant_id)
+        .where(*_merchant_order_filters(merchant_id, status, refund_status))
         .options(selectinload(Order.address))
     )
+    result = await session.execute(_paginate(stmt, limit, offset, cursor))
+    return list(result.scalars().all())
 
-    # 状态筛选 (主状态或退款标记)
-    if status:
-        base_stmt = base_stmt.where(Order.status == status)
-    if refund_status:
-        base_stmt = base_stmt.where(Order.refund_status == refund_status)
 
-    base_stmt = base_stmt.distinct()
-
-    # 获取总数
-    count_stmt = select(func.count()).select_from(base_stmt.subquery())
-    total = (await session.execute(count_stmt)).scalar() or 0
-
-    # 分页查询
-    offset = (page - 1) * page_size
-    list_stmt = (
-        base_stmt.order_by(Order.created_at.desc()).offset(offset).limit(page_size)
+async def count_by_merchant(
+    session: AsyncSession,
+    merchant_id: str,
+    status: str | None = None,
+    refund_status: str | None = None,
+) -> int:
+    """统计商家关联的订单总数"""
+    stmt = (
+        select(func.count())
+        .select_from(Order)
+        .where(*_merchant_order_filters(merchant_id, status, refund_status))
     )
-    result = await session.execute(list_stmt)
-    orders = list(result.scalars().all())
-
-    return orders, total
+    return (await session.execute(stmt)).scalar() or 0
+
+
+async def complete_shipped_orders_before(
+    session: AsyncSession, before_time: datetime, limit: int = 500
+) -> int:
+    """将一批发货时间早于指定时间的已发货订单置为已完成 (跳过被锁定的行)，返回条数"""
+    locked_ids = (
+        select(Order.id)
+        .where(Order.status == "shipped", Order.shipped_at < before_time)
+        .order_by(Order.shipped_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    stmt = (
+        update(Order)
+        .where(Order.id.in_(locked_ids), Order.status == "shipped")
+        .values(status="completed", completed_at=datetime.now(UTC))
+    )
+    result = cast(CursorResult, await session.execute(stmt))
+    return result.rowcount or 0
 
 
-async def get_shipped_orders_before(
-    session: AsyncSession, before_time
+async def lock_expired_pending_orders(
+    session: AsyncSession, before_time: datetime, limit: int = 500
 ) -> Sequence[Order]:
-    """获取指定时间之前且状态为已发货的订单"""
+    """锁定一批创建时间早于指定时间且仍处于待支付状态的订单 (跳过被锁定的行)"""
     stmt = (
         select(Order)
-        .where(Order.status == "shipped")  # 已发货
-        .where(Order.shipped_at < before_time)
+        .where(Order.status == "pending", Order.created_at < before_time)
+        .order_by(Order.created_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
     )
     result = await session.execute(stmt)
     return result.scalars().all()
 
 
-async def get_expired_pending_orders(
-    session: AsyncSession, before_time
+async def lock_pending_by_ids(
+    session: AsyncSession,
+    order_ids: Sequence[uuid.UUID | str],
+    created_before: datetime | None = None,
 ) -> Sequence[Order]:
-    """获取创建时间早于指定时间且仍处于待支付状态的订单"""
+    """锁定指定ID中仍处于待支付状态的订单 (跳过已被其他事务锁定的行)"""
+    if not order_ids:
+        return []
     stmt = (
         select(Order)
-        .where(Order.status == "pending")
-        .where(Order.created_at < before_time)
+        .where(Order.id.in_(order_ids), Order.status == "pending")
+        .with_for_update(skip_locked=True)
     )
+    if created_before is not None:
+        stmt = stmt.where(Order.created_at <= created_before)
     result = await session.execute(stmt)
     return result.scalars().all()
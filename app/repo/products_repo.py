@@ -1,15 +1,69 @@
 """商品仓储层：商品数据访问"""
 
+import re
 import uuid
+from collections.abc import Sequence
+from datetime import UTC, datetime
+from decimal import Decimal
 from typing import cast
 
+from sqlalchemy import (
+    ColumnElement,
+    Integer,
+    case,
+    column,
+    exists,
+    func,
+    insert,
+    literal,
+    select,
+    values,
+)
 from sqlalchemy import delete as sa_delete
-from sqlalchemy import exists, func, insert, select
 from sqlalchemy import update as sa_update
+from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.engine import CursorResult
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.entity.pgsql import Merchant, Product, ProductCategory
+from app.entity.pgsql import (
+    Merchant,
+    Product,
+    ProductCategory,
+    Promotion,
+    PromotionProduct,
+)
+from app.utils.common import escape_like
+
+_SEARCH_TOKEN = re.compile(r"\w+")
+
+
+def build_prefix_tsquery(keyword: str) -> str | None:
+    """将关键字拆词为前缀匹配的 tsquery 文本，如 "塞尔达 ns" -> "塞尔达:* & ns:*" """
+    tokens = _SEARCH_TOKEN.findall(keyword.lower())
+    return " & ".join(f"{t}:*" for t in tokens) or None
+
+
+def search_condition(
+    keyword: str,
+) -> tuple[ColumnElement[bool], ColumnElement[float]]:
+    """
+    商品搜索条件与相关度
+
+    英文/数字词走 tsvector 前缀匹配 (GIN)，中文子串走 pg_trgm 索引的 ILIKE，
+    相关度为 ts_rank_cd 与名称三元组相似度之和
+    """
+    pattern = f"%{escape_like(keyword)}%"
+    condition = Product.name.ilike(pattern, escape="\\") | Product.description.ilike(
+        pattern, escape="\\"
+    )
+    rank: ColumnElement[float] = func.similarity(Product.name, keyword)
+
+    query_text = build_prefix_tsquery(keyword)
+    if query_text:
+        ts_query = func.to_tsquery("simple", query_text)
+        condition = condition | Product.search_vector.bool_op("@@")(ts_query)
+        rank = rank + func.ts_rank_cd(Product.search_vector, ts_query)
+    return condition, rank
 
 
 async def get_by_id(session: AsyncSession, product_id: str) -> Product | None:
@@ -54,9 +108,11 @@ async def get_list_by_merchant(
     # 基础查询
     base_stmt = select(Product).where(Product.merchant_id == merchant_id)
 
-    # 关键字搜索
+    # 关键字搜索 (名称三元组索引)
     if keyword:
-        base_stmt = base_stmt.where(Product.name.ilike(f"%{keyword}%"))
+        base_stmt = base_stmt.where(
+            Product.name.ilike(f"%{escape_like(keyword)}%", escape="\\")
+        )
 
     # 状态筛选
     if status:
@@ -93,21 +149,26 @@ async def get_public_list(
     page_size: int = 20,
     keyword: str | None = None,
     category_id: str | None = None,
+    min_price: Decimal | None = None,
+    max_price: Decimal | None = None,
     sort_by: str = "newest",
 ) -> tuple[list[tuple[Product, uuid.UUID]], int]:
-    """获取公开商品列表（仅上架商品）- 返回 (Product, merchant_user_id)"""
+    """获取公开商品列表（仅上架商品，价格筛选与排序按促销后的实际价格）- 返回 (Product, merchant_user_id)"""
     base_stmt = (
         select(Product, Merchant.user_id)
         .join(Merchant, Product.merchant_id == Merchant.id)
         .where(Product.status == "on")
     )
+    if min_price is not None:
+        base_stmt = base_stmt.where(Product.effective_price >= min_price)
+    if max_price is not None:
+        base_stmt = base_stmt.where(Product.effective_price <= max_price)
 
+    rank = None
     if keyword:
-        # 支持名称或描述搜索
-        base_stmt = base_stmt.where(
-            (Product.name.ilike(f"%{keyword}%"))
-            | (Product.description.ilike(f"%{keyword}%"))
-        )
+        # 支持名称或描述搜索 (全文检索 + 三元组索引)
+        condition, rank = search_condition(keyword)
+        base_stmt = base_stmt.where(condition)
 
     if category_id:
         # 通过子查询筛选分类
@@ -120,10 +181,14 @@ async def get_public_list(
         )
 
     # 排序逻辑
-    if sort_by == "price_asc":
-        base_stmt = base_stmt.order_by(Product.price.asc())
+    if sort_by == "relevance" and rank is not None:
+        base_stmt = base_stmt.order_by(
+            rank.desc(), Product.popularity_score.desc(), Product.created_at.desc()
+        )
+    elif sort_by == "price_asc":
+        base_stmt = base_stmt.order_by(Product.effective_price.asc())
     elif sort_by == "price_desc":
-        base_stmt = base_stmt.order_by(Product.price.desc())
+        base_stmt = base_stmt.order_by(Product.effective_price.desc())
     elif sort_by == "popularity_desc":
         base_stmt = base_stmt.order_by(
             Product.popularity_score.desc(),
@@ -134,8 +199,8 @@ async def get_public_list(
     else:  # newest
         base_stmt = base_stmt.order_by(Product.created_at.desc())
 
-    # 获取总数
-    count_stmt = select(func.count()).select_from(base_stmt.subquery())
+    # 获取总数 (去掉排序，避免为计数计算相关度)
+    count_stmt = select(func.count()).select_from(base_stmt.order_by(None).subquery())
     total = (await session.execute(count_stmt)).scalar() or 0
 
     # 分页
@@ -234,6 +299,54 @@ async def deduct_stock(
     return (result.rowcount or 0) > 0
 
 
+async def deduct_stock_many(
+    session: AsyncSession, items: list[tuple[uuid.UUID, int]]
+) -> list[uuid.UUID]:
+    """
+    单条 UPDATE ... FROM (VALUES ...) 批量扣减库存
+
+    :param items: [(product_id, quantity), ...]，同一商品会被合并
+    :return: 未通过 stock >= qty 校验的商品ID列表（为空表示全部成功）
+    """
+    merged: dict[uuid.UUID, int] = {}
+    for product_id, quantity in items:
+        if quantity > 0:
+            merged[product_id] = merged.get(product_id, 0) + quantity
+    if not merged:
+        return []
+
+    lines = values(
+        column("product_id", UUID(as_uuid=True)),
+        column("qty", Integer),
+        name="lines",
+    ).data(list(merged.items()))
+    stmt = (
+        sa_update(Product)
+        .where(Product.id == lines.c.product_id, Product.stock >= lines.c.qty)
+        .values(stock=Product.stock - lines.c.qty)
+        .returning(Product.id)
+    )
+    updated = set((await session.execute(stmt)).scalars().all())
+    return [pid for pid in merged if pid not in updated]
+
+
+async def get_stock_page(
+    session: AsyncSession,
+    *,
+    after_id: uuid.UUID | None = None,
+    limit: int = 500,
+    status: str | None = None,
+) -> list[tuple[uuid.UUID, int]]:
+    """按主键游标分页读取商品库存 (id, stock)，用于库存预热与对账"""
+    stmt = select(Product.id, Product.stock).order_by(Product.id).limit(limit)
+    if after_id is not None:
+        stmt = stmt.where(Product.id > after_id)
+    if status:
+        stmt = stmt.where(Product.status == status)
+    result = await session.execute(stmt)
+    return [(row[0], int(row[1])) for row in result.all()]
+
+
 async def recover_stock(
     session: AsyncSession, product_id: uuid.UUID, quantity: int
 ) -> None:
@@ -249,68 +362,139 @@ async def recover_stock(
     await session.flush()
 
 
-async def increment_views(session: AsyncSession, product_id: uuid.UUID | str) -> None:
-    """增加浏览量并更新人气分"""
-    stmt = select(Product).where(Product.id == product_id).with_for_update()
-    product = (await session.execute(stmt)).scalar_one_or_none()
-    if product:
-        product.views_count += 1
-        # 人气分计算公式：销量*10 + 收藏*5 + 点赞*2 + 浏览*1
-        product.popularity_score = (
-            (product.sales_count * 10)
-            + (product.favorites_count * 5)
-            + (product.likes_count * 2)
-            + (product.views_count * 1)
-        )
-        await session.flush()
+async def recover_stock_many(
+    session: AsyncSession, items: list[tuple[uuid.UUID, int]]
+) -> None:
+    """按商品聚合后，单条 UPDATE ... FROM (VALUES ...) 批量恢复库存"""
+    merged: dict[uuid.UUID, int] = {}
+    for product_id, quantity in items:
+        if quantity > 0:
+            merged[product_id] = merged.get(product_id, 0) + quantity
+    if not merged:
+        return
 
+    lines = values(
+        column("product_id", UUID(as_uuid=True)),
+        column("qty", Integer),
+        name="lines",
+    ).data(list(merged.items()))
+    stmt = (
+        sa_update(Product)
+        .where(Product.id == lines.c.product_id)
+        .values(stock=Product.stock + lines.c.qty)
+    )
+    await session.execute(stmt)
 
-async def increment_sales(
-    session: AsyncSession, product_id: uuid.UUID | str, quantity: int
+
+async def apply_counter_deltas(
+    session: AsyncSession, deltas: dict[uuid.UUID, dict[str, int]]
 ) -> None:
-    """增加销量并更新人气分"""
-    stmt = select(Product).where(Product.id == product_id).with_for_update()
-    product = (await session.execute(stmt)).scalar_one_or_none()
-    if product:
-        product.sales_count += quantity
-        product.popularity_score = (
-            (product.sales_count * 10)
-            + (product.favorites_count * 5)
-            + (product.likes_count * 2)
-            + (product.views_count * 1)
-        )
-        await session.flush()
+    """
+    单条 UPDATE ... FROM (VALUES ...) 批量累加浏览/销量/收藏/点赞计数，并在 SQL 中重算人气分
 
+    :param deltas: {商品ID: {"views"|"sales"|"favorites"|"likes": 增量}}
+    """
+    if not deltas:
+        return
 
-async def change_favorites_count(
-    session: AsyncSession, product_id: uuid.UUID | str, delta: int
-) -> None:
-    """更新收藏数并同步人气分"""
-    stmt = select(Product).where(Product.id == product_id).with_for_update()
-    product = (await session.execute(stmt)).scalar_one_or_none()
-    if product:
-        product.favorites_count = max(0, product.favorites_count + delta)
-        product.popularity_score = (
-            (product.sales_count * 10)
-            + (product.favorites_count * 5)
-            + (product.likes_count * 2)
-            + (product.views_count * 1)
+    rows = [
+        (
+            product_id,
+            fields.get("views", 0),
+            fields.get("sales", 0),
+            fields.get("favorites", 0),
+            fields.get("likes", 0),
+        )
+        # 按商品 ID 排序，保证并发批次的行锁顺序一致
+        for product_id, fields in sorted(deltas.items())
+    ]
+    d = values(
+        column("product_id", UUID(as_uuid=True)),
+        column("views", Integer),
+        column("sales", Integer),
+        column("favorites", Integer),
+        column("likes", Integer),
+        name="d",
+    ).data(rows)
+
+    views = func.greatest(0, Product.views_count + d.c.views)
+    sales = func.greatest(0, Product.sales_count + d.c.sales)
+    favorites = func.greatest(0, Product.favorites_count + d.c.favorites)
+    likes = func.greatest(0, Product.likes_count + d.c.likes)
+    stmt = (
+        sa_update(Product)
+        .where(Product.id == d.c.product_id)
+        .values(
+            views_count=views,
+            sales_count=sales,
+            favorites_count=favorites,
+            likes_count=likes,
+            # 人气分计算公式：销量*10 + 收藏*5 + 点赞*2 + 浏览*1
+            popularity_score=sales * 10 + favorites * 5 + likes * 2 + views,
         )
-        await session.flush()
+    )
+    await session.execute(stmt)
 
 
-async def change_likes_count(
-    session: AsyncSession, product_id: uuid.UUID | str, delta: int
-) -> None:
-    """更新点赞数并同步人气分"""
-    stmt = select(Product).where(Product.id == product_id).with_for_update()
-    product = (await session.execute(stmt)).scalar_one_or_none()
-    if product:
-        product.likes_count = max(0, product.likes_count + delta)
-        product.popularity_score = (
-            (product.sales_count * 10)
-            + (product.favorites_count * 5)
-            + (product.likes_count * 2)
-            + (product.views_count * 1)
+def discounted_price_expr(
+    price: ColumnElement[Decimal],
+    discount_type: ColumnElement[str],
+    discount_value: ColumnElement[Decimal],
+) -> ColumnElement[Decimal]:
+    """促销价计算：percent 为减免百分比 (20 即打八折)，fixed 为立减金额 (最低 0.01)"""
+    return case(
+        (
+            discount_type == "percent",
+            func.round(price * func.greatest(100 - discount_value, 0) / 100, 2),
+        ),
+        (
+            discount_type == "fixed",
+            func.greatest(price - discount_value, literal(Decimal("0.01"))),
+        ),
+        else_=price,
+    )
+
+
+async def refresh_effective_prices(
+    session: AsyncSession,
+    product_ids: Sequence[uuid.UUID] | None = None,
+    now: datetime | None = None,
+) -> int:
+    """
+    按当前最新创建的进行中促销物化商品实际价格，只写入发生变化的行，返回更新行数
+
+    :param product_ids: 为空时全量刷新
+    """
+    if product_ids is not None and not product_ids:
+        return 0
+    now = now or datetime.now(UTC)
+
+    best_price = (
+        select(
+            discounted_price_expr(
+                Product.price, Promotion.discount_type, Promotion.discount_value
+            )
+        )
+        .select_from(PromotionProduct)
+        .join(Promotion, Promotion.id == PromotionProduct.promotion_id)
+        .where(
+            PromotionProduct.product_id == Product.id,
+            Promotion.status == "active",
+            Promotion.start_at <= now,
+            Promotion.end_at >= now,
         )
-        await session.flush()
+        .order_by(Promotion.created_at.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    new_price = func.coalesce(best_price, Product.price)
+    stmt = (
+        sa_update(Product)
+        .where(Product.effective_price.is_distinct_from(new_price))
+        .values(effective_price=new_price)
+        .execution_options(synchronize_session=False)
+    )
+    if product_ids is not None:
+        stmt = stmt.where(Product.id.in_(product_ids))
+    result = cast(CursorResult, await session.execute(stmt))
+    return result.rowcount or 0
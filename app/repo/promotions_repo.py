@@ -2,7 +2,7 @@ import uuid
 from collections.abc import Sequence
 from datetime import datetime
 
-from sqlalchemy import delete, func, select, update
+from sqlalchemy import delete, func, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.entity.pgsql.products import Product
@@ -30,6 +30,16 @@ async def get_promotion_products(
     return result.scalars().all()
 
 
+async def get_promotion_product_ids(
+    session: AsyncSession, promotion_id: uuid.UUID
+) -> list[uuid.UUID]:
+    stmt = select(PromotionProduct.product_id).where(
+        PromotionProduct.promotion_id == promotion_id
+    )
+    result = await session.execute(stmt)
+    return list(result.scalars().all())
+
+
 async def create_promotion(
     session: AsyncSession, promotion: Promotion, product_ids: list[uuid.UUID]
 ) -> Promotion:
@@ -104,27 +114,34 @@ async def get_merchant_promotions(
     return result.scalars().all(), total or 0
 
 
-async def get_active_promotions_by_product_ids(
-    session: AsyncSession, product_ids: list[uuid.UUID]
+async def get_unexpired_promotions(
+    session: AsyncSession, now: datetime
 ) -> Sequence[tuple[uuid.UUID, Promotion]]:
-    """获取指定商品的当前有效促销活动"""
-    if not product_ids:
-        return []
+    """获取全部未结束 (进行中及未开始) 的启用促销及其关联商品，按创建时间倒序"""
+    stmt = (
+        select(PromotionProduct.product_id, Promotion)
+        .join(Promotion, Promotion.id == PromotionProduct.promotion_id)
+        .where(Promotion.status == "active", Promotion.end_at >= now)
+        .order_by(Promotion.created_at.desc())
+    )
+    result = await session.execute(stmt)
+    return result.tuples().all()
 
-    now = datetime.now()
 
+async def get_boundary_product_ids(
+    session: AsyncSession, since: datetime, until: datetime
+) -> list[uuid.UUID]:
+    """获取在 [since, until] 内开始或结束的促销所关联的商品"""
     stmt = (
-        select(PromotionProduct.product_id, Promotion)
+        select(PromotionProduct.product_id)
         .join(Promotion, Promotion.id == PromotionProduct.promotion_id)
         .where(
-            PromotionProduct.product_id.in_(product_ids),
-            Promotion.status == "active",
-            Promotion.start_at <= now,
-            Promotion.end_at >= now,
+            or_(
+                Promotion.start_at.between(since, until),
+                Promotion.end_at.between(since, until),
+            )
         )
-        # 按照创建时间倒序，确保后续处理时优先取最新的（或在应用层处理优先级）
-        .order_by(Promotion.created_at.desc())
+        .distinct()
     )
-
     result = await session.execute(stmt)
-    return result.tuples().all()
+    return list(result.scalars().all())
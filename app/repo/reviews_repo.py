@@ -1,10 +1,18 @@
 import uuid
 
-from beanie.odm.operators.find.comparison import Eq
+from beanie.odm.operators.find.comparison import Eq, In
+from pydantic import BaseModel
 
 from app.entity.mongodb import ProductReview
 
 
+class ReviewItemKey(BaseModel):
+    """评价的 (订单ID, 商品ID) 投影，用于批量判断是否已评价"""
+
+    order_id: uuid.UUID
+    product_id: uuid.UUID
+
+
 class ReviewsRepo:
     async def create(self, review: ProductReview) -> ProductReview:
         """创建评价"""
@@ -24,6 +32,24 @@ class ReviewsRepo:
             Eq("product_id", uuid.UUID(product_id)),
         )
 
+    async def get_reviewed_item_keys(
+        self, pairs: list[tuple[uuid.UUID, uuid.UUID]]
+    ) -> set[tuple[uuid.UUID, uuid.UUID]]:
+        """批量查询 (订单ID, 商品ID) 中已被评价的组合 (单次 $in 查询)"""
+        if not pairs:
+            return set()
+        order_ids = list({order_id for order_id, _ in pairs})
+        product_ids = list({product_id for _, product_id in pairs})
+        keys = (
+            await ProductReview.find(
+                In("order_id", order_ids), In("product_id", product_ids)
+            )
+            .project(ReviewItemKey)
+            .to_list()
+        )
+        wanted = set(pairs)
+        return {(k.order_id, k.product_id) for k in keys} & wanted
+
     async def get_list_by_product(
         self, product_id: str, page: int = 1, page_size: int = 10
     ) -> tuple[list[ProductReview], int]:
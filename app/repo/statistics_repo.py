@@ -1,33 +1,175 @@
 import uuid
-from datetime import UTC, datetime, timedelta
+from datetime import UTC, date, datetime, timedelta
 from typing import Any
 
-from sqlalchemy import Date, cast, desc, func, select
+from sqlalchemy import Date, cast, delete, desc, func, literal, literal_column, select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.entity.pgsql import Order, OrderItem, Product
+from app.entity.pgsql import (
+    MerchantSalesDaily,
+    Order,
+    OrderItem,
+    Product,
+    ProductSalesDaily,
+)
 
+# 计入销售统计的订单状态 (已支付且未退款)
+SALES_ORDER_STATUSES = ("paid", "shipped", "completed", "refunding")
 
-async def get_dashboard_overview(
-    session: AsyncSession, merchant_id: str | uuid.UUID
-) -> dict[str, Any]:
-    """获取仪表盘概览数据 (不包含 cancelled 订单)"""
-    # 基础查询: 关联 order_items, orders, products
-    # 筛选条件: product.merchant_id == merchant_id, order.status != 'cancelled'
 
-    # 1. 计算总销售额 & 总订单数 (属于该商家的)
-    stmt_total = (
+def _paid_date_expr():
+    """订单支付日期 (按 UTC 截断)"""
+    # 时区写为字面量，保证 SELECT 与 GROUP BY 中的表达式完全一致
+    return cast(func.timezone(literal_column("'UTC'"), Order.paid_at), Date)
+
+
+async def apply_order_sales(
+    session: AsyncSession, order_id: uuid.UUID, stat_date: date, sign: int = 1
+) -> None:
+    """
+    将一笔订单的明细增量累加到日汇总表 (支付时 sign=1，退款时 sign=-1)
+
+    :param stat_date: 订单的支付日期 (UTC)，退款时同样冲减支付当日
+    """
+    merchant_rows = (
+        select(
+            OrderItem.merchant_id,
+            literal(stat_date, Date),
+            sign * func.sum(OrderItem.unit_price * OrderItem.quantity),
+            literal(sign),
+            sign * func.sum(OrderItem.quantity),
+        )
+        .where(OrderItem.order_id == order_id)
+        .group_by(OrderItem.merchant_id)
+    )
+    stmt = insert(MerchantSalesDaily).from_select(
+        ["merchant_id", "stat_date", "sales_amount", "order_count", "sales_quantity"],
+        merchant_rows,
+    )
+    await session.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["merchant_id", "stat_date"],
+            set_={
+                "sales_amount": MerchantSalesDaily.sales_amount
+                + stmt.excluded.sales_amount,
+                "order_count": MerchantSalesDaily.order_count
+                + stmt.excluded.order_count,
+                "sales_quantity": MerchantSalesDaily.sales_quantity
+                + stmt.excluded.sales_quantity,
+                "updated_at": func.now(),
+            },
+        )
+    )
+
+    product_rows = (
+        select(
+            OrderItem.product_id,
+            literal(stat_date, Date),
+            OrderItem.merchant_id,
+            sign * func.sum(OrderItem.unit_price * OrderItem.quantity),
+            sign * func.sum(OrderItem.quantity),
+        )
+        .where(OrderItem.order_id == order_id)
+        .group_by(OrderItem.product_id, OrderItem.merchant_id)
+    )
+    pstmt = insert(ProductSalesDaily).from_select(
+        ["product_id", "stat_date", "merchant_id", "sales_amount", "sales_quantity"],
+        product_rows,
+    )
+    await session.execute(
+        pstmt.on_conflict_do_update(
+            index_elements=["product_id", "stat_date"],
+            set_={
+                "sales_amount": ProductSalesDaily.sales_amount
+                + pstmt.excluded.sales_amount,
+                "sales_quantity": ProductSalesDaily.sales_quantity
+                + pstmt.excluded.sales_quantity,
+                "updated_at": func.now(),
+            },
+        )
+    )
+
+
+async def rebuild_sales_rollups(
+    session: AsyncSession, since: date | None = None
+) -> None:
+    """从订单明细重建日汇总 (since 为空时全量重建，用于初始化与纠偏)"""
+    paid_date = _paid_date_expr()
+    conditions = [Order.status.in_(SALES_ORDER_STATUSES), Order.paid_at.is_not(None)]
+    if since is not None:
+        conditions.append(paid_date >= since)
+        await session.execute(
+            delete(MerchantSalesDaily).where(MerchantSalesDaily.stat_date >= since)
+        )
+        await session.execute(
+            delete(ProductSalesDaily).where(ProductSalesDaily.stat_date >= since)
+        )
+    else:
+        await session.execute(delete(MerchantSalesDaily))
+        await session.execute(delete(ProductSalesDaily))
+
+    merchant_rows = (
         select(
-            func.sum(OrderItem.unit_price * OrderItem.quantity).label("total_sales"),
-            func.count(func.distinct(Order.id)).label("order_count"),
+            OrderItem.merchant_id,
+            paid_date,
+            func.sum(OrderItem.unit_price * OrderItem.quantity),
+            func.count(func.distinct(Order.id)),
+            func.sum(OrderItem.quantity),
         )
-        .select_from(OrderItem)
         .join(Order, Order.id == OrderItem.order_id)
-        .join(Product, Product.id == OrderItem.product_id)
-        .where(Product.merchant_id == merchant_id, Order.status != "cancelled")
+        .where(*conditions)
+        .group_by(OrderItem.merchant_id, paid_date)
     )
-    result_total = await session.execute(stmt_total)
-    row_total = result_total.first()
+    await session.execute(
+        insert(MerchantSalesDaily).from_select(
+            [
+                "merchant_id",
+                "stat_date",
+                "sales_amount",
+                "order_count",
+                "sales_quantity",
+            ],
+            merchant_rows,
+        )
+    )
+
+    product_rows = (
+        select(
+            OrderItem.product_id,
+            paid_date,
+            OrderItem.merchant_id,
+            func.sum(OrderItem.unit_price * OrderItem.quantity),
+            func.sum(OrderItem.quantity),
+        )
+        .join(Order, Order.id == OrderItem.order_id)
+        .where(*conditions)
+        .group_by(OrderItem.product_id, paid_date, OrderItem.merchant_id)
+    )
+    await session.execute(
+        insert(ProductSalesDaily).from_select(
+            [
+                "product_id",
+                "stat_date",
+                "merchant_id",
+                "sales_amount",
+                "sales_quantity",
+            ],
+            product_rows,
+        )
+    )
+
+
+async def get_dashboard_overview(
+    session: AsyncSession, merchant_id: str | uuid.UUID
+) -> dict[str, Any]:
+    """获取仪表盘概览数据 (读取商家日汇总，统计已支付且未退款的订单)"""
+    # 1. 计算总销售额 & 总订单数 (属于该商家的)
+    stmt_total = select(
+        func.sum(MerchantSalesDaily.sales_amount).label("total_sales"),
+        func.sum(MerchantSalesDaily.order_count).label("order_count"),
+    ).where(MerchantSalesDaily.merchant_id == merchant_id)
+    row_total = (await session.execute(stmt_total)).first()
     if row_total:
         total_sales = row_total.total_sales or 0
         order_count = row_total.order_count or 0
@@ -43,19 +185,9 @@ async def get_dashboard_overview(
     product_count = (await session.execute(stmt_products)).scalar() or 0
 
     # 3. 计算今日销售额
-    now = datetime.now(UTC)
-    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-
-    stmt_today = (
-        select(func.sum(OrderItem.unit_price * OrderItem.quantity).label("today_sales"))
-        .select_from(OrderItem)
-        .join(Order, Order.id == OrderItem.order_id)
-        .join(Product, Product.id == OrderItem.product_id)
-        .where(
-            Product.merchant_id == merchant_id,
-            Order.status != "cancelled",
-            Order.created_at >= today_start,
-        )
+    stmt_today = select(MerchantSalesDaily.sales_amount).where(
+        MerchantSalesDaily.merchant_id == merchant_id,
+        MerchantSalesDaily.stat_date == datetime.now(UTC).date(),
     )
     today_sales = (await session.execute(stmt_today)).scalar() or 0
 
@@ -70,29 +202,20 @@ async def get_dashboard_overview(
 async def get_sales_trend(
     session: AsyncSession, merchant_id: str | uuid.UUID, days: int = 30
 ) -> list[dict[str, Any]]:
-    """获取销量趋势 (按天聚合)"""
-    start_date = datetime.now(UTC) - timedelta(days=days)
-
-    # 按天截断日期 (PostgreSQL 使用 DATE_TRUNC 或转换为 date)
-    # 为了兼容性，我们可以强制转换 created_at 为 date
-    date_expr = cast(Order.created_at, Date).label("date")
+    """获取销量趋势 (按天读取商家日汇总)"""
+    start_date = (datetime.now(UTC) - timedelta(days=days)).date()
 
     stmt = (
         select(
-            date_expr,
-            func.sum(OrderItem.unit_price * OrderItem.quantity).label("sales"),
-            func.count(func.distinct(Order.id)).label("orders"),
+            MerchantSalesDaily.stat_date,
+            MerchantSalesDaily.sales_amount,
+            MerchantSalesDaily.order_count,
         )
-        .select_from(OrderItem)
-        .join(Order, Order.id == OrderItem.order_id)
-        .join(Product, Product.id == OrderItem.product_id)
         .where(
-            Product.merchant_id == merchant_id,
-            Order.status != "cancelled",
-            Order.created_at >= start_date,
+            MerchantSalesDaily.merchant_id == merchant_id,
+            MerchantSalesDaily.stat_date >= start_date,
         )
-        .group_by(date_expr)
-        .order_by(date_expr)
+        .order_by(MerchantSalesDaily.stat_date)
     )
 
     result = await session.execute(stmt)
@@ -100,17 +223,16 @@ async def get_sales_trend(
 
     # 填充缺失的日期
     trend_dict = {
-        row.date.strftime("%Y-%m-%d"): {
-            "sales": row.sales or 0,
-            "orders": row.orders or 0,
+        row.stat_date.strftime("%Y-%m-%d"): {
+            "sales": row.sales_amount or 0,
+            "orders": row.order_count or 0,
         }
         for row in rows
-        if row.date
     }
 
     # 生成按天的连续数据
     trend_data = []
-    current_date = start_date.date()
+    current_date = start_date
     end_date = datetime.now(UTC).date()
 
     while current_date <= end_date:
@@ -127,21 +249,28 @@ async def get_sales_trend(
 async def get_top_products(
     session: AsyncSession, merchant_id: str | uuid.UUID, limit: int = 5
 ) -> list[dict[str, Any]]:
-    """获取商品销量排行"""
+    """获取商品销量排行 (读取商品日汇总)"""
+    sales = (
+        select(
+            ProductSalesDaily.product_id,
+            func.sum(ProductSalesDaily.sales_amount).label("sales_amount"),
+            func.sum(ProductSalesDaily.sales_quantity).label("sales_quantity"),
+        )
+        .where(ProductSalesDaily.merchant_id == merchant_id)
+        .group_by(ProductSalesDaily.product_id)
+        .subquery()
+    )
     stmt = (
         select(
             Product.id,
             Product.name,
             Product.image_url,
-            func.sum(OrderItem.unit_price * OrderItem.quantity).label("sales_amount"),
-            func.sum(OrderItem.quantity).label("sales_quantity"),
+            sales.c.sales_amount,
+            sales.c.sales_quantity,
         )
-        .select_from(OrderItem)
-        .join(Order, Order.id == OrderItem.order_id)
-        .join(Product, Product.id == OrderItem.product_id)
-        .where(Product.merchant_id == merchant_id, Order.status != "cancelled")
-        .group_by(Product.id, Product.name, Product.image_url)
-        .order_by(desc("sales_quantity"))
+        .join(sales, sales.c.product_id == Product.id)
+        .where(sales.c.sales_quantity > 0)
+        .order_by(desc(sales.c.sales_quantity))
         .limit(limit)
     )
 
@@ -53,7 +53,7 @@ from .product import (
     ProductStatusIn,
     ProductUpdateIn,
 )
-from .response import ErrorResponse, SuccessResponse
+from .response import ErrorResponse, RawSuccessResponse, SuccessResponse
 from .user import (
     PointLogListOut,
     PointLogOut,
@@ -77,6 +77,7 @@ __all__ = [
     "CartOut",
     "CategoryOut",
     "ErrorResponse",
+    "RawSuccessResponse",
     "FavoriteAddIn",
     "FavoriteBatchDeleteIn",
     "FavoriteCheckOut",
@@ -82,9 +82,10 @@ class PostItemOut(BaseModel):
 
 class PostListOut(BaseModel):
     items: list[PostItemOut]
-    total: int
+    total: int | None = Field(None, description="总数 (游标翻页时为空)")
     page: int
     page_size: int
+    next_cursor: str | None = Field(None, description="下一页游标，为空表示没有更多")
 
 
 class PostDetailOut(PostItemOut):
@@ -82,6 +82,9 @@ class OrderListOut(BaseModel):
     """订单列表响应"""
 
     items: list[OrderOut]
-    total: int
+    total: int | None = Field(
+        None, description="总数 (短时缓存，with_total=false 时为空)"
+    )
     page: int
     page_size: int
+    next_cursor: str | None = Field(None, description="下一页游标，为空表示没有更多")
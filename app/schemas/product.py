@@ -80,6 +80,7 @@ class ProductPublicOut(BaseModel):
     name: str = Field(description="商品名称")
     description: str | None = Field(default=None, description="商品描述")
     price: Decimal = Field(description="商品价格")
+    effective_price: Decimal = Field(description="实际价格(促销后)")
     stock: int = Field(description="库存数量")
     image_url: str | None = Field(default=None, description="商品图片URL")
     sales_count: int = Field(description="销售数量")
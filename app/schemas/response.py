@@ -1,6 +1,7 @@
+import json
 from typing import Generic, TypeVar
 
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel, Field
 
 T = TypeVar("T")
@@ -19,3 +20,11 @@ class ErrorResponse:
         return JSONResponse(
             status_code=status_code, content={"message": message}, headers=headers
         )
+
+
+class RawSuccessResponse:
+    @staticmethod
+    def build(message: str, data: bytes) -> Response:
+        """将已序列化的 data JSON 直接拼入成功响应，跳过模型校验与序列化"""
+        body = b'{"message":' + json.dumps(message).encode() + b',"data":' + data + b"}"
+        return Response(content=body, media_type="application/json")
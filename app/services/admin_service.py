@@ -12,7 +12,6 @@ from app.repo import (
     admin_community_repo,
     admin_log_repo,
     admin_products_repo,
-    admin_stats_repo,
     admin_users_repo,
     categories_repo,
     community_repo,
@@ -29,6 +28,9 @@ from app.schemas.community import CommentItemOut, CommentListOut, PostListOut
 from app.schemas.order import OrderItemOut, OrderListOut, OrderOut
 from app.schemas.product import ProductListOut, ProductOut
 from app.schemas.review import ReviewListOut, ReviewOut, ReviewUserOut
+from app.services.platform_stats_service import platform_stats_service
+from app.services.product_cache_service import product_cache_service
+from app.utils import decode_rank_cursor, encode_rank_cursor
 from app.utils.redis_cache import cache_del
 
 
@@ -39,9 +41,8 @@ class AdminService:
 
     async def get_dashboard_stats(self) -> AdminDashboardOut:
         """获取管理后台仪表盘统计数据"""
-        async with get_pg() as session:
-            data = await admin_stats_repo.get_platform_stats(session)
-            return AdminDashboardOut.model_validate(data)
+        data = await platform_stats_service.get_stats()
+        return AdminDashboardOut.model_validate(data)
 
     # --- 用户管理 ---
 
@@ -84,6 +85,7 @@ class AdminService:
             user = await admin_users_repo.get_user_by_id(session, user_id)
             if not user:
                 raise NotFoundError(USER_NOT_FOUND)
+            changed = user.is_active
             await admin_users_repo.set_user_active(session, user_id, False)
 
             action = "disable_user"
@@ -109,6 +111,12 @@ class AdminService:
                 detail={"message": "暂无"},
             )
 
+        # 提交成功后再调整用户计数，回滚时不影响 Redis
+        if changed:
+            await platform_stats_service.incr(
+                platform_stats_service.role_field(user.role), -1
+            )
+
     async def enable_user(self, user_id: str, admin_id: str) -> None:
         """启用用户"""
         admin_uuid = uuid.UUID(admin_id)
@@ -116,6 +124,7 @@ class AdminService:
             user = await admin_users_repo.get_user_by_id(session, user_id)
             if not user:
                 raise NotFoundError(USER_NOT_FOUND)
+            changed = not user.is_active
             await admin_users_repo.set_user_active(session, user_id, True)
 
             action = "enable_user"
@@ -141,6 +150,12 @@ class AdminService:
                 detail={"message": "暂无"},
             )
 
+        # 提交成功后再调整用户计数，回滚时不影响 Redis
+        if changed:
+            await platform_stats_service.incr(
+                platform_stats_service.role_field(user.role), 1
+            )
+
     # --- 商品管理 ---
 
     async def get_all_products(
@@ -186,6 +201,8 @@ class AdminService:
                 detail={"product_name": product.name},
             )
 
+        await product_cache_service.invalidate([product_id])
+
     async def force_online_product(self, product_id: str, admin_id: str) -> None:
         """强制上架商品"""
         admin_uuid = uuid.UUID(admin_id)
@@ -203,6 +220,8 @@ class AdminService:
                 detail={"product_name": product.name},
             )
 
+        await product_cache_service.invalidate([product_id])
+
     # --- 分类管理 ---
 
     async def get_categories(self) -> list[CategoryOut]:
@@ -338,19 +357,26 @@ class AdminService:
         page_size: int = 20,
         keyword: str | None = None,
         is_hidden: bool | None = None,
+        cursor: str | None = None,
     ) -> PostListOut:
-        """获取全平台帖子列表"""
+        """获取全平台帖子列表 (有关键字时按相关度排序，传入游标时按 keyset 翻页)"""
         from app.repo import admin_community_repo
         from app.schemas.community import PostItemOut, PostListOut
 
         async with get_pg() as session:
-            posts, total = await admin_community_repo.get_all_posts(
+            rows, total = await admin_community_repo.get_all_posts(
                 session,
-                page=page,
-                page_size=page_size,
+                limit=page_size + 1,
+                offset=(page - 1) * page_size,
+                cursor=decode_rank_cursor(cursor) if cursor else None,
                 keyword=keyword,
                 is_hidden=is_hidden,
             )
+            posts = rows[:page_size]
+            next_cursor = None
+            if len(rows) > page_size:
+                last, _, _, rank = posts[-1]
+                next_cursor = encode_rank_cursor(rank, last.created_at, last.id)
             items = [
                 PostItemOut(
                     id=p.id,
@@ -370,9 +396,15 @@ class AdminService:
                     is_hidden=p.is_hidden,
                     created_at=p.created_at,
                 )
-                for p, author, group in posts
+                for p, author, group, _ in posts
             ]
-            return PostListOut(items=items, total=total, page=page, page_size=page_size)
+            return PostListOut(
+                items=items,
+                total=total,
+                page=page,
+                page_size=page_size,
+                next_cursor=next_cursor,
+            )
 
     async def review_post(self, post_id: str, is_hidden: bool, admin_id: str) -> None:
         """审核帖子（隐藏/显示）"""
@@ -398,7 +430,7 @@ class AdminService:
         admin_uuid = uuid.UUID(admin_id)
         post_uuid = uuid.UUID(post_id)
         async with get_pg() as session:
-            await community_repo.delete_post(session, post_uuid)
+            deleted = await community_repo.delete_post(session, post_uuid)
             await admin_log_repo.create_log(
                 session,
                 admin_id=admin_uuid,
@@ -407,6 +439,10 @@ class AdminService:
                 target_id=post_id,
             )
 
+        # 提交成功后再调整待审核计数，回滚时不影响 Redis
+        if deleted:
+            await platform_stats_service.incr("pending_audits", -1)
+
     async def get_all_comments(
         self,
         *,
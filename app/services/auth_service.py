@@ -12,6 +12,7 @@ from app.database.pgsql import get_pg
 from app.entity.pgsql import Merchant, User
 from app.repo import merchants_repo, users_repo
 from app.schemas import AuthLoginIn, AuthRegisterIn, TokenOut
+from app.services.platform_stats_service import platform_stats_service
 from app.utils import (
     delete_refresh_token,
     get_access_token,
@@ -51,6 +52,8 @@ class AuthService:
                     session, user.id, Decimal("100"), "用户注册赠送"
                 )
 
+        await platform_stats_service.incr(platform_stats_service.role_field(user.role))
+
     async def login(self, payload: AuthLoginIn) -> TokenOut:
         """用户登录服务"""
         async with get_pg() as session:
@@ -4,30 +4,29 @@ from app.database.redis import get_redis
 from app.entity.pgsql import Banner
 from app.repo import banners_repo
 from app.schemas.banner import BannerIn, BannerListOut, BannerOut, BannerUpdateIn
-from app.utils.redis_cache import cache_del, cache_get_json, cache_set_json
+from app.utils.redis_cache import cache_del, cache_get_bytes, cache_set_bytes
 
 
 class BannerService:
-    async def get_public_banners(self) -> list[BannerOut]:
-        """获取首页展示的 Banner (仅启用的)"""
+    async def get_public_banners_json(self) -> bytes:
+        """获取首页展示的 Banner (仅启用的，已序列化的 JSON，依次读取本地 L1、Redis 与数据库)"""
         cache_key = "cache:home:banners:v1"
         async with get_redis() as redis:
-            cached = await cache_get_json(redis, cache_key)
+            cached = await cache_get_bytes(redis, cache_key)
             if cached is not None:
-                return [BannerOut.model_validate(x) for x in cached]
+                return cached
 
         async with get_pg() as session:
             banners = await banners_repo.get_all(session, only_active=True)
             out = [BannerOut.model_validate(b) for b in banners]
 
         async with get_redis() as redis:
-            await cache_set_json(
+            return await cache_set_bytes(
                 redis,
                 cache_key,
                 [b.model_dump(mode="json") for b in out],
                 ttl=300,
             )
-        return out
 
     async def get_admin_banners(
         self, page: int = 1, page_size: int = 20
@@ -64,9 +64,12 @@ class CartService:
                     continue
 
                 original_price = Decimal(str(product.price))
-                current_price = original_price
+                # 优惠价读取定价引擎物化的实际价格，与下单一致
+                current_price = Decimal(str(product.effective_price))
                 active_promo = None
-                cart_original_price = None
+                cart_original_price = (
+                    original_price if current_price < original_price else None
+                )
 
                 # 应用促销逻辑
                 if product.id in active_promotions:
@@ -86,23 +89,6 @@ class CartService:
                         end_at=promo.end_at,
                     )
 
-                    # 计算优惠价
-                    if promo.discount_type == "percent":
-                        # discount_value represents "Percentage OFF" (e.g. 20 means 20% OFF, i.e. 80% price)
-                        # Previous logic was price * (value / 100) which assumed value was "Price Rate".
-                        # Correct logic: price * ((100 - value) / 100)
-                        discount_rate = (Decimal("100") - discount_value) / Decimal(
-                            "100"
-                        )
-                        discount_rate = max(discount_rate, Decimal("0"))
-                        current_price = original_price * discount_rate
-                    elif promo.discount_type == "fixed":
-                        current_price = original_price - discount_value
-                        if current_price < Decimal("0"):
-                            current_price = Decimal("0.01")  # Minimum price
-
-                    cart_original_price = original_price
-
                 subtotal = current_price * item.quantity
 
                 cart_items_out.append(
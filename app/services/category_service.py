@@ -4,29 +4,28 @@ from app.database.pgsql import get_pg
 from app.database.redis import get_redis
 from app.repo import categories_repo
 from app.schemas.category import CategoryOut
-from app.utils.redis_cache import cache_get_json, cache_set_json
+from app.utils.redis_cache import cache_get_bytes, cache_set_bytes
 
 
 class CategoryService:
     """分类服务"""
 
-    async def get_all_categories(self) -> list[CategoryOut]:
-        """获取所有分类列表"""
+    async def get_all_categories_json(self) -> bytes:
+        """获取所有分类列表 (已序列化的 JSON，依次读取本地 L1、Redis 与数据库)"""
         cache_key = "cache:home:categories:v1"
         async with get_redis() as redis:
-            cached = await cache_get_json(redis, cache_key)
+            cached = await cache_get_bytes(redis, cache_key)
             if cached is not None:
-                return [CategoryOut.model_validate(x) for x in cached]
+                return cached
 
         async with get_pg() as session:
             categories = await categories_repo.get_all(session)
             out = [CategoryOut.model_validate(c) for c in categories]
 
         async with get_redis() as redis:
-            await cache_set_json(
+            return await cache_set_bytes(
                 redis,
                 cache_key,
                 [c.model_dump(mode="json") for c in out],
                 ttl=300,
             )
-        return out
@@ -1,6 +1,9 @@
 """Service Layer for Community Features"""
 
 import uuid
+from collections.abc import Sequence
+
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.common.constants import COMMUNITY_GROUP_EXISTS, COMMUNITY_GROUP_NOT_FOUND
 from app.common.errors import (
@@ -9,6 +12,7 @@ from app.common.errors import (
     PermissionDeniedError,
 )
 from app.database.pgsql import get_pg
+from app.database.redis import get_redis
 from app.entity.mongodb.comments import Comment, CommentUserRedundancy
 from app.entity.pgsql import CommunityGroup, Post, User
 from app.repo import community_repo
@@ -26,10 +30,54 @@ from app.schemas.community import (
     PostListOut,
     PostUpdateIn,
 )
-from app.utils import check_operation_lock
+from app.services.platform_stats_service import platform_stats_service
+from app.services.post_view_service import post_view_service
+from app.services.product_counter_service import product_counter_service
+from app.utils import decode_rank_cursor, encode_rank_cursor
+from app.utils.redis_cache import cache_del
 
 
 class CommunityService:
+    # 用户已加入圈子集合的缓存时间 (秒)
+    JOINED_GROUPS_TTL = 300
+    # 占位成员：使未加入任何圈子的用户也能命中缓存
+    _EMPTY_MEMBER = "-"
+
+    @staticmethod
+    def _joined_groups_key(user_id: uuid.UUID) -> str:
+        return f"cache:community:joined:{user_id}"
+
+    async def _get_joined_group_ids(
+        self,
+        session: AsyncSession,
+        user_id: uuid.UUID,
+        group_ids: Sequence[uuid.UUID],
+    ) -> set[uuid.UUID]:
+        """批量判断加入状态：优先读取用户的已加入圈子集合缓存，未命中时查库回填"""
+        if not group_ids:
+            return set()
+        cache_key = self._joined_groups_key(user_id)
+        async with get_redis() as redis:
+            cached = await redis.smembers(cache_key)  # type: ignore
+        if cached:
+            joined = {m for m in cached if m != self._EMPTY_MEMBER}
+            return {gid for gid in group_ids if str(gid) in joined}
+
+        all_joined = await community_repo.get_joined_group_ids(session, user_id)
+        async with get_redis() as redis:
+            pipe = redis.pipeline()
+            await pipe.delete(cache_key)
+            await pipe.sadd(  # type: ignore
+                cache_key, self._EMPTY_MEMBER, *(str(gid) for gid in all_joined)
+            )
+            await pipe.expire(cache_key, self.JOINED_GROUPS_TTL)
+            await pipe.execute()
+        return {gid for gid in group_ids if gid in all_joined}
+
+    async def _invalidate_joined_groups(self, user_id: uuid.UUID) -> None:
+        async with get_redis() as redis:
+            await cache_del(redis, self._joined_groups_key(user_id))
+
     # --- Groups ---
 
     async def create_group(
@@ -101,13 +149,15 @@ class CommunityService:
                 session, uid, page, page_size
             )
 
+            joined_ids = (
+                await self._get_joined_group_ids(session, uid, [g.id for g in groups])
+                if uid
+                else set()
+            )
+
             items = []
             for g in groups:
-                is_joined = (
-                    await community_repo.check_joined(session, uid, g.id)
-                    if uid
-                    else False
-                )
+                is_joined = g.id in joined_ids
                 items.append(
                     GroupItemOut(
                         id=g.id,
@@ -159,12 +209,15 @@ class CommunityService:
             if not group:
                 raise NotFoundError(COMMUNITY_GROUP_NOT_FOUND)
             await community_repo.join_group(session, uid, gid)
+        # 提交后再失效缓存，避免并发读取回填旧数据
+        await self._invalidate_joined_groups(uid)
 
     async def leave_group(self, user_id: str, group_id: str) -> None:
         uid = uuid.UUID(user_id)
         gid = uuid.UUID(group_id)
         async with get_pg() as session:
             await community_repo.leave_group(session, uid, gid)
+        await self._invalidate_joined_groups(uid)
 
     # --- Posts ---
 
@@ -197,7 +250,7 @@ class CommunityService:
             # Simplified: Assuming user exists if logged in
             # We can re-fetch detail or construct manually
 
-            return PostDetailOut(
+            post_out = PostDetailOut(
                 id=created.id,
                 group_id=created.group_id,
                 group_name="",  # Need fetch group name? Lazy for now
@@ -211,6 +264,10 @@ class CommunityService:
                 created_at=created.created_at,
             )
 
+        # 提交成功后再调整待审核计数，回滚时不影响 Redis
+        await platform_stats_service.incr("pending_audits", 1)
+        return post_out
+
     async def update_post(
         self, post_id: str, user_id: str, payload: PostUpdateIn
     ) -> PostDetailOut:
@@ -288,14 +345,17 @@ class CommunityService:
                 session, gid, page, page_size
             )
 
+            liked_ids = (
+                await community_repo.check_liked_many(
+                    uid, [p.id for p, _ in posts], "post"
+                )
+                if uid
+                else set()
+            )
+
             items = []
             for p, author in posts:
-                is_liked = False
-                if uid:
-                    is_liked = await community_repo.check_liked(
-                        session, uid, p.id, "post"
-                    )
-
+                is_liked = str(p.id) in liked_ids
                 items.append(
                     PostItemOut(
                         id=p.id,
@@ -332,17 +392,11 @@ class CommunityService:
                 raise NotFoundError("Post not found")
             post, author, group = res
 
-            # De-duplicate View Count using Redis
-
+            # 浏览量按访客去重后累加到 Redis，由定时任务批量落库，读取不写帖子行
             viewer_id = str(uid) if uid else f"ip_{ip_address}"
-            view_key = f"viewed:post:{post_id}:{viewer_id}"
-
-            # If lock exists (True), we skip increment. If not exists (False), we increment details.
-            if not await check_operation_lock(view_key, 600):
-                # Increment DB
-                await community_repo.increment_view(session, pid)
-                # Increment local object for return
-                post.view_count += 1
+            view_count = post.view_count
+            if await post_view_service.record_view(pid, viewer_id):
+                view_count += 1
 
             is_liked = (
                 await community_repo.check_liked(session, uid, pid, "post")
@@ -361,7 +415,7 @@ class CommunityService:
                 content=post.content,
                 images=post.images,
                 videos=post.videos,
-                view_count=post.view_count,
+                view_count=view_count,
                 like_count=post.likes_count,
                 comment_count=post.comment_count,
                 is_liked=is_liked,
@@ -432,14 +486,17 @@ class CommunityService:
                 session, pid, page, page_size
             )
 
+            liked_ids = (
+                await community_repo.check_liked_many(
+                    uid, [str(c.id) for c in comments], "comment"
+                )
+                if uid
+                else set()
+            )
+
             items = []
             for c in comments:
-                is_liked = False
-                if uid:
-                    is_liked = await community_repo.check_liked(
-                        session, uid, str(c.id), "comment"
-                    )
-
+                is_liked = str(c.id) in liked_ids
                 items.append(
                     CommentItemOut(
                         id=str(c.id),
@@ -467,9 +524,17 @@ class CommunityService:
         # target_id stays as str, allowing UUID or ObjectId
         # Repo will handle conversion
         async with get_pg() as session:
-            return await community_repo.toggle_like(
+            is_liked = await community_repo.toggle_like(
                 session, uid, target_id, target_type
             )
+        if target_type == "product":
+            try:
+                pid = uuid.UUID(target_id)
+            except ValueError:
+                return is_liked
+            # 商品点赞数在提交后写入 Redis 累加，由定时任务批量落库
+            await product_counter_service.incr(pid, "likes", 1 if is_liked else -1)
+        return is_liked
 
     async def moderate_post(
         self, post_id: str, is_hidden: bool, merchant_id: str
@@ -538,9 +603,13 @@ class CommunityService:
                 session, uid, page, page_size
             )
 
+            liked_ids = await community_repo.check_liked_many(
+                uid, [p.id for p, _, _ in posts], "post"
+            )
+
             items = []
             for p, author, group in posts:
-                is_liked = await community_repo.check_liked(session, uid, p.id, "post")
+                is_liked = str(p.id) in liked_ids
                 items.append(
                     PostItemOut(
                         id=p.id,
@@ -567,22 +636,40 @@ class CommunityService:
             return PostListOut(items=items, total=total, page=page, page_size=page_size)
 
     async def search_posts(
-        self, query: str, user_id: str | None = None, page: int = 1, page_size: int = 20
+        self,
+        query: str,
+        user_id: str | None = None,
+        page: int = 1,
+        page_size: int = 20,
+        cursor: str | None = None,
     ) -> PostListOut:
-        """全局搜索帖子"""
+        """全局搜索帖子 (按相关度排序，传入游标时按 keyset 翻页)"""
         uid = uuid.UUID(user_id) if user_id else None
         async with get_pg() as session:
-            posts, total = await community_repo.search_posts(
-                session, query, page, page_size
+            rows, total = await community_repo.search_posts(
+                session,
+                query,
+                limit=page_size + 1,
+                offset=(page - 1) * page_size,
+                cursor=decode_rank_cursor(cursor) if cursor else None,
+            )
+            posts = rows[:page_size]
+            next_cursor = None
+            if len(rows) > page_size:
+                last, _, _, rank = posts[-1]
+                next_cursor = encode_rank_cursor(rank, last.created_at, last.id)
+
+            liked_ids = (
+                await community_repo.check_liked_many(
+                    uid, [p.id for p, _, _, _ in posts], "post"
+                )
+                if uid
+                else set()
             )
 
             items = []
-            for p, author, group in posts:
-                is_liked = (
-                    await community_repo.check_liked(session, uid, p.id, "post")
-                    if uid
-                    else False
-                )
+            for p, author, group, _ in posts:
+                is_liked = str(p.id) in liked_ids
                 items.append(
                     PostItemOut(
                         id=p.id,
@@ -606,4 +693,10 @@ class CommunityService:
                     )
                 )
 
-            return PostListOut(items=items, total=total, page=page, page_size=page_size)
+            return PostListOut(
+                items=items,
+                total=total,
+                page=page,
+                page_size=page_size,
+                next_cursor=next_cursor,
+            )
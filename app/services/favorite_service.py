@@ -6,6 +6,7 @@ from app.common.errors import NotFoundError
 from app.database.pgsql import get_pg
 from app.repo import favorites_repo, products_repo
 from app.schemas.favorite import FavoriteCheckOut, FavoriteItemOut, FavoriteListOut
+from app.services.product_counter_service import product_counter_service
 
 
 class FavoriteService:
@@ -27,19 +28,26 @@ class FavoriteService:
                 return
 
             await favorites_repo.add(session, uid, pid)
+        # 收藏数增量在提交后写入 Redis，由定时任务批量落库
+        await product_counter_service.incr(pid, "favorites", 1)
 
     async def remove_favorite(self, user_id: str, product_id: str) -> None:
         """取消收藏"""
         uid = uuid.UUID(user_id)
         pid = uuid.UUID(product_id)
         async with get_pg() as session:
-            await favorites_repo.remove(session, uid, pid)
+            removed = await favorites_repo.remove(session, uid, pid)
+        if removed:
+            await product_counter_service.incr(pid, "favorites", -1)
 
     async def remove_batch(self, user_id: str, product_ids: list[uuid.UUID]) -> None:
         """批量取消收藏"""
         uid = uuid.UUID(user_id)
         async with get_pg() as session:
-            await favorites_repo.remove_batch(session, uid, product_ids)
+            removed = await favorites_repo.remove_batch(session, uid, product_ids)
+        await product_counter_service.incr_many(
+            (pid, "favorites", -1) for pid in removed
+        )
 
     async def get_favorites(
         self, user_id: str, page: int = 1, page_size: int = 20
@@ -13,6 +13,7 @@ from app.repo import (
     merchants_repo,
     orders_repo,
     products_repo,
+    statistics_repo,
 )
 from app.repo.order_refunds_repo import order_refunds_repo
 from app.schemas.order_refund import (
@@ -21,6 +22,7 @@ from app.schemas.order_refund import (
     OrderRefundOut,
 )
 from app.services.notification_service import notification_service
+from app.services.product_counter_service import product_counter_service
 
 
 class OrderRefundService:
@@ -138,15 +140,23 @@ class OrderRefundService:
                 refund.status = "approved"
                 order.status = "refunded"
                 order.refund_status = "approved"
-                # 归还库存，扣减销量 (如果支付时加了销量的话)
+                # 归还库存
                 for item in items:
                     await products_repo.recover_stock(
                         session, item.product_id, item.quantity
                     )
-                    # 假定此处允许销量扣减
-                    p = await products_repo.get_by_id(session, str(item.product_id))
-                    if p and p.sales_count >= item.quantity:
-                        p.sales_count -= item.quantity
+                # 扣减销量：与支付时一致走 Redis 写回缓冲，提交后写入负增量，
+                # 落库时与缓冲中尚未落库的销量相抵 (下限为 0)
+                background_tasks.add_task(
+                    product_counter_service.incr_many,
+                    [(item.product_id, "sales", -item.quantity) for item in items],
+                )
+
+                # 冲减支付当日的商家/商品销售汇总
+                if order.paid_at:
+                    await statistics_repo.apply_order_sales(
+                        session, order.id, order.paid_at.astimezone(UTC).date(), -1
+                    )
 
                 # 归还积分 (如果使用了积分抵扣)
                 if order.points_consumed and order.points_consumed > 0:
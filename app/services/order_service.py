@@ -1,10 +1,13 @@
 """订单服务层：订单业务逻辑"""
 
+import logging
 import uuid
+from collections.abc import Awaitable, Callable, Sequence
 from datetime import UTC, datetime, timedelta
 from decimal import Decimal
 
 from fastapi import BackgroundTasks
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.common.constants import ORDER_STATUS_ERROR
 from app.common.errors import BusinessError, NotFoundError
@@ -16,6 +19,7 @@ from app.repo import (
     merchants_repo,
     orders_repo,
     products_repo,
+    statistics_repo,
 )
 from app.schemas.order import (
     BuyNowIn,
@@ -24,12 +28,25 @@ from app.schemas.order import (
     OrderOut,
     OrderShipIn,
 )
-from app.utils import check_operation_lock, generate_order_no
+from app.services.platform_stats_service import platform_stats_service
+from app.services.product_counter_service import product_counter_service
+from app.utils import (
+    check_operation_lock,
+    decode_cursor,
+    encode_cursor,
+    generate_order_no,
+)
+from app.utils.redis_cache import cache_get_json, cache_set_json
+
+logger = logging.getLogger(__name__)
 
 
 class OrderService:
     """订单服务"""
 
+    # 订单列表总数缓存时长 (秒)，总数允许短时近似
+    COUNT_CACHE_TTL = 30
+
     async def create_from_cart(
         self, user_id: str, payload: OrderCreateIn, background_tasks: BackgroundTasks
     ) -> OrderOut:
@@ -39,6 +56,9 @@ class OrderService:
         async with get_pg() as session:
             from app.database.redis import get_redis
             from app.services.redis_stock_service import redis_stock_service
+            from app.services.stock_reservation_service import (
+                stock_reservation_service,
+            )
 
             # 1. 验证地址
             address = await addresses_repo.get_by_id(session, str(payload.address_id))
@@ -60,75 +80,66 @@ class OrderService:
             order_items_to_create: list[OrderItem] = []
             redis_deducted: list[tuple[uuid.UUID, int]] = []
 
-            # 获取所有商品的有效促销
-            from app.services.promotion_service import PromotionService
-
-            promotion_service = PromotionService()
             product_ids = [ci.product_id for ci in cart_items]
-            active_promotions = (
-                await promotion_service.get_active_promotions_by_product_ids(
-                    product_ids
-                )
-            )
 
             try:
-                async with get_redis() as redis_client:
-                    for ci in cart_items:
-                        product = await products_repo.get_by_id(
-                            session, str(ci.product_id)
+                # 一次 IN 查询加载购物车内全部商品
+                products = {
+                    p.id: p
+                    for p in await products_repo.get_by_ids(session, list(product_ids))
+                }
+                db_stocks: dict[uuid.UUID, int] = {}
+                for ci in cart_items:
+                    product = products.get(ci.product_id)
+                    if not product or product.status != "on":
+                        raise BusinessError(
+                            detail=f"商品 {ci.product_id} 已下架或不存在"
                         )
-                        if not product or product.status != "on":
-                            raise BusinessError(
-                                detail=f"商品 {ci.product_id} 已下架或不存在"
-                            )
+                    db_stocks[product.id] = int(product.stock)
 
-                        ok = await redis_stock_service.try_deduct(
-                            redis_client,
-                            session,
-                            ci.product_id,
-                            ci.quantity,
-                            db_stock=int(product.stock),
-                        )
-                        if not ok:
-                            raise BusinessError(detail=f"商品 {product.name} 库存不足")
-                        redis_deducted.append((ci.product_id, ci.quantity))
-
-                        product_price = Decimal(str(product.price))
-                        unit_price = product_price
-                        if product.id in active_promotions:
-                            promo = active_promotions[product.id]
-                            discount_value = Decimal(str(promo.discount_value))
-                            if promo.discount_type == "percent":
-                                discount_rate = (
-                                    Decimal(100) - discount_value
-                                ) / Decimal(100)
-                                discount_rate = max(discount_rate, Decimal(0))
-                                unit_price = product_price * discount_rate
-                            elif promo.discount_type == "fixed":
-                                unit_price = product_price - discount_value
-                                unit_price = max(unit_price, Decimal("0.01"))
-
-                        subtotal = unit_price * ci.quantity
-                        total_amount += subtotal
-
-                        order_items_to_create.append(
-                            OrderItem(
-                                product_id=ci.product_id,
-                                quantity=ci.quantity,
-                                unit_price=unit_price,
-                                product=product,
-                            )
-                        )
+                    # 促销后的实际价格由定价引擎预先物化
+                    unit_price = Decimal(str(product.effective_price))
+
+                    subtotal = unit_price * ci.quantity
+                    total_amount += subtotal
 
-                    for item in order_items_to_create:
-                        success = await products_repo.deduct_stock(
-                            session, item.product_id, item.quantity
+                    order_items_to_create.append(
+                        OrderItem(
+                            product_id=ci.product_id,
+                            merchant_id=product.merchant_id,
+                            quantity=ci.quantity,
+                            unit_price=unit_price,
+                            product=product,
                         )
-                        if not success:
-                            p = item.product
-                            raise BusinessError(
-                                detail=f"商品 {(p.name if p else str(item.product_id))} 库存不足"
-                            )
+                    )
+
+                # Redis 预扣：所有商品一次原子扣减，任一不足则整体不扣
+                async with get_redis() as redis_client:
+                    failed_id = await redis_stock_service.try_deduct_many(
+                        redis_client,
+                        session,
+                        [(ci.product_id, ci.quantity) for ci in cart_items],
+                        db_stocks=db_stocks,
+                    )
+                if failed_id is not None:
+                    raise BusinessError(
+                        detail=f"商品 {products[failed_id].name} 库存不足"
+                    )
+                redis_deducted = [(ci.product_id, ci.quantity) for ci in cart_items]
+
+                # 单条 UPDATE ... FROM (VALUES ...) 扣减数据库库存
+                failed_ids = await products_repo.deduct_stock_many(
+                    session,
+                    [
+                        (item.product_id, item.quantity)
+                        for item in order_items_to_create
+                    ],
+                )
+                if failed_ids:
+                    p = products.get(failed_ids[0])
+                    raise BusinessError(
+                        detail=f"商品 {(p.name if p else str(failed_ids[0]))} 库存不足"
+                    )
             except Exception:
                 if redis_deducted:
                     async with get_redis() as redis_client:
@@ -229,6 +240,10 @@ class OrderService:
                 cart.is_checked_out = True
                 await session.flush()
 
+                # 记录库存占用，到期未支付由预留台账 worker 释放
+                async with get_redis() as redis_client:
+                    await stock_reservation_service.record(redis_client, new_order.id)
+
                 from app.services.notification_service import notification_service
 
                 background_tasks.add_task(
@@ -239,6 +254,11 @@ class OrderService:
                     f"您的订单 {new_order.order_no} 创建成功，请在 15 分钟内完成支付。订单总额：¥{new_order.total_amount}。",
                     f"/member/orders/{new_order.id}",
                 )
+                # 事务提交、响应返回后再投递支付超时延时消息
+                background_tasks.add_task(self.schedule_payment_timeout, new_order.id)
+                background_tasks.add_task(
+                    platform_stats_service.incr, "total_orders", 1
+                )
 
                 return OrderOut(
                     id=new_order.id,
@@ -281,6 +301,9 @@ class OrderService:
         async with get_pg() as session:
             from app.database.redis import get_redis
             from app.services.redis_stock_service import redis_stock_service
+            from app.services.stock_reservation_service import (
+                stock_reservation_service,
+            )
 
             # 1. 验证地址
             address = await addresses_repo.get_by_id(session, str(payload.address_id))
@@ -320,27 +343,8 @@ class OrderService:
                 raise
 
             try:
-                from app.services.promotion_service import PromotionService
-
-                promotion_service = PromotionService()
-                active_promotions = (
-                    await promotion_service.get_active_promotions_by_product_ids(
-                        [product.id]
-                    )
-                )
-
-                product_price = Decimal(str(product.price))
-                unit_price = product_price
-                if product.id in active_promotions:
-                    promo = active_promotions[product.id]
-                    discount_value = Decimal(str(promo.discount_value))
-                    if promo.discount_type == "percent":
-                        discount_rate = (Decimal(100) - discount_value) / Decimal(100)
-                        discount_rate = max(discount_rate, Decimal(0))
-                        unit_price = product_price * discount_rate
-                    elif promo.discount_type == "fixed":
-                        unit_price = product_price - discount_value
-                        unit_price = max(unit_price, Decimal("0.01"))
+                # 促销后的实际价格由定价引擎预先物化
+                unit_price = Decimal(str(product.effective_price))
 
                 total_amount = unit_price * payload.quantity
 
@@ -425,6 +429,7 @@ class OrderService:
                 order_item = OrderItem(
                     order_id=new_order.id,
                     product_id=payload.product_id,
+                    merchant_id=product.merchant_id,
                     quantity=payload.quantity,
                     unit_price=unit_price,
                     product=product,
@@ -432,6 +437,10 @@ class OrderService:
                 await orders_repo.add_items(session, [order_item])
                 await session.flush()
 
+                # 记录库存占用，到期未支付由预留台账 worker 释放
+                async with get_redis() as redis_client:
+                    await stock_reservation_service.record(redis_client, new_order.id)
+
                 from app.services.notification_service import notification_service
 
                 background_tasks.add_task(
@@ -442,6 +451,11 @@ class OrderService:
                     f"您的订单 {new_order.order_no} 创建成功，请在 15 分钟内完成支付。订单总额：¥{new_order.total_amount}。",
                     f"/member/orders/{new_order.id}",
                 )
+                # 事务提交、响应返回后再投递支付超时延时消息
+                background_tasks.add_task(self.schedule_payment_timeout, new_order.id)
+                background_tasks.add_task(
+                    platform_stats_service.incr, "total_orders", 1
+                )
 
                 return OrderOut(
                     id=new_order.id,
@@ -477,45 +491,34 @@ class OrderService:
                 raise
 
     async def get_my_orders(
-        self, user_id: str, page: int = 1, page_size: int = 10
-    ) -> tuple[list[OrderOut], int]:
-        """获取我的订单列表"""
+        self,
+        user_id: str,
+        page: int = 1,
+        page_size: int = 10,
+        cursor: str | None = None,
+        with_total: bool = True,
+    ) -> tuple[list[OrderOut], int | None, str | None]:
+        """获取我的订单列表 (传入游标时按 keyset 翻页)，返回 (订单, 总数, 下一页游标)"""
         async with get_pg() as session:
-            orders, total = await orders_repo.get_list_by_user(
-                session, user_id, page, page_size
+            orders = await orders_repo.get_list_by_user(
+                session,
+                user_id,
+                limit=page_size + 1,
+                offset=(page - 1) * page_size,
+                cursor=decode_cursor(cursor) if cursor else None,
+            )
+            orders, next_cursor = self._split_page(orders, page_size)
+            ordered_out = await self._build_order_outs(
+                session, orders, with_review=True
             )
 
-            ordered_out = []
-            from app.repo.reviews_repo import reviews_repo
-
-            for o in orders:
-                items = await orders_repo.get_items_by_order_id(session, o.id)
-                o_out = OrderOut.model_validate(o)
-                oi_list = []
-                for i in items:
-                    is_reviewed = False
-                    if o.status == "completed":
-                        r = await reviews_repo.get_by_order_item(
-                            str(o.id), str(i.product_id)
-                        )
-                        is_reviewed = r is not None
-
-                    p = i.product
-                    oi_list.append(
-                        OrderItemOut(
-                            id=i.id,
-                            product_id=i.product_id,
-                            quantity=i.quantity,
-                            unit_price=i.unit_price,
-                            product_name=(p.name if p else "已删除商品"),
-                            product_image=(p.image_url if p else None),
-                            is_reviewed=is_reviewed,
-                        )
-                    )
-                o_out.items = oi_list
-                ordered_out.append(o_out)
-
-            return ordered_out, total
+            total = None
+            if with_total:
+                total = await self._cached_count(
+                    f"cache:orders:count:user:{user_id}",
+                    lambda: orders_repo.count_by_user(session, user_id),
+                )
+            return ordered_out, total, next_cursor
 
     async def get_order_detail(self, user_id: str, order_id: str) -> OrderOut:
         """获取订单详情"""
@@ -560,6 +563,9 @@ class OrderService:
         async with get_pg() as session:
             from app.database.redis import get_redis
             from app.services.redis_stock_service import redis_stock_service
+            from app.services.stock_reservation_service import (
+                stock_reservation_service,
+            )
 
             # 1. 获取订单
             order = await orders_repo.get_by_id(session, order_id)
@@ -592,6 +598,10 @@ class OrderService:
                     await redis_stock_service.release(
                         redis_client, session, item.product_id, item.quantity
                     )
+                await stock_reservation_service.remove(redis_client, order.id)
+
+        # 提交成功后再调整订单计数，回滚时不影响 Redis
+        await platform_stats_service.incr("total_orders", -1)
 
     async def pay_order(
         self, user_id: str, order_id: str, background_tasks: BackgroundTasks
@@ -609,12 +619,12 @@ class OrderService:
             if order.status != "pending":
                 raise BusinessError(detail="订单状态不可支付")
 
-            # 3. 更新销量与人气分
+            # 3. 销量增量在支付提交后写入 Redis，由定时任务批量落库并重算人气分
             items = await orders_repo.get_items_by_order_id(session, order.id)
-            for item in items:
-                await products_repo.increment_sales(
-                    session, item.product_id, item.quantity
-                )
+            background_tasks.add_task(
+                product_counter_service.incr_many,
+                [(item.product_id, "sales", item.quantity) for item in items],
+            )
 
             # 4. 执行积分扣减 (如果使用了积分抵扣)
             if order.points_consumed and order.points_consumed > 0:
@@ -633,6 +643,20 @@ class OrderService:
             order.paid_at = datetime.now(UTC)
             await session.flush()
 
+            # 6. 累加商家/商品日销售汇总
+            await statistics_repo.apply_order_sales(
+                session, order.id, order.paid_at.date()
+            )
+
+            # 已支付订单不再占用预留
+            from app.database.redis import get_redis
+            from app.services.stock_reservation_service import (
+                stock_reservation_service,
+            )
+
+            async with get_redis() as redis_client:
+                await stock_reservation_service.remove(redis_client, order.id)
+
             from app.services.notification_service import notification_service
 
             # 发送支付成功通知
@@ -745,91 +769,252 @@ class OrderService:
         page_size: int = 10,
         status: str | None = None,
         refund_status: str | None = None,
-    ) -> tuple[list[OrderOut], int]:
-        """获取商家的订单列表"""
+        cursor: str | None = None,
+        with_total: bool = True,
+    ) -> tuple[list[OrderOut], int | None, str | None]:
+        """获取商家的订单列表 (传入游标时按 keyset 翻页)，返回 (订单, 总数, 下一页游标)"""
         async with get_pg() as session:
             merchant = await merchants_repo.get_by_user_id(session, user_id)
             if not merchant:
                 raise BusinessError(detail="当前用户不是商家")
 
-            orders, total = await orders_repo.get_list_by_merchant(
+            merchant_id = str(merchant.id)
+            orders = await orders_repo.get_list_by_merchant(
                 session,
-                str(merchant.id),
-                page,
-                page_size,
+                merchant_id,
+                limit=page_size + 1,
+                offset=(page - 1) * page_size,
+                cursor=decode_cursor(cursor) if cursor else None,
                 status=status,
                 refund_status=refund_status,
             )
+            orders, next_cursor = self._split_page(orders, page_size)
+
+            # 转换并批量加载明细
+            ordered_out = await self._build_order_outs(session, orders)
+
+            total = None
+            if with_total:
+                total = await self._cached_count(
+                    f"cache:orders:count:merchant:{merchant_id}:"
+                    f"{status or ''}:{refund_status or ''}",
+                    lambda: orders_repo.count_by_merchant(
+                        session, merchant_id, status, refund_status
+                    ),
+                )
+            return ordered_out, total, next_cursor
+
+    @staticmethod
+    def _split_page(
+        orders: list[Order], page_size: int
+    ) -> tuple[list[Order], str | None]:
+        """多取一条判断是否还有下一页，并生成下一页游标"""
+        if len(orders) <= page_size:
+            return orders, None
+        orders = orders[:page_size]
+        return orders, encode_cursor(orders[-1].created_at, orders[-1].id)
+
+    async def _cached_count(
+        self, cache_key: str, counter: Callable[[], Awaitable[int]]
+    ) -> int:
+        """订单总数短时缓存，避免每次翻页都重复 count"""
+        from app.database.redis import get_redis
+
+        async with get_redis() as redis:
+            cached = await cache_get_json(redis, cache_key)
+            if cached is not None:
+                return int(cached)
+
+        total = await counter()
+        async with get_redis() as redis:
+            await cache_set_json(redis, cache_key, total, ttl=self.COUNT_CACHE_TTL)
+        return total
+
+    async def auto_receipt_orders(self, days: int = 7, batch_size: int = 500) -> int:
+        """自动确认超过指定天数的已发货订单 (分批短事务处理)"""
+        expiration_time = datetime.now(UTC) - timedelta(days=days)
+
+        count = 0
+        while True:
+            async with get_pg() as session:
+                updated = await orders_repo.complete_shipped_orders_before(
+                    session, expiration_time, limit=batch_size
+                )
+            count += updated
+            if updated < batch_size:
+                break
+        return count
+
+    async def auto_cancel_expired_orders(
+        self, minutes: int = 15, batch_size: int = 500
+    ) -> int:
+        """自动取消超过指定分钟数仍未支付的订单 (分批短事务处理)"""
+        from app.database.redis import get_redis
+        from app.services.redis_stock_service import redis_stock_service
+        from app.services.stock_reservation_service import stock_reservation_service
+
+        expiration_time = datetime.now(UTC) - timedelta(minutes=minutes)
+
+        count = 0
+        while True:
+            async with get_pg() as session:
+                orders = await orders_repo.lock_expired_pending_orders(
+                    session, expiration_time, limit=batch_size
+                )
+                items = await self._cancel_locked_orders(session, orders)
+            if not orders:
+                break
 
-            # 转换并加载明细
-            ordered_out = []
-            for o in orders:
-                items = await orders_repo.get_items_by_order_id(session, o.id)
-                o_out = OrderOut.model_validate(o)
-                o_out.items = [
-                    OrderItemOut(
-                        id=i.id,
-                        product_id=i.product_id,
-                        quantity=i.quantity,
-                        unit_price=i.unit_price,
-                        product_name=(i.product.name if i.product else "已删除商品"),
-                        product_image=(i.product.image_url if i.product else None),
-                        is_reviewed=False,
-                    )
-                    for i in items
-                ]
-                ordered_out.append(o_out)
+            # 事务提交后再归还 Redis 库存并移除预留记录
+            async with get_redis() as redis_client:
+                await redis_stock_service.release_many(
+                    redis_client, [(i.product_id, i.quantity) for i in items]
+                )
+                await stock_reservation_service.remove(
+                    redis_client, *[o.id for o in orders]
+                )
 
-            return ordered_out, total
+            await platform_stats_service.incr("total_orders", -len(orders))
+            count += len(orders)
+            if len(orders) < batch_size:
+                break
+        return count
+
+    async def schedule_payment_timeout(self, order_id: uuid.UUID) -> None:
+        """下单提交后投递延时消息，在支付截止时刻取消未支付订单"""
+        from app.services.stock_reservation_service import stock_reservation_service
+        from app.tasks.tasks import cancel_unpaid_order_task
+
+        try:
+            await (
+                cancel_unpaid_order_task.kicker()
+                .with_labels(delay=stock_reservation_service.HOLD_SECONDS)
+                .kiq(str(order_id))
+            )
+        except Exception as e:
+            # 投递失败时由预留台账 worker 兜底释放
+            logger.warning(f"[AutoCancel] Failed to schedule order {order_id}: {e}")
+
+    async def cancel_unpaid_order(self, order_id: str) -> bool:
+        """支付超时取消订单 (幂等：已支付/已取消/未到期的订单直接跳过)"""
+        from app.services.stock_reservation_service import stock_reservation_service
+
+        deadline = datetime.now(UTC) - timedelta(
+            seconds=stock_reservation_service.HOLD_SECONDS
+        )
+        return await self._cancel_pending_orders([order_id], deadline) > 0
+
+    async def release_expired_reservations(self, batch_size: int = 200) -> int:
+        """领取到期的库存预留，批量取消仍未支付的订单并归还库存"""
+        from app.database.redis import get_redis
+        from app.services.stock_reservation_service import stock_reservation_service
+
+        async with get_redis() as redis_client:
+            order_ids = await stock_reservation_service.claim_due(
+                redis_client, limit=batch_size
+            )
+        if not order_ids:
+            return 0
+        count = await self._cancel_pending_orders(order_ids)
 
-    async def auto_receipt_orders(self, days: int = 7) -> int:
-        """自动确认超过指定天数的已发货订单"""
+        # 已支付/已取消或加锁中被跳过的订单同样出账；遗留的待支付订单由兜底扫描任务处理
+        async with get_redis() as redis_client:
+            await stock_reservation_service.remove(redis_client, *order_ids)
+        return count
 
-        async with get_pg() as session:
-            # 计算过期时间点
-            expiration_time = datetime.now(UTC) - timedelta(days=days)
+    async def _build_order_outs(
+        self,
+        session: AsyncSession,
+        orders: Sequence[Order],
+        with_review: bool = False,
+    ) -> list[OrderOut]:
+        """
+        将一页订单转换为输出模型：明细单次 IN 查询加载，
+        已完成订单的评价状态单次 $in 查询判断
+        """
+        items = await orders_repo.get_items_by_order_ids(
+            session, [o.id for o in orders]
+        )
+        items_by_order: dict[uuid.UUID, list[OrderItem]] = {}
+        for i in items:
+            items_by_order.setdefault(i.order_id, []).append(i)
+
+        reviewed: set[tuple[uuid.UUID, uuid.UUID]] = set()
+        if with_review:
+            from app.repo.reviews_repo import reviews_repo
 
-            # 查询过期订单
-            orders = await orders_repo.get_shipped_orders_before(
-                session, expiration_time
+            reviewed = await reviews_repo.get_reviewed_item_keys(
+                [
+                    (o.id, i.product_id)
+                    for o in orders
+                    if o.status == "completed"
+                    for i in items_by_order.get(o.id, [])
+                ]
             )
 
-            count = 0
-            for order in orders:
-                order.status = "completed"
-                order.completed_at = datetime.now(UTC)
-                count += 1
-
-            # 提交事务
-            if count > 0:
-                await session.commit()
-
-            return count
+        ordered_out = []
+        for o in orders:
+            o_out = OrderOut.model_validate(o)
+            o_out.items = [
+                OrderItemOut(
+                    id=i.id,
+                    product_id=i.product_id,
+                    quantity=i.quantity,
+                    unit_price=i.unit_price,
+                    product_name=(i.product.name if i.product else "已删除商品"),
+                    product_image=(i.product.image_url if i.product else None),
+                    is_reviewed=(o.id, i.product_id) in reviewed,
+                )
+                for i in items_by_order.get(o.id, [])
+            ]
+            ordered_out.append(o_out)
+        return ordered_out
+
+    async def _cancel_pending_orders(
+        self, order_ids: list[str], created_before: datetime | None = None
+    ) -> int:
+        """批量取消仍处于待支付状态的订单，归还库存与优惠券并移除库存预留"""
+        from app.database.redis import get_redis
+        from app.services.redis_stock_service import redis_stock_service
+        from app.services.stock_reservation_service import stock_reservation_service
 
-    async def auto_cancel_expired_orders(self, minutes: int = 15) -> int:
-        """自动取消超过指定分钟数仍未支付的订单"""
         async with get_pg() as session:
-            expiration_time = datetime.now(UTC) - timedelta(minutes=minutes)
-            orders = await orders_repo.get_expired_pending_orders(
-                session, expiration_time
+            # 已支付/已取消的订单不会被锁定，正被其他事务处理的订单会被跳过
+            orders = await orders_repo.lock_pending_by_ids(
+                session, order_ids, created_before=created_before
             )
+            items = await self._cancel_locked_orders(session, orders)
+        if not orders:
+            return 0
 
-            count = 0
-            for order in orders:
-                # 归还库存
-                items = await orders_repo.get_items_by_order_id(session, order.id)
-                for item in items:
-                    await products_repo.recover_stock(
-                        session, item.product_id, item.quantity
-                    )
-
-                # 归还优惠券
-                if order.user_coupon_id:
-                    from app.repo import coupons_repo
-
-                    await coupons_repo.return_user_coupon(session, order.user_coupon_id)
-
-                order.status = "cancelled"
-                count += 1
-
-            return count
+        async with get_redis() as redis_client:
+            await redis_stock_service.release_many(
+                redis_client, [(i.product_id, i.quantity) for i in items]
+            )
+            await stock_reservation_service.remove(
+                redis_client, *[o.id for o in orders]
+            )
+        await platform_stats_service.incr("total_orders", -len(orders))
+        return len(orders)
+
+    async def _cancel_locked_orders(
+        self, session: AsyncSession, orders: Sequence[Order]
+    ) -> Sequence[OrderItem]:
+        """取消已加锁的待支付订单：聚合归还库存、批量退回优惠券，返回订单明细"""
+        from app.repo import coupons_repo
+
+        if not orders:
+            return []
+        items = await orders_repo.get_items_by_order_ids(
+            session, [o.id for o in orders]
+        )
+        await products_repo.recover_stock_many(
+            session, [(i.product_id, i.quantity) for i in items]
+        )
+        await coupons_repo.return_user_coupons(
+            session, [o.user_coupon_id for o in orders if o.user_coupon_id]
+        )
+        for order in orders:
+            order.status = "cancelled"
+        await session.flush()
+        return items
@@ -0,0 +1,69 @@
+"""平台统计计数服务：管理后台概览数据由 Redis 计数器提供，定期精确重算纠偏"""
+
+import logging
+from typing import Any, cast
+
+from app.database.pgsql import get_pg
+from app.database.redis import get_redis
+from app.repo import admin_stats_repo
+
+logger = logging.getLogger(__name__)
+
+# 计数器存在时才累加：键缺失时由下次读取或重算任务从数据库初始化，
+# 避免在空哈希上累加出从 0 开始的错误总数
+_HINCRBY_IF_EXISTS_LUA = """
+if redis.call("EXISTS", KEYS[1]) == 0 then
+  return nil
+end
+return redis.call("HINCRBY", KEYS[1], ARGV[1], ARGV[2])
+"""
+
+
+class PlatformStatsService:
+    """平台统计计数服务"""
+
+    STATS_KEY = "stats:platform"
+    FIELDS = (
+        "total_users",
+        "total_merchants",
+        "total_products",
+        "total_orders",
+        "pending_audits",
+    )
+
+    @staticmethod
+    def role_field(role: str) -> str | None:
+        """用户角色对应的计数字段 (管理员不计入)"""
+        return {"member": "total_users", "merchant": "total_merchants"}.get(role)
+
+    async def incr(self, field: str | None, delta: int = 1) -> None:
+        """领域事件发生后调整计数 (失败只记录日志，由定期重算纠偏)"""
+        if field is None or delta == 0:
+            return
+        try:
+            async with get_redis() as redis:
+                await cast(Any, redis).eval(
+                    _HINCRBY_IF_EXISTS_LUA, 1, self.STATS_KEY, field, delta
+                )
+        except Exception as e:
+            logger.warning(f"[PlatformStats] Failed to update {field}: {e}")
+
+    async def get_stats(self) -> dict[str, int]:
+        """读取平台统计，计数器缺失时从数据库重算"""
+        async with get_redis() as redis:
+            cached = await redis.hgetall(self.STATS_KEY)  # type: ignore
+        if cached and all(f in cached for f in self.FIELDS):
+            return {f: max(int(cached[f]), 0) for f in self.FIELDS}
+        return await self.recount()
+
+    async def recount(self) -> dict[str, int]:
+        """精确重算全部计数并覆盖 Redis"""
+        async with get_pg() as session:
+            stats = await admin_stats_repo.get_platform_stats(session)
+        stats = {f: int(stats[f]) for f in self.FIELDS}
+        async with get_redis() as redis:
+            await redis.hset(self.STATS_KEY, mapping=stats)  # type: ignore
+        return stats
+
+
+platform_stats_service = PlatformStatsService()
@@ -0,0 +1,106 @@
+"""帖子浏览量写回服务：按访客精确去重后将增量累加到 Redis，定期批量落库；HyperLogLog 另行估算独立访客数"""
+
+import logging
+import uuid
+from typing import Any, cast
+
+from app.database.pgsql import get_pg
+from app.database.redis import get_redis
+from app.repo import community_repo
+from app.utils.write_behind import ack_batch, claim_batch
+
+logger = logging.getLogger(__name__)
+
+# 按访客精确去重 (KEYS: viewed, pending, viewers；ARGV: window, post_id, viewer_id, viewers_ttl)
+# - 访客在窗口内首次浏览 (SET NX 成功) 才累加浏览量增量
+# - HyperLogLog 只用于估算独立访客数，PFADD 的返回值不代表访客是否新出现，不能据此计数
+_RECORD_VIEW_LUA = """
+local counted = 0
+if redis.call("SET", KEYS[1], "1", "NX", "EX", ARGV[1]) then
+  redis.call("HINCRBY", KEYS[2], ARGV[2], 1)
+  counted = 1
+end
+redis.call("PFADD", KEYS[3], ARGV[3])
+redis.call("EXPIRE", KEYS[3], ARGV[4])
+return counted
+"""
+
+
+class PostViewService:
+    """帖子浏览量写回服务"""
+
+    PENDING_KEY = "counters:post_views:pending"
+    FLUSHING_KEY = "counters:post_views:flushing"
+    # 同一访客在窗口内重复浏览只计一次 (秒)
+    DEDUP_WINDOW = 600
+    # 独立访客估算的保留时间 (秒)，每次浏览后顺延
+    VIEWERS_TTL = 7 * 24 * 3600
+    # 批次租约 (秒)：需大于一轮落库的最长耗时
+    LEASE = 300
+
+    @staticmethod
+    def _viewed_key(post_id: uuid.UUID, viewer_id: str) -> str:
+        return f"viewed:post:{post_id}:{viewer_id}"
+
+    @staticmethod
+    def _viewers_key(post_id: uuid.UUID) -> str:
+        return f"post:viewers:{post_id}"
+
+    async def record_view(self, post_id: uuid.UUID, viewer_id: str) -> bool:
+        """记录一次浏览，返回是否计入浏览量 (Redis 异常时不计数，不影响读取)"""
+        try:
+            async with get_redis() as redis:
+                counted = await cast(Any, redis).eval(
+                    _RECORD_VIEW_LUA,
+                    3,
+                    self._viewed_key(post_id, viewer_id),
+                    self.PENDING_KEY,
+                    self._viewers_key(post_id),
+                    self.DEDUP_WINDOW,
+                    str(post_id),
+                    viewer_id,
+                    self.VIEWERS_TTL,
+                )
+            return bool(counted)
+        except Exception as e:
+            logger.warning(f"[PostView] Failed to record view of {post_id}: {e}")
+            return False
+
+    async def unique_viewers(self, post_id: uuid.UUID) -> int:
+        """独立访客数估算值 (HyperLogLog，约 0.81% 标准误差)"""
+        async with get_redis() as redis:
+            return int(await redis.pfcount(self._viewers_key(post_id)))
+
+    async def claim(self, redis_client) -> tuple[str, dict[uuid.UUID, int]] | None:
+        """领取待落库批次，批次被其他任务持有或无增量时返回 None"""
+        token = await claim_batch(
+            redis_client, self.PENDING_KEY, self.FLUSHING_KEY, lease=self.LEASE
+        )
+        if token is None:
+            return None
+        raw = await redis_client.hgetall(self.FLUSHING_KEY)
+        deltas: dict[uuid.UUID, int] = {}
+        for post_id, delta in raw.items():
+            try:
+                deltas[uuid.UUID(post_id)] = int(delta)
+            except ValueError:
+                logger.warning(f"[PostView] Skip malformed member: {post_id}")
+        return token, deltas
+
+    async def flush(self) -> int:
+        """将累计浏览量批量写入 posts.view_count，返回更新的帖子数"""
+        async with get_redis() as redis:
+            claimed = await self.claim(redis)
+        if claimed is None:
+            return 0
+        token, deltas = claimed
+        if deltas:
+            async with get_pg() as session:
+                await community_repo.apply_view_deltas(session, deltas)
+        async with get_redis() as redis:
+            if not await ack_batch(redis, self.FLUSHING_KEY, token):
+                logger.warning("[PostView] Lease lost before ack, batch kept")
+        return len(deltas)
+
+
+post_view_service = PostViewService()
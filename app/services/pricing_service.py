@@ -0,0 +1,59 @@
+"""定价服务：物化商品促销后的实际价格 (products.effective_price)"""
+
+import uuid
+from collections.abc import Iterable
+from datetime import UTC, datetime, timedelta
+
+from app.database.pgsql import get_pg
+from app.database.redis import get_redis
+from app.repo import products_repo, promotions_repo
+
+
+class PricingService:
+    """定价服务"""
+
+    # 上一轮边界扫描成功的截止时间，任务停摆或失败后从这里补扫
+    WATERMARK_KEY = "pricing:boundary:watermark"
+    # 与上一轮重叠的时长，容忍各节点间的时钟偏差
+    BOUNDARY_OVERLAP = timedelta(minutes=1)
+
+    async def refresh_products(self, product_ids: Iterable[uuid.UUID | str]) -> int:
+        """促销或商品价格变更后刷新指定商品的实际价格 (需在事务提交后调用)"""
+        ids = list({uuid.UUID(str(pid)) for pid in product_ids})
+        if not ids:
+            return 0
+        async with get_pg() as session:
+            return await products_repo.refresh_effective_prices(session, ids)
+
+    async def refresh_boundaries(self) -> int:
+        """
+        刷新自上一轮成功以来开始或结束的促销所关联商品的实际价格
+
+        水位只在刷新提交后推进，任务停摆或失败时下一轮会补扫整个区间；
+        水位缺失 (首次运行或 Redis 数据丢失) 时全量刷新
+        """
+        now = datetime.now(UTC)
+        async with get_redis() as redis:
+            watermark = await redis.get(self.WATERMARK_KEY)
+        if watermark is None:
+            updated = await self.refresh_all(now)
+        else:
+            since = datetime.fromisoformat(watermark) - self.BOUNDARY_OVERLAP
+            async with get_pg() as session:
+                ids = await promotions_repo.get_boundary_product_ids(
+                    session, since, now
+                )
+                updated = await products_repo.refresh_effective_prices(
+                    session, ids, now
+                )
+        async with get_redis() as redis:
+            await redis.set(self.WATERMARK_KEY, now.isoformat())
+        return updated
+
+    async def refresh_all(self, now: datetime | None = None) -> int:
+        """全量刷新 (用于初始化与纠偏)"""
+        async with get_pg() as session:
+            return await products_repo.refresh_effective_prices(session, now=now)
+
+
+pricing_service = PricingService()
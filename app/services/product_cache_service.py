@@ -0,0 +1,87 @@
+"""商品详情缓存服务：版本化键的读穿透缓存，商品/分类/促销变更时递增版本失效"""
+
+import asyncio
+import logging
+import uuid
+from collections.abc import Awaitable, Callable, Iterable
+from datetime import UTC, datetime
+
+from app.database.redis import get_redis
+from app.schemas.product import ProductPublicOut
+from app.utils.redis_cache import cache_get_json, cache_set_json
+from app.utils.redis_lock import acquire_lock, release_lock
+
+logger = logging.getLogger(__name__)
+
+
+class ProductCacheService:
+    """商品详情缓存服务"""
+
+    DETAIL_TTL = 30
+    # 版本号保留时间需远大于详情 TTL，过期归零时旧版本详情早已失效
+    VERSION_TTL = 86400
+
+    @staticmethod
+    def _version_key(product_id: uuid.UUID) -> str:
+        return f"cache:product:detail:ver:{product_id}"
+
+    @staticmethod
+    def _detail_key(product_id: uuid.UUID, version: int) -> str:
+        return f"cache:product:detail:v2:{version}:{product_id}"
+
+    async def get_detail(
+        self,
+        product_id: uuid.UUID,
+        loader: Callable[[], Awaitable[ProductPublicOut]],
+    ) -> ProductPublicOut:
+        """读取商品详情，未命中时加锁回源，防止热点商品缓存击穿"""
+        async with get_redis() as redis:
+            version = int(await redis.get(self._version_key(product_id)) or 0)
+            cache_key = self._detail_key(product_id, version)
+            cached = await cache_get_json(redis, cache_key)
+            if cached is not None:
+                return ProductPublicOut.model_validate(cached)
+
+            lock_key = f"{cache_key}:lock"
+            lock_token = await acquire_lock(redis, lock_key, ttl=3)
+            if lock_token is None:
+                await asyncio.sleep(0.05)
+                cached2 = await cache_get_json(redis, cache_key)
+                if cached2 is not None:
+                    return ProductPublicOut.model_validate(cached2)
+
+        try:
+            out = await loader()
+        finally:
+            if lock_token:
+                async with get_redis() as redis:
+                    await release_lock(redis, lock_key, lock_token)
+
+        # 促销到期前失效，避免展示已结束的活动价
+        ttl = self.DETAIL_TTL
+        if out.active_promotion:
+            remaining = (
+                out.active_promotion.end_at - datetime.now(UTC)
+            ).total_seconds()
+            ttl = max(1, min(ttl, int(remaining)))
+        async with get_redis() as redis:
+            await cache_set_json(redis, cache_key, out.model_dump(mode="json"), ttl=ttl)
+        return out
+
+    async def invalidate(self, product_ids: Iterable[uuid.UUID | str]) -> None:
+        """递增版本号使商品详情缓存失效 (需在事务提交后调用，失败只记录日志)"""
+        keys = {self._version_key(uuid.UUID(str(pid))) for pid in product_ids}
+        if not keys:
+            return
+        try:
+            async with get_redis() as redis:
+                pipe = redis.pipeline(transaction=False)
+                for key in keys:
+                    await pipe.incr(key)
+                    await pipe.expire(key, self.VERSION_TTL)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"[ProductCache] Failed to invalidate {keys}: {e}")
+
+
+product_cache_service = ProductCacheService()
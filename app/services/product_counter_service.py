@@ -0,0 +1,112 @@
+"""商品计数写回服务：浏览/销量/收藏/点赞增量先累加到 Redis，定期批量落库并重算人气分"""
+
+import logging
+import uuid
+from collections.abc import Iterable
+
+from app.database.pgsql import get_pg
+from app.database.redis import get_redis
+from app.repo import products_repo
+from app.utils.write_behind import ack_batch, claim_batch
+
+logger = logging.getLogger(__name__)
+
+CounterDelta = tuple[uuid.UUID, str, int]
+
+
+class ProductCounterService:
+    """商品计数写回服务"""
+
+    PENDING_KEY = "counters:product:pending"
+    FLUSHING_KEY = "counters:product:flushing"
+    FIELDS = ("views", "sales", "favorites", "likes")
+    # 批次租约 (秒)：需大于一轮落库的最长耗时
+    LEASE = 300
+
+    async def incr(self, product_id: uuid.UUID, field: str, delta: int = 1) -> None:
+        """记录单个计数增量"""
+        await self.incr_many([(product_id, field, delta)])
+
+    async def incr_many(self, deltas: Iterable[CounterDelta]) -> None:
+        """
+        批量记录计数增量 (HINCRBY，不锁商品行)
+
+        Redis 不可用时直接写库，避免增量丢失
+        """
+        merged: dict[str, int] = {}
+        for product_id, field, delta in deltas:
+            if field not in self.FIELDS or delta == 0:
+                continue
+            member = f"{product_id}:{field}"
+            merged[member] = merged.get(member, 0) + delta
+        if not merged:
+            return
+
+        try:
+            async with get_redis() as redis:
+                pipe = redis.pipeline(transaction=False)
+                for member, delta in merged.items():
+                    await pipe.hincrby(self.PENDING_KEY, member, delta)  # type: ignore
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"[ProductCounter] Redis unavailable, writing through: {e}")
+            async with get_pg() as session:
+                await products_repo.apply_counter_deltas(
+                    session, self._parse(merged.items())
+                )
+
+    async def claim(
+        self, redis_client
+    ) -> tuple[str, dict[uuid.UUID, dict[str, int]]] | None:
+        """领取待落库批次并按商品聚合，批次被其他任务持有或无增量时返回 None"""
+        token = await claim_batch(
+            redis_client, self.PENDING_KEY, self.FLUSHING_KEY, lease=self.LEASE
+        )
+        if token is None:
+            return None
+        raw = await redis_client.hgetall(self.FLUSHING_KEY)
+        return token, self._parse((k, int(v)) for k, v in raw.items())
+
+    async def ack(self, redis_client, token: str) -> None:
+        """批次落库成功后删除 (仅当仍持有该批次的租约)"""
+        if not await ack_batch(redis_client, self.FLUSHING_KEY, token):
+            logger.warning("[ProductCounter] Lease lost before ack, batch kept")
+
+    async def flush(self) -> int:
+        """
+        将累计增量批量写入数据库，返回更新的商品数
+
+        批次以令牌独占领取，重叠执行的任务不会重复落库同一批次；
+        落库提交后才删除批次，若提交后删除前中断，租约到期后会重复应用该批次 (至少一次)
+        """
+        async with get_redis() as redis:
+            claimed = await self.claim(redis)
+        if claimed is None:
+            return 0
+        token, deltas = claimed
+        if deltas:
+            async with get_pg() as session:
+                await products_repo.apply_counter_deltas(session, deltas)
+        async with get_redis() as redis:
+            await self.ack(redis, token)
+        return len(deltas)
+
+    def _parse(
+        self, items: Iterable[tuple[str, int]]
+    ) -> dict[uuid.UUID, dict[str, int]]:
+        deltas: dict[uuid.UUID, dict[str, int]] = {}
+        for member, delta in items:
+            product_id, _, field = member.rpartition(":")
+            try:
+                pid = uuid.UUID(product_id)
+            except ValueError:
+                logger.warning(f"[ProductCounter] Skip malformed member: {member}")
+                continue
+            if field not in self.FIELDS:
+                continue
+            fields = deltas.setdefault(pid, {})
+            fields[field] = fields.get(field, 0) + delta
+        return deltas
+
+
+product_counter_service = ProductCounterService()
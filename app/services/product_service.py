@@ -1,6 +1,7 @@
 """商品服务层：商品业务逻辑"""
 
 import asyncio
+import uuid
 from decimal import Decimal
 from typing import Literal, cast
 
@@ -23,7 +24,11 @@ from app.schemas.product import (
     ProductStatusIn,
     ProductUpdateIn,
 )
-from app.utils.redis_cache import cache_get_json, cache_set_json
+from app.services.platform_stats_service import platform_stats_service
+from app.services.product_cache_service import product_cache_service
+from app.services.product_counter_service import product_counter_service
+from app.services.redis_stock_service import redis_stock_service
+from app.utils.redis_cache import cache_get_bytes, cache_set_bytes
 from app.utils.redis_lock import acquire_lock, release_lock
 
 
@@ -72,31 +77,13 @@ class ProductService:
         page_size: int = 20,
         keyword: str | None = None,
         category_id: str | None = None,
-        sort_by: str = "newest",
+        min_price: Decimal | None = None,
+        max_price: Decimal | None = None,
+        sort_by: str | None = None,
     ) -> ProductPublicListOut:
-        """获取公开商品列表"""
-        should_cache = (
-            sort_by == "popularity_desc"
-            and page == 1
-            and not keyword
-            and not category_id
-        )
-        cache_key = f"cache:home:trending:v1:ps{page_size}" if should_cache else None
-        lock_token: str | None = None
-
-        if cache_key:
-            async with get_redis() as redis:
-                cached = await cache_get_json(redis, cache_key)
-                if cached is not None:
-                    return ProductPublicListOut.model_validate(cached)
-
-                lock_key = f"{cache_key}:lock"
-                lock_token = await acquire_lock(redis, lock_key, ttl=3)
-                if lock_token is None:
-                    await asyncio.sleep(0.05)
-                    cached2 = await cache_get_json(redis, cache_key)
-                    if cached2 is not None:
-                        return ProductPublicListOut.model_validate(cached2)
+        """获取公开商品列表 (价格筛选与排序按促销后的实际价格)"""
+        if sort_by is None:
+            sort_by = "relevance" if keyword else "newest"
 
         async with get_pg() as session:
             products_data, total = await products_repo.get_public_list(
@@ -105,6 +92,8 @@ class ProductService:
                 page_size=page_size,
                 keyword=keyword,
                 category_id=category_id,
+                min_price=min_price,
+                max_price=max_price,
                 sort_by=sort_by,
             )
 
@@ -151,19 +140,58 @@ class ProductService:
 
                 items.append(item)
 
-        out = ProductPublicListOut(
+        return ProductPublicListOut(
             items=items, total=total, page=page, page_size=page_size
         )
 
-        if cache_key:
+    @staticmethod
+    def is_trending_query(
+        *,
+        page: int,
+        keyword: str | None,
+        category_id: str | None,
+        sort_by: str | None,
+        min_price: Decimal | None = None,
+        max_price: Decimal | None = None,
+    ) -> bool:
+        """首页热门榜单 (按热度排序的首页且无筛选条件) 走缓存"""
+        return (
+            sort_by == "popularity_desc"
+            and page == 1
+            and not keyword
+            and not category_id
+            and min_price is None
+            and max_price is None
+        )
+
+    async def get_trending_products_json(self, page_size: int) -> bytes:
+        """获取首页热门商品 (已序列化的 JSON，依次读取本地 L1、Redis 与数据库)"""
+        cache_key = f"cache:home:trending:v2:ps{page_size}"
+        lock_key = f"{cache_key}:lock"
+        async with get_redis() as redis:
+            cached = await cache_get_bytes(redis, cache_key)
+            if cached is not None:
+                return cached
+
+            lock_token = await acquire_lock(redis, lock_key, ttl=3)
+            if lock_token is None:
+                await asyncio.sleep(0.05)
+                cached2 = await cache_get_bytes(redis, cache_key)
+                if cached2 is not None:
+                    return cached2
+
+        try:
+            out = await self.get_public_products(
+                page=1, page_size=page_size, sort_by="popularity_desc"
+            )
             async with get_redis() as redis:
-                await cache_set_json(
+                return await cache_set_bytes(
                     redis, cache_key, out.model_dump(mode="json"), ttl=30
                 )
-                if lock_token:
-                    await release_lock(redis, f"{cache_key}:lock", lock_token)
-
-        return out
+        finally:
+            if lock_token:
+                async with get_redis() as redis:
+                    await release_lock(redis, lock_key, lock_token)
 
     async def get_product(self, user_id: str, product_id: str) -> ProductOut:
         """获取商品详情（商家视角，需验证归属）"""
@@ -185,9 +213,26 @@ class ProductService:
             return product_out
 
     async def get_product_public(self, product_id: str) -> ProductPublicOut:
-        """获取商品详情（公开视角，只返回上架商品）"""
+        """获取商品详情（公开视角，只返回上架商品，读穿透缓存）"""
+        try:
+            pid = uuid.UUID(product_id)
+        except ValueError as e:
+            raise NotFoundError(PRODUCT_NOT_FOUND) from e
+
+        product_out = await product_cache_service.get_detail(
+            pid, lambda: self._load_product_public(pid)
+        )
+
+        # 浏览量写入 Redis 累加，由定时任务批量落库并重算人气分
+        await product_counter_service.incr(pid, "views", 1)
+        return product_out
+
+    async def _load_product_public(self, product_id: uuid.UUID) -> ProductPublicOut:
+        """从数据库组装公开商品详情"""
         async with get_pg() as session:
-            result = await products_repo.get_with_merchant_user(session, product_id)
+            result = await products_repo.get_with_merchant_user(
+                session, str(product_id)
+            )
             if not result:
                 raise NotFoundError(PRODUCT_NOT_FOUND)
 
@@ -201,35 +246,30 @@ class ProductService:
                 session, product.id
             )
 
-            # 注入促销信息
-            from app.services.promotion_service import PromotionService
+        # 注入促销信息
+        from app.services.promotion_service import PromotionService
 
-            promotion_service = PromotionService()
-            active_promotions = (
-                await promotion_service.get_active_promotions_by_product_ids(
-                    [product.id]
-                )
-            )
-
-            if product.id in active_promotions:
-                promo = active_promotions[product.id]
-                from app.schemas.product import ProductPromotionOut
-
-                discount_type = cast(Literal["percent", "fixed"], promo.discount_type)
-                discount_value = Decimal(str(promo.discount_value))
-                product_out.active_promotion = ProductPromotionOut(
-                    id=promo.id,
-                    title=promo.title,
-                    discount_type=discount_type,
-                    discount_value=discount_value,
-                    start_at=promo.start_at,
-                    end_at=promo.end_at,
-                )
+        promotion_service = PromotionService()
+        active_promotions = (
+            await promotion_service.get_active_promotions_by_product_ids([product_id])
+        )
 
-            # 增加浏览量 (触发人气分重算)
-            await products_repo.increment_views(session, product.id)
+        if product_id in active_promotions:
+            promo = active_promotions[product_id]
+            from app.schemas.product import ProductPromotionOut
+
+            discount_type = cast(Literal["percent", "fixed"], promo.discount_type)
+            discount_value = Decimal(str(promo.discount_value))
+            product_out.active_promotion = ProductPromotionOut(
+                id=promo.id,
+                title=promo.title,
+                discount_type=discount_type,
+                discount_value=discount_value,
+                start_at=promo.start_at,
+                end_at=promo.end_at,
+            )
 
-            return product_out
+        return product_out
 
     async def create_product(
         self, user_id: str, payload: ProductCreateIn
@@ -267,7 +307,12 @@ class ProductService:
             product_out = ProductOut.model_validate(product)
             if payload.category_ids:
                 product_out.category_ids = payload.category_ids
-            return product_out
+
+        # 提交成功后再同步库存缓存与平台计数，避免回滚后 Redis 残留不存在的数据
+        async with get_redis() as redis:
+            await redis_stock_service.set_stock(redis, product.id, product.stock)
+        await platform_stats_service.incr("total_products", 1)
+        return product_out
 
     async def update_product(
         self, user_id: str, product_id: str, payload: ProductUpdateIn
@@ -301,6 +346,11 @@ class ProductService:
 
             await products_repo.update(session, product)
 
+            # 改价后按当前促销重新物化实际价格
+            if "price" in update_data:
+                await products_repo.refresh_effective_prices(session, [product.id])
+                await session.refresh(product, ["effective_price"])
+
             # 更新分类关联
             if category_ids is not None:
                 await products_repo.set_categories(session, product.id, category_ids)
@@ -313,7 +363,14 @@ class ProductService:
                 product_out.category_ids = await products_repo.get_categories(
                     session, product.id
                 )
-            return product_out
+
+        # 提交成功后再同步库存缓存，避免回滚后 Redis 残留不存在的库存
+        if "stock" in update_data:
+            async with get_redis() as redis:
+                await redis_stock_service.set_stock(redis, product.id, product.stock)
+        # 提交后再失效详情缓存，避免并发读取以旧数据回填新版本
+        await product_cache_service.invalidate([product_out.id])
+        return product_out
 
     async def update_product_status(
         self, user_id: str, product_id: str, payload: ProductStatusIn
@@ -333,7 +390,14 @@ class ProductService:
             product.status = payload.status
             await products_repo.update(session, product)
 
-            return ProductOut.model_validate(product)
+            product_out = ProductOut.model_validate(product)
+
+        # 上架时同步库存缓存，保证首批下单无需初始化 (提交成功后再写，避免回滚残留)
+        if product.status == "on":
+            async with get_redis() as redis:
+                await redis_stock_service.set_stock(redis, product.id, product.stock)
+        await product_cache_service.invalidate([product_out.id])
+        return product_out
 
     async def delete_product(self, user_id: str, product_id: str) -> None:
         """删除商品"""
@@ -349,3 +413,6 @@ class ProductService:
                 raise NotFoundError(PRODUCT_NOT_FOUND)
 
             await products_repo.delete(session, product)
+
+        await platform_stats_service.incr("total_products", -1)
+        await product_cache_service.invalidate([product_id])
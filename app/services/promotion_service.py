@@ -1,7 +1,10 @@
+import asyncio
 import uuid
+from datetime import UTC, datetime
 
 from app.common.errors import NotFoundError
 from app.database.pgsql.session import get_pg
+from app.database.redis import get_redis
 from app.entity.pgsql.promotions import Promotion
 from app.repo import promotions_repo
 from app.schemas.product import ProductPublicOut
@@ -12,6 +15,9 @@ from app.schemas.promotion import (
     PromotionOut,
     PromotionUpdateIn,
 )
+from app.services.pricing_service import pricing_service
+from app.services.product_cache_service import product_cache_service
+from app.utils.redis_cache import cache_del, local_cache
 
 
 class PromotionService:
@@ -32,7 +38,13 @@ class PromotionService:
             new_promotion = await promotions_repo.create_promotion(
                 session, promotion, data.product_ids
             )
-            return PromotionOut.model_validate(new_promotion)
+            out = PromotionOut.model_validate(new_promotion)
+
+        # 提交后失效有效促销索引，刷新关联商品的实际价格与详情缓存
+        await active_promotion_index.invalidate()
+        await pricing_service.refresh_products(data.product_ids)
+        await product_cache_service.invalidate(data.product_ids)
+        return out
 
     async def update_promotion(
         self, merchant_id: uuid.UUID, promotion_id: uuid.UUID, data: PromotionUpdateIn
@@ -44,6 +56,10 @@ class PromotionService:
 
             update_data = data.model_dump(exclude_unset=True)
             product_ids = update_data.pop("product_ids", None)
+            affected = set(
+                await promotions_repo.get_promotion_product_ids(session, promotion_id)
+            )
+            affected.update(product_ids or [])
 
             updated_promotion = await promotions_repo.update_promotion(
                 session, promotion_id, product_ids, **update_data
@@ -52,7 +68,12 @@ class PromotionService:
             if not updated_promotion:
                 raise NotFoundError("Promotion not found after update")
 
-            return PromotionOut.model_validate(updated_promotion)
+            out = PromotionOut.model_validate(updated_promotion)
+
+        await active_promotion_index.invalidate()
+        await pricing_service.refresh_products(affected)
+        await product_cache_service.invalidate(affected)
+        return out
 
     async def delete_promotion(
         self, merchant_id: uuid.UUID, promotion_id: uuid.UUID
@@ -62,8 +83,15 @@ class PromotionService:
             if not existing or existing.merchant_id != merchant_id:
                 raise NotFoundError("Promotion not found")
 
+            affected = await promotions_repo.get_promotion_product_ids(
+                session, promotion_id
+            )
             await promotions_repo.delete_promotion(session, promotion_id)
 
+        await active_promotion_index.invalidate()
+        await pricing_service.refresh_products(affected)
+        await product_cache_service.invalidate(affected)
+
     async def get_promotion(
         self, merchant_id: uuid.UUID, promotion_id: uuid.UUID
     ) -> PromotionDetailOut:
@@ -99,30 +127,78 @@ class PromotionService:
     async def get_active_promotions_by_product_ids(
         self, product_ids: list[uuid.UUID]
     ) -> dict[uuid.UUID, Promotion]:
-        """获取商品的最佳有效促销活动"""
-        async with get_pg() as session:
-            rows = await promotions_repo.get_active_promotions_by_product_ids(
-                session, product_ids
-            )
+        """获取商品的最佳有效促销活动 (读取进程内索引，不占用数据库连接)"""
+        return await active_promotion_index.get_best(product_ids)
 
-            best_promotions: dict[uuid.UUID, Promotion] = {}
-            for product_id, promotion in rows:
-                # 如果该商品还没有促销，或者当前促销比已有的更好（这里简化为：覆盖即可，因为 SQL 已经按创建时间倒序，
-                # 但更严谨的应该是比较优惠力度。鉴于需求简单，暂以最新创建为准，或后续添加优先级逻辑）
-                # 实际上 repo 返回的是 (product_id, promotion)
-                # 由于我们按 created_at desc 排序，第一个遇到的（即最新的）就是我们想要的
-                # 或者我们可以比较 discount_value.
-
-                if product_id not in best_promotions:
-                    best_promotions[product_id] = promotion
-                else:
-                    # 比较优惠力度 (粗略比较: 百分比越小越好? 不, fixed 越大越好, percent 越大越好 (例如 20% OFF))
-                    # percent: 20 -> 20% OFF
-                    # fixed: 10 -> 减 10
-                    # 很难直接比较不同类型的优惠。
-                    # 简单起见：优先取 discount_value 大的?
-                    # 还是维持 "最新优先" 策略?
-                    # 让我们使用 "最新优先" (SQL 已排序), 所以保留第一个遇到的即可。
-                    pass
-
-            return best_promotions
+
+class ActivePromotionIndex:
+    """
+    进程内有效促销索引：商品 -> 未结束的促销 (按创建时间倒序)
+
+    未开始的促销一并载入，查询时按当前时间筛选，开始/结束边界无需重新加载；
+    促销变更时通过缓存失效广播通知各进程重建，另按固定间隔兜底刷新
+    """
+
+    # 刷新标记键：值为 FRESH 时视为索引有效，被 cache_del 广播清除后重建
+    FRESH_KEY = "local:promotions:index"
+    FRESH = b"1"
+    REFRESH_SECONDS = 60
+
+    def __init__(self) -> None:
+        self._by_product: dict[uuid.UUID, list[Promotion]] = {}
+        self._lock = asyncio.Lock()
+        # 加载代数：每轮加载写入带代数的加载中标记，加载期间的失效会清除该标记
+        self._generation = 0
+
+    async def get_best(
+        self, product_ids: list[uuid.UUID]
+    ) -> dict[uuid.UUID, Promotion]:
+        """按当前时间取每个商品最新创建的进行中促销"""
+        if not product_ids:
+            return {}
+        await self._ensure_fresh()
+        now = datetime.now(UTC)
+        best: dict[uuid.UUID, Promotion] = {}
+        for product_id in product_ids:
+            for promo in self._by_product.get(product_id, ()):
+                if promo.start_at <= now <= promo.end_at:
+                    best[product_id] = promo
+                    break
+        return best
+
+    async def invalidate(self) -> None:
+        """促销变更后调用 (需在事务提交后)，清除本进程及其他进程的索引"""
+        local_cache.delete(self.FRESH_KEY)
+        async with get_redis() as redis:
+            await cache_del(redis, self.FRESH_KEY)
+
+    async def _ensure_fresh(self) -> None:
+        if local_cache.get(self.FRESH_KEY) == self.FRESH:
+            return
+        # 加载进行中 (标记为加载中) 时同样在锁上等待，不读取未建好或已失效的索引
+        async with self._lock:
+            while local_cache.get(self.FRESH_KEY) != self.FRESH:
+                await self._load()
+
+    async def _load(self) -> None:
+        """重建索引，新索引装入后才置有效标记；加载期间被失效 (标记被清除) 时不置标记，由调用方再次重建"""
+        self._generation += 1
+        loading = f"loading:{self._generation}".encode()
+        local_cache.set(self.FRESH_KEY, loading, ttl=self.REFRESH_SECONDS)
+        try:
+            async with get_pg() as session:
+                rows = await promotions_repo.get_unexpired_promotions(
+                    session, datetime.now(UTC)
+                )
+        except Exception:
+            local_cache.delete(self.FRESH_KEY)
+            raise
+        by_product: dict[uuid.UUID, list[Promotion]] = {}
+        for product_id, promotion in rows:
+            by_product.setdefault(product_id, []).append(promotion)
+        self._by_product = by_product
+        if local_cache.get(self.FRESH_KEY) == loading:
+            local_cache.set(self.FRESH_KEY, self.FRESH, ttl=self.REFRESH_SECONDS)
+
+
+active_promotion_index = ActivePromotionIndex()
@@ -27,20 +27,66 @@ end
 return redis.call("DECRBY", key, qty)
 """
 
+# 多商品原子扣减：先全部校验，任一不足则整体不扣，返回 {错误码, 失败下标(从1开始)}
+_DEDUCT_STOCK_MANY_LUA = """
+for i, key in ipairs(KEYS) do
+  local current = redis.call("GET", key)
+  if not current then
+    return {-2, i}
+  end
+
+  local stock = tonumber(current)
+  if not stock then
+    return {-3, i}
+  end
+
+  if stock < tonumber(ARGV[i]) then
+    return {-1, i}
+  end
+end
+
+for i, key in ipairs(KEYS) do
+  redis.call("DECRBY", key, tonumber(ARGV[i]))
+end
+return {0, 0}
+"""
+
 _INCRBY_LUA = """
 local key = KEYS[1]
 local qty = tonumber(ARGV[1])
 return redis.call("INCRBY", key, qty)
 """
 
+# 批量归还：键不存在时不创建 (由下次扣减时从数据库初始化)，返回 -2
+_INCRBY_IF_EXISTS_LUA = """
+local key = KEYS[1]
+if redis.call("EXISTS", key) == 0 then
+  return -2
+end
+return redis.call("INCRBY", key, tonumber(ARGV[1]))
+"""
+
 _DECRBY_LUA = """
 local key = KEYS[1]
 local qty = tonumber(ARGV[1])
 return redis.call("DECRBY", key, qty)
 """
 
+# 对账修复：仅当库存值仍等于对账时读到的值才覆盖，避免吞掉期间发生的扣减/归还
+_COMPARE_AND_SET_LUA = """
+local key = KEYS[1]
+if redis.call("GET", key) == ARGV[1] then
+  redis.call("SET", key, ARGV[2])
+  return 1
+end
+return 0
+"""
+
 
 class RedisStockService:
+    # 上一轮对账发现的漂移 {product_id: drift}，连续两轮一致才修复
+    RECONCILE_SUSPECT_KEY = "stock:reconcile:suspect"
+
     def _stock_key(self, product_id: uuid.UUID) -> str:
         return f"stock:{product_id}"
 
@@ -85,21 +131,67 @@ class RedisStockService:
         if quantity <= 0:
             return True
 
-        await self.ensure_stock_initialized(redis_client, session, product_id, db_stock)
+        # 库存键通常已由启动预热/商品写入同步，直接扣减；仅缺失时再初始化
         key = self._stock_key(product_id)
         result = int(
             await cast(Any, redis_client).eval(_DEDUCT_STOCK_LUA, 1, key, quantity)
         )
-
-        if result >= 0:
-            return True
         if result == -2:
-            await self.sync_stock_from_db(redis_client, session, product_id)
+            await self.ensure_stock_initialized(
+                redis_client, session, product_id, db_stock
+            )
             result = int(
                 await cast(Any, redis_client).eval(_DEDUCT_STOCK_LUA, 1, key, quantity)
             )
-            return result >= 0
-        return False
+        return result >= 0
+
+    async def try_deduct_many(
+        self,
+        redis_client: redis.Redis,
+        session: AsyncSession,
+        items: list[tuple[uuid.UUID, int]],
+        db_stocks: dict[uuid.UUID, int] | None = None,
+    ) -> uuid.UUID | None:
+        """
+        一次 EVAL 原子扣减多个商品的库存 (全部成功或全部不扣)
+
+        :param items: [(product_id, quantity), ...]，同一商品会被合并
+        :param db_stocks: 已查询到的数据库库存，用于缓存缺失时初始化
+        :return: 扣减失败的商品ID；全部成功返回 None
+        """
+        merged: dict[uuid.UUID, int] = {}
+        for product_id, quantity in items:
+            if quantity > 0:
+                merged[product_id] = merged.get(product_id, 0) + quantity
+        if not merged:
+            return None
+
+        product_ids = list(merged.keys())
+        keys = [self._stock_key(pid) for pid in product_ids]
+        quantities = [merged[pid] for pid in product_ids]
+
+        code, index = await self._eval_deduct_many(redis_client, keys, quantities)
+        if code == -2:
+            # 存在未初始化的库存键：批量补齐后重试一次
+            for pid in product_ids:
+                db_stock = (db_stocks or {}).get(pid)
+                if db_stock is None:
+                    await self.ensure_stock_initialized(redis_client, session, pid)
+                else:
+                    await redis_client.setnx(self._stock_key(pid), db_stock)
+            code, index = await self._eval_deduct_many(redis_client, keys, quantities)
+
+        if code >= 0:
+            return None
+        return product_ids[index - 1]
+
+    async def _eval_deduct_many(
+        self, redis_client: redis.Redis, keys: list[str], quantities: list[int]
+    ) -> tuple[int, int]:
+        result = await cast(Any, redis_client).eval(
+            _DEDUCT_STOCK_MANY_LUA, len(keys), *keys, *quantities
+        )
+        return int(result[0]), int(result[1])
 
     async def release(
         self,
@@ -117,6 +209,48 @@ class RedisStockService:
             return
         await cast(Any, redis_client).eval(_INCRBY_LUA, 1, key, quantity)
 
+    async def release_many(
+        self, redis_client: redis.Redis, items: list[tuple[uuid.UUID, int]]
+    ) -> None:
+        """按商品聚合后通过一次 pipeline 批量归还库存"""
+        merged: dict[uuid.UUID, int] = {}
+        for product_id, quantity in items:
+            if quantity > 0:
+                merged[product_id] = merged.get(product_id, 0) + quantity
+        if not merged:
+            return
+
+        pipe = redis_client.pipeline(transaction=False)
+        for product_id, quantity in merged.items():
+            await pipe.eval(
+                _INCRBY_IF_EXISTS_LUA, 1, self._stock_key(product_id), quantity
+            )
+        await pipe.execute()
+
+    async def set_stock(
+        self, redis_client: redis.Redis, product_id: uuid.UUID, stock: int
+    ) -> None:
+        """商品写入后同步库存键 (write-through)"""
+        await redis_client.set(self._stock_key(product_id), int(stock))
+
+    async def warm_up(
+        self, redis_client: redis.Redis, rows: list[tuple[uuid.UUID, int]]
+    ) -> int:
+        """
+        以 pipeline 批量预热一页商品的库存键
+
+        使用 SET NX，不覆盖已存在的键 (其值可能已包含其他进程的扣减)，
+        已存在键与数据库的差异交由对账任务处理。
+
+        :return: 本次新写入的键数量
+        """
+        if not rows:
+            return 0
+        pipe = redis_client.pipeline(transaction=False)
+        for product_id, stock in rows:
+            await pipe.set(self._stock_key(product_id), int(stock), nx=True)
+        return sum(1 for ok in await pipe.execute() if ok)
+
     async def compensate_decr(
         self, redis_client: redis.Redis, product_id: uuid.UUID, quantity: int
     ) -> None:
@@ -125,5 +259,70 @@ class RedisStockService:
         key = self._stock_key(product_id)
         await cast(Any, redis_client).eval(_DECRBY_LUA, 1, key, quantity)
 
+    async def reconcile_page(
+        self, redis_client: redis.Redis, rows: list[tuple[uuid.UUID, int]]
+    ) -> dict[str, int]:
+        """
+        对一页商品执行 Redis 库存与数据库库存对账
+
+        待支付订单在创建时已同时扣减 products.stock，正常情况下两者应相等；
+        只有尚未提交的下单事务会让 Redis 暂时偏低。因此同一漂移值需在连续两轮
+        对账中出现才会修复，修复时再以 CAS 方式写入，避免覆盖并发变更。
+
+        :param rows: [(product_id, db_stock), ...]
+        :return: 本页统计 scanned/missing/drifted/repaired/drift_abs
+        """
+        stats = {
+            "scanned": 0,
+            "missing": 0,
+            "drifted": 0,
+            "repaired": 0,
+            "drift_abs": 0,
+        }
+        if not rows:
+            return stats
+
+        keys = [self._stock_key(pid) for pid, _ in rows]
+        fields = [str(pid) for pid, _ in rows]
+        pipe = redis_client.pipeline(transaction=False)
+        await pipe.mget(keys)
+        await pipe.hmget(self.RECONCILE_SUSPECT_KEY, fields)
+        cached_values, suspects = await pipe.execute()
+
+        bookkeeping = redis_client.pipeline(transaction=False)
+        repair = redis_client.pipeline(transaction=False)
+        for (_, db_stock), key, field, cached, suspect in zip(
+            rows, keys, fields, cached_values, suspects, strict=True
+        ):
+            stats["scanned"] += 1
+            if cached is None:
+                # 未预热的商品由首次下单懒加载，不视为漂移
+                stats["missing"] += 1
+                if suspect is not None:
+                    await bookkeeping.hdel(self.RECONCILE_SUSPECT_KEY, field)
+                continue
+
+            drift = int(cached) - db_stock if cached.lstrip("-").isdigit() else None
+            if drift == 0:
+                if suspect is not None:
+                    await bookkeeping.hdel(self.RECONCILE_SUSPECT_KEY, field)
+                continue
+
+            stats["drifted"] += 1
+            if drift is None or suspect == str(drift):
+                # 非数字值直接修复；数值漂移需与上一轮一致
+                await repair.eval(_COMPARE_AND_SET_LUA, 1, key, cached, db_stock)
+                await bookkeeping.hdel(self.RECONCILE_SUSPECT_KEY, field)
+            else:
+                await bookkeeping.hset(self.RECONCILE_SUSPECT_KEY, field, drift)
+            if drift is not None:
+                stats["drift_abs"] += abs(drift)
+
+        if len(repair):
+            stats["repaired"] = sum(int(r) for r in await repair.execute())
+        if len(bookkeeping):
+            await bookkeeping.execute()
+        return stats
+
 
 redis_stock_service = RedisStockService()
@@ -32,6 +32,7 @@ from app.schemas.report import (
     ReportListOut,
 )
 from app.services.notification_service import notification_service
+from app.services.product_cache_service import product_cache_service
 
 
 class ReportService:
@@ -183,6 +184,9 @@ class ReportService:
             )
             await session.commit()
 
+        if action_applied and report.target_type == "product":
+            await product_cache_service.invalidate([report.target_id])
+
         if payload.result == "success":
             notify_content = "你提交的举报已处理：举报成立，目标内容已下架/移除"
         else:
@@ -1,3 +1,5 @@
+from datetime import UTC, datetime, timedelta
+
 from app.common.errors import BusinessError
 from app.database.pgsql import get_pg
 from app.repo import merchants_repo, statistics_repo
@@ -44,3 +46,11 @@ class StatisticsService:
             data = await statistics_repo.get_top_products(session, merchant.id, limit)
             items = [ProductRankingItem.model_validate(item) for item in data]
             return ProductRankingOut(items=items)
+
+    async def rebuild_sales_rollups(self, days: int | None = None) -> None:
+        """从订单明细重建日销售汇总 (days 为空时全量重建)"""
+        since = None
+        if days is not None:
+            since = (datetime.now(UTC) - timedelta(days=days)).date()
+        async with get_pg() as session:
+            await statistics_repo.rebuild_sales_rollups(session, since)
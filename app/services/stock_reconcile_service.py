@@ -0,0 +1,77 @@
+"""库存缓存维护服务：Redis 库存键预热，以及与 products.stock 的对账修复"""
+
+import time
+import uuid
+
+from app.database.pgsql import get_pg
+from app.database.redis import get_redis
+from app.repo import products_repo
+from app.services.redis_stock_service import redis_stock_service
+
+
+class StockReconcileService:
+    """库存缓存维护服务"""
+
+    # 最近一轮对账的统计结果，供运维/监控读取
+    STATS_KEY = "stock:reconcile:stats"
+    PAGE_SIZE = 500
+
+    async def warm_up_all(self, page_size: int = PAGE_SIZE) -> int:
+        """分页加载全部上架商品库存并写入 Redis，返回新写入的键数量"""
+        warmed = 0
+        after_id: uuid.UUID | None = None
+        while True:
+            async with get_pg() as session:
+                rows = await products_repo.get_stock_page(
+                    session, after_id=after_id, limit=page_size, status="on"
+                )
+            if not rows:
+                break
+
+            async with get_redis() as redis_client:
+                warmed += await redis_stock_service.warm_up(redis_client, rows)
+
+            after_id = rows[-1][0]
+            if len(rows) < page_size:
+                break
+        return warmed
+
+    async def reconcile_all(self, page_size: int = PAGE_SIZE) -> dict[str, int]:
+        """按主键分页扫描全部商品，逐页与 Redis 库存对账"""
+        started = time.monotonic()
+        totals = {
+            "scanned": 0,
+            "missing": 0,
+            "drifted": 0,
+            "repaired": 0,
+            "drift_abs": 0,
+        }
+        after_id: uuid.UUID | None = None
+        while True:
+            # 每页使用独立的短事务，避免对账期间长期占用连接
+            async with get_pg() as session:
+                rows = await products_repo.get_stock_page(
+                    session, after_id=after_id, limit=page_size
+                )
+            if not rows:
+                break
+
+            async with get_redis() as redis_client:
+                page_stats = await redis_stock_service.reconcile_page(
+                    redis_client, rows
+                )
+            for name, value in page_stats.items():
+                totals[name] += value
+
+            after_id = rows[-1][0]
+            if len(rows) < page_size:
+                break
+
+        totals["duration_ms"] = int((time.monotonic() - started) * 1000)
+        totals["finished_at"] = int(time.time())
+        async with get_redis() as redis_client:
+            await redis_client.hset(self.STATS_KEY, mapping=totals)  # type: ignore
+        return totals
+
+
+stock_reconcile_service = StockReconcileService()
@@ -0,0 +1,69 @@
+"""库存预留台账：记录待支付订单占用库存的到期时间 (Redis ZSET)"""
+
+import time
+import uuid
+from typing import Any, cast
+
+import redis.asyncio as redis
+
+# 原子领取到期预留：取出 score <= now 的成员，并将其 score 推后一个租约周期。
+# 处理成功后由调用方 ZREM；若 worker 中途崩溃，租约到期后会被重新领取。
+_CLAIM_DUE_LUA = """
+local key = KEYS[1]
+local now = tonumber(ARGV[1])
+local limit = tonumber(ARGV[2])
+local lease_until = tonumber(ARGV[3])
+
+local members = redis.call("ZRANGEBYSCORE", key, "-inf", now, "LIMIT", 0, limit)
+for _, member in ipairs(members) do
+  redis.call("ZADD", key, lease_until, member)
+end
+return members
+"""
+
+
+class StockReservationService:
+    """库存预留台账服务"""
+
+    LEDGER_KEY = "stock:reservations"
+    # 待支付订单的库存占用时长 (与订单通知中的 15 分钟支付时限一致)
+    HOLD_SECONDS = 15 * 60
+    # 领取后的处理租约
+    CLAIM_LEASE_SECONDS = 60
+
+    async def record(
+        self,
+        redis_client: redis.Redis,
+        order_id: uuid.UUID | str,
+        expire_at: float | None = None,
+    ) -> None:
+        """记录订单的库存占用，到期时间默认为当前时间 + HOLD_SECONDS"""
+        if expire_at is None:
+            expire_at = time.time() + self.HOLD_SECONDS
+        await redis_client.zadd(self.LEDGER_KEY, {str(order_id): expire_at})
+
+    async def remove(
+        self, redis_client: redis.Redis, *order_ids: uuid.UUID | str
+    ) -> None:
+        """订单已支付/已取消/已释放后移除预留记录"""
+        if order_ids:
+            await redis_client.zrem(self.LEDGER_KEY, *[str(oid) for oid in order_ids])
+
+    async def claim_due(
+        self, redis_client: redis.Redis, limit: int = 200, now: float | None = None
+    ) -> list[str]:
+        """领取一批已到期的预留 (订单ID)"""
+        if now is None:
+            now = time.time()
+        members = await cast(Any, redis_client).eval(
+            _CLAIM_DUE_LUA,
+            1,
+            self.LEDGER_KEY,
+            now,
+            limit,
+            now + self.CLAIM_LEASE_SECONDS,
+        )
+        return [str(m) for m in members]
+
+
+stock_reservation_service = StockReservationService()
@@ -1,11 +1,12 @@
 from taskiq import TaskiqScheduler
 from taskiq.schedule_sources import LabelScheduleSource
-from taskiq_aio_pika import AioPikaBroker
+from taskiq_aio_pika import AioPikaBroker, Queue
 
 from app.core import config
 
 # 选择 RabbitMQ 作为消息中间件
-broker = AioPikaBroker(config.RABBITMQ_URL)
+# delay_queue: 带 delay 标签的消息先进入该队列，按消息 TTL 到期后死信回主队列执行
+broker = AioPikaBroker(config.RABBITMQ_URL, delay_queue=Queue(name="taskiq.delay"))
 
 # 定义调度器，用于处理通过装饰器 schedule 参数定义的定时任务
 scheduler = TaskiqScheduler(
@@ -25,10 +25,30 @@ async def check_order_timeout():
         return 0
 
 
-@broker.task(task_name="cancel_expired_orders_task", schedule=[{"cron": "* * * * *"}])
+@broker.task(task_name="release_expired_reservations_task", schedule=[{"interval": 5}])
+async def release_expired_reservations_task():
+    """
+    每 5 秒从库存预留台账领取到期的预留，取消未支付订单并归还库存
+    """
+    from app.api.deps import get_order_service
+
+    service = get_order_service()
+    try:
+        count = await service.release_expired_reservations()
+        if count > 0:
+            logger.info(f"[Reservation] Released {count} expired pending orders.")
+        return count
+    except Exception as e:
+        logger.error(f"[Reservation] Error occurred: {e}")
+        return 0
+
+
+@broker.task(
+    task_name="cancel_expired_orders_task", schedule=[{"cron": "*/10 * * * *"}]
+)
 async def cancel_expired_orders_task():
     """
-    定期扫描并自动取消超过 15 分钟仍未支付的订单
+    兜底扫描：取消超过 15 分钟仍未支付、但未被预留台账释放的订单
     """
     from app.api.deps import get_order_service
 
@@ -51,18 +71,19 @@ async def cancel_expired_orders_task():
     task_name="cancel_unpaid_order_task",
     max_retries=3,
 )
-async def cancel_unpaid_order_task(order_id: str, user_id: str):
+async def cancel_unpaid_order_task(order_id: str):
     """
-    超时自动取消未支付订单
+    支付超时自动取消订单 (下单提交后以延时消息投递，在支付截止时刻执行)
     """
     from app.api.deps import get_order_service
 
     service = get_order_service()
     try:
-        await service.cancel_order(user_id=user_id, order_id=order_id)
-        logger.info(f"[AutoCancel] Successfully cancelled order {order_id}.")
+        cancelled = await service.cancel_unpaid_order(order_id)
+        if cancelled:
+            logger.info(f"[AutoCancel] Successfully cancelled order {order_id}.")
     except Exception as e:
-        logger.error(f"[AutoCancel] Skipped or failed for order {order_id}: {e}")
+        logger.error(f"[AutoCancel] Failed for order {order_id}: {e}")
         raise e
 
 
@@ -81,3 +102,115 @@ async def send_verification_email_task(email: str, code: str):
     success = await service.send_verification_email(email, code)
     if not success:
         raise Exception("Failed to send email")
+
+
+@broker.task(task_name="reconcile_stock_task", schedule=[{"cron": "*/5 * * * *"}])
+async def reconcile_stock_task():
+    """
+    定期对账 Redis 库存计数与数据库库存，修复连续两轮一致的漂移
+    """
+    from app.services.stock_reconcile_service import stock_reconcile_service
+
+    try:
+        stats = await stock_reconcile_service.reconcile_all()
+        if stats["drifted"] > 0:
+            logger.warning(
+                f"[StockReconcile] scanned={stats['scanned']} drifted={stats['drifted']} "
+                f"repaired={stats['repaired']} drift_abs={stats['drift_abs']}"
+            )
+        else:
+            logger.info(f"[StockReconcile] scanned={stats['scanned']} no drift found.")
+        return stats
+    except Exception as e:
+        logger.error(f"[StockReconcile] Error occurred: {e}")
+        return None
+
+
+@broker.task(task_name="rebuild_sales_rollups_task", schedule=[{"cron": "30 3 * * *"}])
+async def rebuild_sales_rollups_task(days: int | None = 3):
+    """
+    每日重建最近几天的销售日汇总，纠正增量维护可能产生的偏差；
+    手动以 days=None 投递时执行全量回填
+    """
+    from app.services.statistics_service import StatisticsService
+
+    try:
+        await StatisticsService().rebuild_sales_rollups(days)
+        logger.info(f"[SalesRollup] Rebuilt sales rollups (days={days}).")
+    except Exception as e:
+        logger.error(f"[SalesRollup] Error occurred: {e}")
+
+
+@broker.task(
+    task_name="recount_platform_stats_task", schedule=[{"cron": "*/10 * * * *"}]
+)
+async def recount_platform_stats_task():
+    """
+    定期精确重算平台统计计数，纠正事件计数的偏差
+    """
+    from app.services.platform_stats_service import platform_stats_service
+
+    try:
+        stats = await platform_stats_service.recount()
+        logger.info(f"[PlatformStats] Recounted: {stats}")
+        return stats
+    except Exception as e:
+        logger.error(f"[PlatformStats] Error occurred: {e}")
+        return None
+
+
+@broker.task(task_name="flush_product_counters_task", schedule=[{"interval": 30}])
+async def flush_product_counters_task():
+    """
+    定期将 Redis 中累加的商品计数增量批量落库并重算人气分
+    """
+    from app.services.product_counter_service import product_counter_service
+
+    try:
+        flushed = await product_counter_service.flush()
+        if flushed:
+            logger.info(f"[ProductCounter] Flushed counters of {flushed} products.")
+        return flushed
+    except Exception as e:
+        logger.error(f"[ProductCounter] Error occurred: {e}")
+        return None
+
+
+@broker.task(task_name="flush_post_views_task", schedule=[{"interval": 30}])
+async def flush_post_views_task():
+    """
+    定期将 Redis 中累加的帖子浏览量批量落库
+    """
+    from app.services.post_view_service import post_view_service
+
+    try:
+        flushed = await post_view_service.flush()
+        if flushed:
+            logger.info(f"[PostView] Flushed view counts of {flushed} posts.")
+        return flushed
+    except Exception as e:
+        logger.error(f"[PostView] Error occurred: {e}")
+        return None
+
+
+@broker.task(
+    task_name="refresh_effective_prices_task", schedule=[{"cron": "* * * * *"}]
+)
+async def refresh_effective_prices_task(full: bool = False):
+    """
+    每分钟刷新自上一轮成功以来开始或结束的促销所关联商品的实际价格；
+    手动以 full=True 投递时全量刷新
+    """
+    from app.services.pricing_service import pricing_service
+
+    try:
+        if full:
+            updated = await pricing_service.refresh_all()
+        else:
+            updated = await pricing_service.refresh_boundaries()
+        if updated:
+            logger.info(f"[Pricing] Refreshed effective price of {updated} products.")
+        return updated
+    except Exception as e:
+        logger.error(f"[Pricing] Error occurred: {e}")
+        return None
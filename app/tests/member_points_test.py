@@ -163,6 +163,7 @@ async def test_member_points_full_workflow(cleanup):
                 id=uuid.uuid4(),
                 order_id=order_id,
                 product_id=product_id,
+                merchant_id=m_id,
                 quantity=1,
                 unit_price=Decimal("99.00"),
             )
@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+from fastapi import BackgroundTasks, FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.metrics import (
+    Histogram,
+    add_db_time,
+    count_call,
+    http_request_duration_seconds,
+    registry,
+)
+from app.middleware.metrics import MetricsMiddleware
+from app.tests.query_budget import assert_max_queries
+
+
+def _make_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int):
+        count_call("pgsql")
+        count_call("pgsql")
+        count_call("redis")
+        return {"id": item_id}
+
+    return app
+
+
+def test_middleware_labels_by_route_template_and_counts_backend_calls():
+    client = TestClient(_make_app())
+    assert client.get("/items/1").status_code == 200
+    assert client.get("/items/2").status_code == 200
+    assert client.get("/missing").status_code == 404
+
+    text = registry.render()
+    assert (
+        'http_requests_total{method="GET",route="/items/{item_id}",status="200"} 2'
+        in text
+    )
+    assert 'http_requests_total{method="GET",route="<unmatched>",status="404"}' in text
+    assert (
+        'http_request_backend_calls_bucket{route="/items/{item_id}",backend="pgsql",le="2"} 2'
+        in text
+    )
+    assert 'http_requests_in_progress{method="GET"} 0' in text
+
+
+def test_histogram_renders_cumulative_buckets():
+    h = Histogram("latency", "test", ("route",), buckets=(0.1, 1))
+    h.observe(0.05, "/a")
+    h.observe(0.5, "/a")
+    h.observe(3, "/a")
+
+    assert h.render()[2:] == [
+        'latency_bucket{route="/a",le="0.1"} 1',
+        'latency_bucket{route="/a",le="1"} 2',
+        'latency_bucket{route="/a",le="+Inf"} 3',
+        'latency_sum{route="/a"} 3.55',
+        'latency_count{route="/a"} 3',
+    ]
+
+
+def test_query_headers_and_budget():
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/orders")
+    async def list_orders():
+        # 模拟 N+1：列表查询一次，每个订单再查一次明细
+        for backend in ("pgsql", "pgsql", "pgsql", "mongodb", "redis"):
+            count_call(backend)
+        add_db_time("pgsql", 0.012)
+        return []
+
+    response = TestClient(app).get("/orders")
+
+    assert response.headers["X-Query-Count"] == "4"
+    assert response.headers["Server-Timing"].startswith(
+        'pgsql;dur=12.0;desc="3 queries", mongodb;dur=0.0;desc="1 queries", app;dur='
+    )
+    assert_max_queries(response, 4)
+    with pytest.raises(AssertionError, match="超过上限 3"):
+        assert_max_queries(response, 3)
+
+
+def test_latency_excludes_background_tasks():
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    async def slow_task():
+        await asyncio.sleep(0.3)
+
+    @app.get("/with-background")
+    async def with_background(background_tasks: BackgroundTasks):
+        background_tasks.add_task(slow_task)
+        return {}
+
+    assert TestClient(app).get("/with-background").status_code == 200
+
+    counts, (total, count) = http_request_duration_seconds._values[
+        ("GET", "/with-background")
+    ]
+    assert count == 1 and total < 0.3
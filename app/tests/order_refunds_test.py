@@ -77,6 +77,7 @@ async def setup_data():
         order_item = OrderItem(
             order_id=order_id,
             product_id=product_id,
+            merchant_id=merchant_id,
             quantity=1,
             unit_price=Decimal("100.00"),
         )
@@ -0,0 +1,50 @@
+import uuid
+from typing import Any
+
+import pytest
+
+from app.services.order_service import OrderService
+from app.services.stock_reservation_service import stock_reservation_service
+from app.tasks.tasks import cancel_unpaid_order_task
+
+
+class FakeKicker:
+    def __init__(self, fail: bool = False) -> None:
+        self.fail = fail
+        self.labels: dict[str, Any] = {}
+        self.args: tuple[Any, ...] = ()
+
+    def with_labels(self, **labels: Any) -> "FakeKicker":
+        self.labels.update(labels)
+        return self
+
+    async def kiq(self, *args: Any) -> None:
+        if self.fail:
+            raise ConnectionError("broker unavailable")
+        self.args = args
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_schedule_payment_timeout_sends_delayed_message(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    kicker = FakeKicker()
+    monkeypatch.setattr(cancel_unpaid_order_task, "kicker", lambda: kicker)
+    order_id = uuid.uuid4()
+
+    await OrderService().schedule_payment_timeout(order_id)
+
+    assert kicker.labels == {"delay": stock_reservation_service.HOLD_SECONDS}
+    assert kicker.args == (str(order_id),)
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_schedule_payment_timeout_swallows_broker_errors(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    monkeypatch.setattr(
+        cancel_unpaid_order_task, "kicker", lambda: FakeKicker(fail=True)
+    )
+
+    # 投递失败不影响下单，由预留台账兜底
+    await OrderService().schedule_payment_timeout(uuid.uuid4())
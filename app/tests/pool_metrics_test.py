@@ -0,0 +1,55 @@
+import pytest
+from pymongo import monitoring
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app.database import pool_metrics
+from app.database.pool_metrics import (
+    MongoPoolListener,
+    PoolStats,
+    TimedConnectionPool,
+)
+
+
+def test_pool_stats_snapshot_tracks_wait_and_failures():
+    stats = PoolStats()
+    stats.record(0.002)
+    stats.record(0.004)
+    stats.record(0.030, ok=False)
+
+    assert stats.snapshot() == {
+        "checkouts": 2,
+        "failures": 1,
+        "wait_avg_ms": 12.0,
+        "wait_max_ms": 30.0,
+    }
+
+
+def test_mongo_listener_counts_in_use_and_checkout_wait(monkeypatch):
+    stats = PoolStats()
+    monkeypatch.setattr(pool_metrics, "mongo_pool_stats", stats)
+    listener = MongoPoolListener()
+    address = ("127.0.0.1", 27017)
+
+    listener.connection_created(monitoring.ConnectionCreatedEvent(address, 1))
+    listener.connection_checked_out(
+        monitoring.ConnectionCheckedOutEvent(address, 1, 0.005)
+    )
+    assert (listener.open, listener.in_use) == (1, 1)
+
+    listener.connection_checked_in(monitoring.ConnectionCheckedInEvent(address, 1))
+    assert listener.in_use == 0
+    assert stats.checkouts == 1 and stats.wait_max == 0.005
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_redis_pool_records_failed_checkout(monkeypatch):
+    stats = PoolStats()
+    monkeypatch.setattr(pool_metrics, "redis_pool_stats", stats)
+    # 无服务监听的端口：建连失败计为一次取连接失败
+    pool = TimedConnectionPool.from_url("redis://127.0.0.1:1/0", max_connections=1)
+
+    with pytest.raises(RedisConnectionError):
+        await pool.get_connection()
+
+    assert (stats.checkouts, stats.failures) == (0, 1)
+    await pool.disconnect()
@@ -0,0 +1,83 @@
+import hashlib
+import uuid
+from contextlib import asynccontextmanager
+from typing import Any
+
+import pytest
+
+from app.services import post_view_service as post_view_module
+from app.services.post_view_service import _RECORD_VIEW_LUA, post_view_service
+
+# 与 Redis 相同的 HyperLogLog 参数：16384 个寄存器，其余 50 位计算前导位置
+HLL_P = 14
+HLL_REGISTERS = 1 << HLL_P
+
+
+class FakeRedis:
+    """按 Redis 语义模拟 SET NX、HINCRBY 与 HyperLogLog 寄存器 (PFADD 仅在寄存器变化时返回 1)"""
+
+    def __init__(self) -> None:
+        self.strings: dict[str, str] = {}
+        self.hashes: dict[str, dict[str, int]] = {}
+        self.hlls: dict[str, list[int]] = {}
+
+    def set_nx(self, key: str, value: str) -> bool:
+        if key in self.strings:
+            return False
+        self.strings[key] = value
+        return True
+
+    def hincrby(self, name: str, field: str, amount: int) -> int:
+        h = self.hashes.setdefault(name, {})
+        h[field] = h.get(field, 0) + amount
+        return h[field]
+
+    def pfadd(self, key: str, element: str) -> int:
+        registers = self.hlls.setdefault(key, [0] * HLL_REGISTERS)
+        digest = hashlib.blake2b(element.encode(), digest_size=8).digest()
+        h = int.from_bytes(digest, "little")
+        index = h & (HLL_REGISTERS - 1)
+        rest = (h >> HLL_P) | (1 << (64 - HLL_P))
+        count = ((rest & -rest).bit_length() - 1) + 1
+        if count > registers[index]:
+            registers[index] = count
+            return 1
+        return 0
+
+    async def eval(self, script: str, numkeys: int, *args: Any) -> int:
+        assert script == _RECORD_VIEW_LUA
+        viewed, pending, viewers = args[:numkeys]
+        _window, post_id, viewer_id, _ttl = args[numkeys:]
+        counted = 0
+        if self.set_nx(viewed, "1"):
+            self.hincrby(pending, post_id, 1)
+            counted = 1
+        self.pfadd(viewers, viewer_id)
+        return counted
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_record_view_counts_every_distinct_viewer(monkeypatch):
+    fake = FakeRedis()
+
+    @asynccontextmanager
+    async def fake_get_redis():
+        yield fake
+
+    monkeypatch.setattr(post_view_module, "get_redis", fake_get_redis)
+    pid = uuid.uuid4()
+    viewers = 20_000
+
+    counted = 0
+    pfadd_changed = 0
+    probe = FakeRedis()
+    for i in range(viewers):
+        counted += await post_view_service.record_view(pid, f"user_{i}")
+        pfadd_changed += probe.pfadd("probe", f"user_{i}")
+    # 窗口内重复浏览不再计数
+    assert not await post_view_service.record_view(pid, "user_0")
+
+    assert counted == viewers
+    assert fake.hashes[post_view_service.PENDING_KEY] == {str(pid): viewers}
+    # 访客较多时大量新访客不会改变任何寄存器，以 PFADD 返回值计数会丢失浏览量
+    assert pfadd_changed < viewers * 0.9
@@ -0,0 +1,63 @@
+from contextlib import asynccontextmanager
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from app.services import pricing_service as pricing_module
+from app.services.pricing_service import pricing_service
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.store: dict[str, str] = {}
+
+    async def get(self, key: str) -> str | None:
+        return self.store.get(key)
+
+    async def set(self, key: str, value: str) -> None:
+        self.store[key] = value
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_refresh_boundaries_resumes_from_watermark(monkeypatch):
+    fake = FakeRedis()
+    windows: list[tuple[datetime, datetime]] = []
+    full_refreshes: list[datetime | None] = []
+
+    @asynccontextmanager
+    async def fake_ctx():
+        yield fake
+
+    async def get_boundary_product_ids(session, since, until):
+        windows.append((since, until))
+        return []
+
+    async def refresh_effective_prices(session, product_ids=None, now=None):
+        if product_ids is None:
+            full_refreshes.append(now)
+        return 0
+
+    monkeypatch.setattr(pricing_module, "get_redis", fake_ctx)
+    monkeypatch.setattr(pricing_module, "get_pg", fake_ctx)
+    monkeypatch.setattr(
+        pricing_module.promotions_repo,
+        "get_boundary_product_ids",
+        get_boundary_product_ids,
+    )
+    monkeypatch.setattr(
+        pricing_module.products_repo,
+        "refresh_effective_prices",
+        refresh_effective_prices,
+    )
+
+    # 无水位时全量刷新
+    await pricing_service.refresh_boundaries()
+    assert len(full_refreshes) == 1 and not windows
+
+    # 任务停摆一小时后，从上一轮水位补扫整个区间
+    stale = datetime.now(UTC) - timedelta(hours=1)
+    fake.store[pricing_service.WATERMARK_KEY] = stale.isoformat()
+    await pricing_service.refresh_boundaries()
+    since, until = windows[-1]
+    assert since == stale - pricing_service.BOUNDARY_OVERLAP
+    assert fake.store[pricing_service.WATERMARK_KEY] == until.isoformat()
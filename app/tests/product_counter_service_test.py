@@ -0,0 +1,79 @@
+import uuid
+from typing import Any, cast
+
+import pytest
+
+from app.services.product_counter_service import product_counter_service
+from app.utils.write_behind import ACK_BATCH_LUA, CLAIM_BATCH_LUA
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.hashes: dict[str, dict[str, int]] = {}
+        self.strings: dict[str, str] = {}
+
+    async def hincrby(self, name: str, field: str, amount: int) -> int:
+        h = self.hashes.setdefault(name, {})
+        h[field] = h.get(field, 0) + amount
+        return h[field]
+
+    async def hgetall(self, name: str) -> dict[str, str]:
+        return {k: str(v) for k, v in self.hashes.get(name, {}).items()}
+
+    async def eval(self, script: str, numkeys: int, *args: Any) -> int:
+        keys, argv = args[:numkeys], args[numkeys:]
+        if script == CLAIM_BATCH_LUA:
+            pending, flushing, owner = keys
+            if owner in self.strings:
+                return 0
+            if flushing not in self.hashes:
+                if pending not in self.hashes:
+                    return 0
+                self.hashes[flushing] = self.hashes.pop(pending)
+            self.strings[owner] = argv[0]
+            return 1
+        assert script == ACK_BATCH_LUA
+        flushing, owner = keys
+        if self.strings.get(owner) != argv[0]:
+            return 0
+        self.hashes.pop(flushing, None)
+        del self.strings[owner]
+        return 1
+
+    def expire_lease(self, flushing: str) -> None:
+        self.strings.pop(f"{flushing}:owner", None)
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_claim_aggregates_pending_and_is_exclusive_until_ack():
+    fake = FakeRedis()
+    r = cast(Any, fake)
+    pid = uuid.uuid4()
+    pending = product_counter_service.PENDING_KEY
+
+    await r.hincrby(pending, f"{pid}:views", 3)
+    await r.hincrby(pending, f"{pid}:likes", -1)
+    await r.hincrby(pending, "bad-id:views", 1)
+
+    claimed = await product_counter_service.claim(r)
+    assert claimed is not None
+    token, deltas = claimed
+    assert deltas == {pid: {"views": 3, "likes": -1}}
+
+    # 领取后的新增量进入新的累加哈希，不影响处理中批次
+    await r.hincrby(pending, f"{pid}:views", 1)
+    # 租约持有期间重叠执行的任务不能再领取同一批次
+    assert await product_counter_service.claim(r) is None
+
+    # 持有者中断、租约过期后由下一轮接管重试，旧令牌无法再确认
+    fake.expire_lease(product_counter_service.FLUSHING_KEY)
+    retried = await product_counter_service.claim(r)
+    assert retried is not None and retried[1] == deltas
+    await product_counter_service.ack(r, token)
+    assert product_counter_service.FLUSHING_KEY in fake.hashes
+
+    await product_counter_service.ack(r, retried[0])
+    claimed = await product_counter_service.claim(r)
+    assert claimed is not None and claimed[1] == {pid: {"views": 1}}
+    await product_counter_service.ack(r, claimed[0])
+    assert await product_counter_service.claim(r) is None
@@ -0,0 +1,22 @@
+from sqlalchemy.dialects import postgresql
+
+from app.repo.products_repo import build_prefix_tsquery, search_condition
+from app.utils.common import escape_like
+
+
+def test_build_prefix_tsquery_tokenizes_and_strips_operators():
+    assert build_prefix_tsquery("塞尔达 NS") == "塞尔达:* & ns:*"
+    assert build_prefix_tsquery("ps5 & (pro) | !") == "ps5:* & pro:*"
+    assert build_prefix_tsquery(" !&| ") is None
+
+
+def test_escape_like_escapes_wildcards():
+    assert escape_like("100%_off\\") == "100\\%\\_off\\\\"
+
+
+def test_search_condition_uses_tsvector_and_trigram_match():
+    condition, rank = search_condition("zelda")
+    sql = str(condition.compile(dialect=postgresql.dialect()))
+    assert "products.search_vector @@ to_tsquery" in sql
+    assert "ILIKE" in sql
+    assert "ts_rank_cd" in str(rank.compile(dialect=postgresql.dialect()))
@@ -0,0 +1,114 @@
+import asyncio
+import uuid
+from contextlib import asynccontextmanager
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from app.entity.pgsql.promotions import Promotion
+from app.services import promotion_service as promotion_module
+from app.services.promotion_service import ActivePromotionIndex
+from app.utils.redis_cache import local_cache
+
+
+def _promotion(title: str, start: timedelta, end: timedelta) -> Promotion:
+    now = datetime.now(UTC)
+    return Promotion(
+        id=uuid.uuid4(),
+        merchant_id=uuid.uuid4(),
+        title=title,
+        discount_type="percent",
+        discount_value=10,
+        start_at=now + start,
+        end_at=now + end,
+        status="active",
+    )
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_index_filters_by_current_time_without_reload():
+    index = ActivePromotionIndex()
+    pid, other = uuid.uuid4(), uuid.uuid4()
+    upcoming = _promotion("upcoming", timedelta(hours=1), timedelta(hours=2))
+    running = _promotion("running", -timedelta(hours=1), timedelta(hours=1))
+    index._by_product = {pid: [upcoming, running]}
+    local_cache.set(index.FRESH_KEY, b"1", ttl=60)
+
+    # 未开始的促销不生效，按倒序取第一个进行中的促销
+    assert await index.get_best([pid, other]) == {pid: running}
+    local_cache.delete(index.FRESH_KEY)
+
+
+class SlowLoader:
+    """模拟慢查询的促销加载：每轮加载等待放行后返回当前的促销列表"""
+
+    def __init__(self, rows: list[tuple[uuid.UUID, Promotion]]) -> None:
+        self.rows = rows
+        self.calls = 0
+        self.started = asyncio.Event()
+        self.release = asyncio.Event()
+
+    async def get_unexpired_promotions(self, session, now):
+        self.calls += 1
+        rows = list(self.rows)
+        self.started.set()
+        await self.release.wait()
+        return rows
+
+
+def _patch_loader(monkeypatch, loader: SlowLoader) -> None:
+    @asynccontextmanager
+    async def fake_get_pg():
+        yield None
+
+    monkeypatch.setattr(promotion_module, "get_pg", fake_get_pg)
+    monkeypatch.setattr(
+        promotion_module.promotions_repo,
+        "get_unexpired_promotions",
+        loader.get_unexpired_promotions,
+    )
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_concurrent_readers_wait_for_in_progress_load(monkeypatch):
+    index = ActivePromotionIndex()
+    pid = uuid.uuid4()
+    running = _promotion("running", -timedelta(hours=1), timedelta(hours=1))
+    loader = SlowLoader([(pid, running)])
+    _patch_loader(monkeypatch, loader)
+    local_cache.delete(index.FRESH_KEY)
+
+    first = asyncio.create_task(index.get_best([pid]))
+    await loader.started.wait()
+    # 加载进行中到达的读取不能读到空索引
+    second = asyncio.create_task(index.get_best([pid]))
+    await asyncio.sleep(0)
+    assert not second.done()
+
+    loader.release.set()
+    assert await first == {pid: running}
+    assert await second == {pid: running}
+    assert loader.calls == 1
+    local_cache.delete(index.FRESH_KEY)
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_invalidation_during_load_forces_rebuild(monkeypatch):
+    index = ActivePromotionIndex()
+    pid = uuid.uuid4()
+    running = _promotion("running", -timedelta(hours=1), timedelta(hours=1))
+    loader = SlowLoader([(pid, running)])
+    _patch_loader(monkeypatch, loader)
+    local_cache.delete(index.FRESH_KEY)
+
+    reader = asyncio.create_task(index.get_best([pid]))
+    await loader.started.wait()
+    # 加载读取之后促销被删除并广播失效，本轮结果已过期
+    loader.rows = []
+    local_cache.delete(index.FRESH_KEY)
+    loader.release.set()
+
+    assert await reader == {}
+    assert loader.calls == 2
+    assert local_cache.get(index.FRESH_KEY) == index.FRESH
+    local_cache.delete(index.FRESH_KEY)
@@ -0,0 +1,31 @@
+"""查询次数预算：断言接口或代码块内的数据库查询次数不超过上限，用于在 CI 中拦截 N+1 回归"""
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from httpx import Response
+
+from app.core.metrics import RequestStats, track_request
+
+
+def assert_max_queries(response: Response, limit: int) -> None:
+    """
+    断言一次接口调用的查询次数 (PG 语句 + MongoDB 命令) 不超过上限
+
+    读取 MetricsMiddleware 写入的 X-Query-Count 响应头，需通过完整应用调用接口
+    """
+    count = int(response.headers["X-Query-Count"])
+    assert count <= limit, (
+        f"{response.request.method} {response.request.url.path} 执行了 {count} 次查询，"
+        f"超过上限 {limit} ({response.headers.get('Server-Timing')})"
+    )
+
+
+@contextmanager
+def max_queries(limit: int) -> Iterator[RequestStats]:
+    """断言代码块内 (同一异步上下文) 的查询次数不超过上限，适用于直接调用服务层"""
+    with track_request() as stats:
+        yield stats
+    assert stats.query_count <= limit, (
+        f"执行了 {stats.query_count} 次查询，超过上限 {limit}: {stats.calls}"
+    )
@@ -0,0 +1,199 @@
+"""列表接口的查询预算：查询次数不随条目数增长，防止 N+1 回归 (需要 PostgreSQL / Redis / MongoDB)"""
+
+import uuid
+from datetime import UTC, datetime
+from decimal import Decimal
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+
+from app.database.pgsql import get_pg
+from app.entity.pgsql import (
+    CommunityGroup,
+    GroupMember,
+    Merchant,
+    Order,
+    OrderItem,
+    Post,
+    Product,
+    User,
+)
+from app.main import app
+from app.tests.query_budget import assert_max_queries
+from app.utils.password_util import hash_password
+from app.utils.token_util import get_access_token
+
+# 各接口单次请求的查询上限 (PG 语句 + MongoDB 命令)，与返回条目数无关
+GROUPS_BUDGET = 4
+GROUP_POSTS_BUDGET = 5
+MY_ORDERS_BUDGET = 6
+
+
+@pytest.fixture
+async def setup_data():
+    """创建会员、商家与商品，以及会员加入的圈子；订单与帖子由用例按需追加"""
+    member_id = uuid.uuid4()
+    merchant_user_id = uuid.uuid4()
+    merchant_id = uuid.uuid4()
+    group_id = uuid.uuid4()
+    product_ids = [uuid.uuid4(), uuid.uuid4()]
+
+    async with get_pg() as session:
+        session.add(
+            User(
+                id=member_id,
+                username=f"budget_member_{member_id.hex[:8]}",
+                email=f"member_{member_id.hex[:8]}@test.com",
+                password_hash=hash_password("password"),
+                role="member",
+            )
+        )
+        session.add(
+            User(
+                id=merchant_user_id,
+                username=f"budget_merchant_{merchant_user_id.hex[:8]}",
+                email=f"merchant_{merchant_user_id.hex[:8]}@test.com",
+                password_hash=hash_password("password"),
+                role="merchant",
+            )
+        )
+        session.add(
+            Merchant(
+                id=merchant_id,
+                user_id=merchant_user_id,
+                shop_name=f"Budget Shop {merchant_id.hex[:8]}",
+            )
+        )
+        for i, pid in enumerate(product_ids):
+            session.add(
+                Product(
+                    id=pid,
+                    merchant_id=merchant_id,
+                    name=f"Budget Product {i}",
+                    price=Decimal("10.00"),
+                    stock=100,
+                    status="on",
+                )
+            )
+        session.add(
+            CommunityGroup(id=group_id, name=f"Budget Group {group_id.hex[:8]}")
+        )
+        session.add(GroupMember(group_id=group_id, user_id=member_id))
+
+    yield {
+        "member_id": member_id,
+        "merchant_id": merchant_id,
+        "group_id": group_id,
+        "product_ids": product_ids,
+        "token": get_access_token(str(member_id), "member"),
+    }
+
+    async with get_pg() as session:
+        await session.execute(
+            text(
+                "DELETE FROM order_items WHERE order_id IN "
+                "(SELECT id FROM orders WHERE user_id = :uid)"
+            ),
+            {"uid": member_id},
+        )
+        await session.execute(
+            text("DELETE FROM orders WHERE user_id = :uid"), {"uid": member_id}
+        )
+        await session.execute(
+            text("DELETE FROM posts WHERE group_id = :gid"), {"gid": group_id}
+        )
+        await session.execute(
+            text("DELETE FROM group_members WHERE group_id = :gid"), {"gid": group_id}
+        )
+        await session.execute(
+            text("DELETE FROM community_groups WHERE id = :gid"), {"gid": group_id}
+        )
+        await session.execute(
+            text("DELETE FROM products WHERE merchant_id = :mid"), {"mid": merchant_id}
+        )
+        await session.execute(
+            text("DELETE FROM merchants WHERE id = :mid"), {"mid": merchant_id}
+        )
+        await session.execute(
+            text("DELETE FROM users WHERE id IN (:uid, :muid)"),
+            {"uid": member_id, "muid": merchant_user_id},
+        )
+
+
+async def _add_orders(data: dict, count: int) -> None:
+    """追加已完成订单，每单两件商品 (覆盖明细与评价状态的批量查询)"""
+    async with get_pg() as session:
+        for _ in range(count):
+            order_id = uuid.uuid4()
+            session.add(
+                Order(
+                    id=order_id,
+                    user_id=data["member_id"],
+                    order_no=f"BUDGET_{order_id.hex[:12]}",
+                    status="completed",
+                    total_amount=Decimal("20.00"),
+                    paid_at=datetime.now(UTC),
+                    completed_at=datetime.now(UTC),
+                )
+            )
+            for pid in data["product_ids"]:
+                session.add(
+                    OrderItem(
+                        order_id=order_id,
+                        product_id=pid,
+                        merchant_id=data["merchant_id"],
+                        quantity=1,
+                        unit_price=Decimal("10.00"),
+                    )
+                )
+
+
+async def _add_posts(data: dict, count: int) -> None:
+    async with get_pg() as session:
+        for i in range(count):
+            session.add(
+                Post(
+                    group_id=data["group_id"],
+                    user_id=data["member_id"],
+                    title=f"Budget Post {i}",
+                    content="content",
+                )
+            )
+
+
+async def _query_count(ac: AsyncClient, url: str, token: str, budget: int) -> int:
+    response = await ac.get(url, headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+    assert_max_queries(response, budget)
+    return int(response.headers["X-Query-Count"])
+
+
+@pytest.mark.asyncio
+async def test_list_endpoints_stay_within_query_budget(setup_data):
+    data = setup_data
+    token = data["token"]
+    endpoints = [
+        ("/api/communities/groups", GROUPS_BUDGET),
+        (f"/api/communities/groups/{data['group_id']}/posts", GROUP_POSTS_BUDGET),
+        # 关闭缓存总数，使每次请求执行相同的查询
+        ("/api/orders/?with_total=false", MY_ORDERS_BUDGET),
+    ]
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        # 预热：排除首次建连时方言初始化的查询，并填充已加入圈子等缓存
+        for url, _ in endpoints:
+            await ac.get(url, headers={"Authorization": f"Bearer {token}"})
+
+        await _add_orders(data, 1)
+        await _add_posts(data, 1)
+        few = [await _query_count(ac, url, token, b) for url, b in endpoints]
+
+        await _add_orders(data, 5)
+        await _add_posts(data, 5)
+        many = [await _query_count(ac, url, token, b) for url, b in endpoints]
+
+    # 条目增多后查询次数不变，逐条查询 (N+1) 会使两者不同
+    assert few == many
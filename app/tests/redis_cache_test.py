@@ -0,0 +1,67 @@
+import json
+from typing import Any, cast
+
+import pytest
+
+from app.schemas import RawSuccessResponse
+from app.utils.redis_cache import (
+    INVALIDATE_CHANNEL,
+    LocalCache,
+    cache_del,
+    cache_get_bytes,
+    cache_set_bytes,
+    local_cache,
+)
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.store: dict[str, str] = {}
+        self.gets = 0
+        self.published: list[tuple[str, str]] = []
+
+    async def get(self, key: str) -> str | None:
+        self.gets += 1
+        return self.store.get(key)
+
+    async def set(self, key: str, value: str, ex: int | None = None) -> bool:
+        self.store[key] = value
+        return True
+
+    async def delete(self, *keys: str) -> int:
+        return sum(1 for k in keys if self.store.pop(k, None) is not None)
+
+    async def publish(self, channel: str, message: str) -> int:
+        self.published.append((channel, message))
+        return 1
+
+
+def test_local_cache_evicts_least_recently_used():
+    cache = LocalCache(maxsize=2)
+    cache.set("a", b"1", ttl=60)
+    cache.set("b", b"2", ttl=60)
+    assert cache.get("a") == b"1"
+
+    cache.set("c", b"3", ttl=60)
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1"
+
+    cache.set("d", b"4", ttl=0)
+    assert cache.get("d") is None
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_cache_bytes_served_locally_until_cache_del():
+    r = cast(Any, FakeRedis())
+    key = "cache:test:l1"
+
+    raw = await cache_set_bytes(r, key, [{"name": "分类"}], ttl=300)
+    assert await cache_get_bytes(r, key) == raw
+    assert r.gets == 0
+
+    await cache_del(r, key)
+    assert local_cache.get(key) is None
+    assert r.published == [(INVALIDATE_CHANNEL, json.dumps([key]))]
+
+    resp = RawSuccessResponse.build("ok", raw)
+    assert json.loads(bytes(resp.body)) == {"message": "ok", "data": [{"name": "分类"}]}
@@ -5,19 +5,62 @@ from typing import Any, cast
 import pytest
 
 from app.services.redis_stock_service import (
+    _COMPARE_AND_SET_LUA,
     _DECRBY_LUA,
     _DEDUCT_STOCK_LUA,
+    _DEDUCT_STOCK_MANY_LUA,
+    _INCRBY_IF_EXISTS_LUA,
     _INCRBY_LUA,
     redis_stock_service,
 )
 
 
+class FakePipeline:
+    def __init__(self, redis: "FakeRedis") -> None:
+        self.redis = redis
+        self.commands: list[tuple[str, tuple[Any, ...], dict[str, Any]]] = []
+
+    def __len__(self) -> int:
+        return len(self.commands)
+
+    def __getattr__(self, name: str) -> Any:
+        async def _queue(*args: Any, **kwargs: Any) -> "FakePipeline":
+            self.commands.append((name, args, kwargs))
+            return self
+
+        return _queue
+
+    async def execute(self) -> list[Any]:
+        return [await getattr(self.redis, n)(*a, **kw) for n, a, kw in self.commands]
+
+
 class FakeRedis:
     def __init__(self) -> None:
         self.store: dict[str, int] = {}
+        self.hashes: dict[str, dict[str, str]] = {}
+
+    def pipeline(self, transaction: bool = True) -> FakePipeline:
+        return FakePipeline(self)
+
+    async def mget(self, keys: list[str]) -> list[str | None]:
+        return [await self.get(k) for k in keys]
+
+    async def hmget(self, name: str, fields: list[str]) -> list[str | None]:
+        return [self.hashes.get(name, {}).get(f) for f in fields]
+
+    async def hset(self, name: str, field: str, value: Any) -> int:
+        self.hashes.setdefault(name, {})[field] = str(value)
+        return 1
+
+    async def hdel(self, name: str, *fields: str) -> int:
+        h = self.hashes.get(name, {})
+        return sum(1 for f in fields if h.pop(f, None) is not None)
 
-    async def set(self, key: str, value: Any) -> None:
+    async def set(self, key: str, value: Any, nx: bool = False) -> bool:
+        if nx and key in self.store:
+            return False
         self.store[key] = int(value)
+        return True
 
     async def setnx(self, key: str, value: Any) -> int:
         if key in self.store:
@@ -33,8 +76,24 @@ class FakeRedis:
     async def exists(self, key: str) -> int:
         return 1 if key in self.store else 0
 
-    async def eval(self, script: str, numkeys: int, key: str, quantity: int) -> int:
-        qty = int(quantity)
+    async def eval(self, script: str, numkeys: int, *args: Any) -> Any:
+        if script == _DEDUCT_STOCK_MANY_LUA:
+            keys, qtys = args[:numkeys], [int(q) for q in args[numkeys:]]
+            for i, k in enumerate(keys, start=1):
+                if k not in self.store:
+                    return [-2, i]
+                if self.store[k] < qtys[i - 1]:
+                    return [-1, i]
+            for k, q in zip(keys, qtys, strict=True):
+                self.store[k] -= q
+            return [0, 0]
+        if script == _COMPARE_AND_SET_LUA:
+            key, expected, value = args
+            if await self.get(key) != str(expected):
+                return 0
+            self.store[key] = int(value)
+            return 1
+        key, qty = args[0], int(args[1])
         if script == _DEDUCT_STOCK_LUA:
             if key not in self.store:
                 return -2
@@ -46,6 +105,11 @@ class FakeRedis:
         if script == _INCRBY_LUA:
             self.store[key] = int(self.store.get(key, 0)) + qty
             return self.store[key]
+        if script == _INCRBY_IF_EXISTS_LUA:
+            if key not in self.store:
+                return -2
+            self.store[key] += qty
+            return self.store[key]
         if script == _DECRBY_LUA:
             self.store[key] = int(self.store.get(key, 0)) - qty
             return self.store[key]
@@ -110,3 +174,90 @@ async def test_release_syncs_when_key_missing(monkeypatch: pytest.MonkeyPatch):
 
     await redis_stock_service.release(r, session, product_id, 3)
     assert r.store[key] == 10
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_try_deduct_many_all_or_nothing():
+    r = cast(Any, FakeRedis())
+    session = cast(Any, object())
+    p1, p2 = uuid.uuid4(), uuid.uuid4()
+
+    r.store[f"stock:{p1}"] = 5
+    r.store[f"stock:{p2}"] = 1
+    failed = await redis_stock_service.try_deduct_many(r, session, [(p1, 2), (p2, 3)])
+    assert failed == p2
+    assert r.store[f"stock:{p1}"] == 5
+    assert r.store[f"stock:{p2}"] == 1
+
+    failed = await redis_stock_service.try_deduct_many(r, session, [(p1, 2), (p2, 1)])
+    assert failed is None
+    assert r.store[f"stock:{p1}"] == 3
+    assert r.store[f"stock:{p2}"] == 0
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_try_deduct_many_initializes_missing_keys():
+    r = cast(Any, FakeRedis())
+    session = cast(Any, object())
+    p1, p2 = uuid.uuid4(), uuid.uuid4()
+
+    r.store[f"stock:{p1}"] = 5
+    failed = await redis_stock_service.try_deduct_many(
+        r, session, [(p1, 1), (p2, 2), (p2, 1)], db_stocks={p1: 5, p2: 4}
+    )
+    assert failed is None
+    assert r.store[f"stock:{p1}"] == 4
+    assert r.store[f"stock:{p2}"] == 1
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_reconcile_page_repairs_only_persistent_drift():
+    r = cast(Any, FakeRedis())
+    ok_id, drift_id, missing_id = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    r.store[f"stock:{ok_id}"] = 5
+    r.store[f"stock:{drift_id}"] = 3
+    rows = [(ok_id, 5), (drift_id, 7), (missing_id, 2)]
+
+    # 第一轮：仅记录疑似漂移，不修复
+    stats = await redis_stock_service.reconcile_page(r, rows)
+    assert stats["scanned"] == 3
+    assert stats["missing"] == 1
+    assert stats["drifted"] == 1
+    assert stats["drift_abs"] == 4
+    assert stats["repaired"] == 0
+    assert r.store[f"stock:{drift_id}"] == 3
+
+    # 第二轮：漂移值一致，执行修复
+    stats = await redis_stock_service.reconcile_page(r, rows)
+    assert stats["repaired"] == 1
+    assert r.store[f"stock:{drift_id}"] == 7
+    assert str(drift_id) not in r.hashes[redis_stock_service.RECONCILE_SUSPECT_KEY]
+    assert f"stock:{missing_id}" not in r.store
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_warm_up_does_not_overwrite_existing_keys():
+    r = cast(Any, FakeRedis())
+    p1, p2 = uuid.uuid4(), uuid.uuid4()
+    r.store[f"stock:{p1}"] = 3
+
+    warmed = await redis_stock_service.warm_up(r, [(p1, 10), (p2, 8)])
+    assert warmed == 1
+    assert r.store[f"stock:{p1}"] == 3
+    assert r.store[f"stock:{p2}"] == 8
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_release_many_merges_and_skips_missing_keys():
+    r = cast(Any, FakeRedis())
+    cached_id, missing_id = uuid.uuid4(), uuid.uuid4()
+    cached_key = redis_stock_service._stock_key(cached_id)
+    r.store[cached_key] = 3
+
+    await redis_stock_service.release_many(
+        r, [(cached_id, 2), (missing_id, 5), (cached_id, 1)]
+    )
+
+    assert r.store[cached_key] == 6
+    # 未缓存的商品不创建键，下次扣减时从数据库初始化
+    assert redis_stock_service._stock_key(missing_id) not in r.store
@@ -0,0 +1,50 @@
+import uuid
+from typing import Any, cast
+
+import pytest
+
+from app.services.stock_reservation_service import (
+    _CLAIM_DUE_LUA,
+    stock_reservation_service,
+)
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.zsets: dict[str, dict[str, float]] = {}
+
+    async def zadd(self, key: str, mapping: dict[str, float]) -> int:
+        self.zsets.setdefault(key, {}).update(mapping)
+        return len(mapping)
+
+    async def zrem(self, key: str, *members: str) -> int:
+        z = self.zsets.get(key, {})
+        return sum(1 for m in members if z.pop(m, None) is not None)
+
+    async def eval(self, script: str, numkeys: int, *args: Any) -> Any:
+        assert script == _CLAIM_DUE_LUA
+        key, now, limit, lease_until = args
+        z = self.zsets.get(key, {})
+        due = sorted((s, m) for m, s in z.items() if s <= now)[: int(limit)]
+        for _, m in due:
+            z[m] = lease_until
+        return [m for _, m in due]
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_claim_due_only_returns_expired_and_leases_them():
+    r = cast(Any, FakeRedis())
+    due_id, future_id = uuid.uuid4(), uuid.uuid4()
+
+    await stock_reservation_service.record(r, due_id, expire_at=100)
+    await stock_reservation_service.record(r, future_id, expire_at=500)
+
+    claimed = await stock_reservation_service.claim_due(r, now=200)
+    assert claimed == [str(due_id)]
+
+    # 租约期内不会被重复领取
+    assert await stock_reservation_service.claim_due(r, now=200) == []
+
+    await stock_reservation_service.remove(r, *claimed)
+    assert str(due_id) not in r.zsets[stock_reservation_service.LEDGER_KEY]
+    assert str(future_id) in r.zsets[stock_reservation_service.LEDGER_KEY]
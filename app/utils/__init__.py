@@ -1,4 +1,10 @@
-from .common import generate_order_no
+from .common import (
+    decode_cursor,
+    decode_rank_cursor,
+    encode_cursor,
+    encode_rank_cursor,
+    generate_order_no,
+)
 from .operation_lock import check_operation_lock
 from .password_util import hash_password, verify_password
 from .rate_limit import RateLimiter
@@ -23,5 +29,9 @@ __all__ = [
     "is_valid_email",
     "id_password_has_letter_and_digit",
     "generate_order_no",
+    "encode_cursor",
+    "decode_cursor",
+    "encode_rank_cursor",
+    "decode_rank_cursor",
     "check_operation_lock",
 ]
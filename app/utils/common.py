@@ -1,5 +1,11 @@
+import base64
+import binascii
 import random
+import uuid
 from datetime import datetime
+from decimal import Decimal
+
+from app.common.errors import ValidationError
 
 
 def generate_order_no() -> str:
@@ -7,3 +13,45 @@ def generate_order_no() -> str:
     timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
     random_digits = "".join([str(random.randint(0, 9)) for _ in range(6)])
     return f"{timestamp}{random_digits}"
+
+
+def _b64encode(raw: str) -> str:
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _b64decode(cursor: str) -> str:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    return base64.urlsafe_b64decode(padded).decode()
+
+
+def encode_cursor(created_at: datetime, row_id: uuid.UUID) -> str:
+    """将 (created_at, id) 编码为不透明的分页游标"""
+    return _b64encode(f"{created_at.isoformat()}|{row_id}")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    """解析分页游标，格式错误时抛出 ValidationError"""
+    try:
+        created_at, row_id = _b64decode(cursor).split("|", 1)
+        return datetime.fromisoformat(created_at), uuid.UUID(row_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise ValidationError("无效的分页游标") from e
+
+
+def encode_rank_cursor(rank: Decimal, created_at: datetime, row_id: uuid.UUID) -> str:
+    """将 (相关度, created_at, id) 编码为搜索结果的分页游标"""
+    return _b64encode(f"{rank}|{created_at.isoformat()}|{row_id}")
+
+
+def decode_rank_cursor(cursor: str) -> tuple[Decimal, datetime, uuid.UUID]:
+    """解析搜索结果分页游标，格式错误时抛出 ValidationError"""
+    try:
+        rank, created_at, row_id = _b64decode(cursor).split("|", 2)
+        return Decimal(rank), datetime.fromisoformat(created_at), uuid.UUID(row_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError, ArithmeticError) as e:
+        raise ValidationError("无效的分页游标") from e
+
+
+def escape_like(keyword: str) -> str:
+    """转义 LIKE 通配符 (% _ \\)，配合 ilike(..., escape="\\") 使用"""
+    return keyword.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
@@ -1,6 +1,15 @@
+import asyncio
 import json
+import logging
+import time
+from collections import OrderedDict
 from typing import Any
 
+logger = logging.getLogger(__name__)
+
+# 缓存失效广播频道：各进程收到后清除本地 L1 中的同名键
+INVALIDATE_CHANNEL = "cache:invalidate"
+
 
 def dumps(value: Any) -> str:
     return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
@@ -10,6 +19,41 @@ def loads(value: str) -> Any:
     return json.loads(value)
 
 
+class LocalCache:
+    """进程内 TTL + LRU 缓存 (L1)，存放已序列化的 JSON 字节，命中时无需访问 Redis 与反序列化"""
+
+    def __init__(self, maxsize: int = 256) -> None:
+        self.maxsize = maxsize
+        self._data: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+
+    def get(self, key: str) -> bytes | None:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: bytes, *, ttl: float) -> None:
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+
+local_cache = LocalCache()
+
+
 async def cache_get_json(redis, key: str) -> Any | None:
     raw = await redis.get(key)
     return loads(raw) if raw else None
@@ -19,6 +63,56 @@ async def cache_set_json(redis, key: str, value: Any, *, ttl: int) -> None:
     await redis.set(key, dumps(value), ex=ttl)
 
 
+async def cache_get_bytes(redis, key: str, *, local_ttl: float = 5) -> bytes | None:
+    """依次读取 L1 与 Redis，Redis 命中时回填 L1"""
+    raw = local_cache.get(key)
+    if raw is not None:
+        return raw
+    cached = await redis.get(key)
+    if not cached:
+        return None
+    raw = cached.encode()
+    local_cache.set(key, raw, ttl=local_ttl)
+    return raw
+
+
+async def cache_set_bytes(
+    redis, key: str, value: Any, *, ttl: int, local_ttl: float = 5
+) -> bytes:
+    """序列化后写入 Redis 与 L1，返回 JSON 字节"""
+    serialized = dumps(value)
+    await redis.set(key, serialized, ex=ttl)
+    raw = serialized.encode()
+    local_cache.set(key, raw, ttl=min(local_ttl, ttl))
+    return raw
+
+
 async def cache_del(redis, *keys: str) -> None:
     if keys:
         await redis.delete(*keys)
+        local_cache.delete(*keys)
+        # 通知其他进程清除各自的 L1
+        await redis.publish(INVALIDATE_CHANNEL, dumps(list(keys)))
+
+
+async def listen_invalidations(redis) -> None:
+    """
+    订阅缓存失效广播并清除本地 L1 (常驻任务，断线后清空 L1 并重连)
+
+    :param redis: 独立的 Redis 客户端，避免订阅长期占用业务连接池
+    """
+    while True:
+        try:
+            async with redis.pubsub() as pubsub:
+                await pubsub.subscribe(INVALIDATE_CHANNEL)
+                # 订阅建立前可能错过的广播无法补收，直接清空
+                local_cache.clear()
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        local_cache.delete(*loads(message["data"]))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"[LocalCache] Invalidation listener error: {e}")
+            local_cache.clear()
+            await asyncio.sleep(1)
@@ -0,0 +1,64 @@
+"""Redis 写回缓冲的批次领取：增量先累加到 pending 哈希，落库任务以令牌 + 租约独占领取批次"""
+
+import uuid
+from typing import Any, cast
+
+# 领取待落库批次 (KEYS: pending, flushing, owner；ARGV: token, lease_ms)
+# - 租约仍被其他任务持有：不领取，避免同一批次被重叠的两轮任务重复落库
+# - 上一轮未确认的批次 (持有者中断、租约过期)：由本轮接管重试
+# - 否则将累加哈希整体改名为处理中批次，改名之后的新增量写入新的累加哈希
+CLAIM_BATCH_LUA = """
+if redis.call("EXISTS", KEYS[3]) == 1 then
+  return 0
+end
+if redis.call("EXISTS", KEYS[2]) == 0 then
+  if redis.call("EXISTS", KEYS[1]) == 0 then
+    return 0
+  end
+  redis.call("RENAME", KEYS[1], KEYS[2])
+end
+redis.call("SET", KEYS[3], ARGV[1], "PX", ARGV[2])
+return 1
+"""
+
+# 确认批次已落库 (KEYS: flushing, owner；ARGV: token)：仍持有租约时才删除批次
+ACK_BATCH_LUA = """
+if redis.call("GET", KEYS[2]) == ARGV[1] then
+  redis.call("DEL", KEYS[1], KEYS[2])
+  return 1
+end
+return 0
+"""
+
+
+def _owner_key(flushing_key: str) -> str:
+    return f"{flushing_key}:owner"
+
+
+async def claim_batch(
+    redis, pending_key: str, flushing_key: str, *, lease: int
+) -> str | None:
+    """
+    领取待落库批次，成功时返回令牌
+
+    :param lease: 租约秒数，需大于一轮落库的最长耗时；超时未确认的批次会被下一轮接管
+    """
+    token = uuid.uuid4().hex
+    claimed = await cast(Any, redis).eval(
+        CLAIM_BATCH_LUA,
+        3,
+        pending_key,
+        flushing_key,
+        _owner_key(flushing_key),
+        token,
+        lease * 1000,
+    )
+    return token if claimed else None
+
+
+async def ack_batch(redis, flushing_key: str, token: str) -> bool:
+    """批次落库成功后删除，令牌不匹配 (租约已过期被接管) 时返回 False"""
+    res = await cast(Any, redis).eval(
+        ACK_BATCH_LUA, 2, flushing_key, _owner_key(flushing_key), token
+    )
+    return bool(res)